@@ -11,6 +11,8 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 from sentiment_analyzer import analyze_sentiment
 from caption_generator import generate_caption
 from predict import predict_likes, predict_comments, predict_shares
+from model_registry import registry as model_registry
+from time_predict import load_time_prediction_model
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 import logging
@@ -46,6 +48,13 @@ app.register_blueprint(caption_bp)
 app.register_blueprint(optimize_bp)
 app.register_blueprint(time_bp)
 
+# Load every model once per process so requests never touch the pickles
+_warm_result = model_registry.warm()
+logger.info(
+    f"Model registry warmed: {len(_warm_result['loaded'])} models loaded, "
+    f"{len(_warm_result['errors'])} failed")
+load_time_prediction_model()
+
 
 @app.route('/', methods=['GET'])
 def root():
@@ -285,9 +294,9 @@ def ai_models_status():
     try:
         status = {
             "xgboost_model": {
-                "available": True,
-                "model_path": "models/likes_predictor.pkl",
-                "status": "ready"
+                "available": model_registry.is_loaded("combined_likes"),
+                "model_path": "models/combined_likes_predictor.pkl",
+                "status": "ready" if model_registry.is_loaded("combined_likes") else "unavailable"
             },
             "langchain_integration": {
                 "available": LANGCHAIN_AVAILABLE,
@@ -305,6 +314,7 @@ def ai_models_status():
                 model["status"] in ["ready", "not_configured"]
                 for model in status.values()
             ) else "partial",
+            "model_registry": model_registry.stats(),
             "timestamp": datetime.now().isoformat()
         })
 
@@ -316,4 +326,5 @@ def ai_models_status():
 
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5001)
+    # Development server only; production runs api/serve.py (gunicorn, preforked workers)
+    app.run(debug=os.getenv('FLASK_DEBUG') == '1', host='0.0.0.0', port=5001)
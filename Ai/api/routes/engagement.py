@@ -1,10 +1,19 @@
 from flask import Blueprint, request, jsonify
 from combined_predict import predict_engagement as combined_predict_engagement
+from combined_predict import predict_engagement_batch
 from logger import logger
 from utils import transform_input_features
 
 engagement_bp = Blueprint('engagement', __name__)
 
+MAX_BATCH_SIZE = 5000
+
+def engagement_summary(predicted_likes, predicted_comments, predicted_shares):
+    """Engagement category and score shared by the single and batch endpoints"""
+    engagement_category = "low" if predicted_likes < 10 else "medium" if predicted_likes < 50 else "high" if predicted_likes < 200 else "viral"
+    engagement_score = int((predicted_likes + predicted_comments * 2 + predicted_shares * 3) / 10)
+    return engagement_category, engagement_score
+
 @engagement_bp.route('/predict/engagement', methods=['POST'])
 def predict_engagement():
     try:
@@ -22,8 +31,8 @@ def predict_engagement():
         predicted_shares = result['predicted_shares']
         
         # Calculate engagement category and score
-        engagement_category = "low" if predicted_likes < 10 else "medium" if predicted_likes < 50 else "high" if predicted_likes < 200 else "viral"
-        engagement_score = int((predicted_likes + predicted_comments * 2 + predicted_shares * 3) / 10)
+        engagement_category, engagement_score = engagement_summary(
+            predicted_likes, predicted_comments, predicted_shares)
         
         logger.info(f"Combined prediction successful: {predicted_likes} likes, {predicted_comments} comments, {predicted_shares} shares")
         return jsonify({
@@ -37,4 +46,48 @@ def predict_engagement():
         })
     except Exception as e:
         logger.error(f"Prediction error: {str(e)}")
-        return jsonify({"error": f"Prediction failed: {str(e)}"}), 500 
\ No newline at end of file
+        return jsonify({"error": f"Prediction failed: {str(e)}"}), 500 
+
+@engagement_bp.route('/predict/engagement/batch', methods=['POST'])
+def predict_engagement_batch_endpoint():
+    """
+    Predict engagement for many posts in one call
+
+    Expected input:
+    {
+        "posts": [
+            {"length": 120, "userFollowers": 1200, "postTimeOfDay": "Evening", ...},
+            ...
+        ]
+    }
+    """
+    try:
+        data = request.get_json()
+        if not data or not isinstance(data.get('posts'), list):
+            return jsonify({"error": "A list of posts is required"}), 400
+        posts = data['posts']
+        if len(posts) > MAX_BATCH_SIZE:
+            return jsonify({"error": f"At most {MAX_BATCH_SIZE} posts per batch"}), 400
+
+        results = predict_engagement_batch(posts)
+
+        if results is None:
+            return jsonify({"error": "Model loading failed"}), 500
+
+        for item in results:
+            if item['status'] == 'success':
+                item['engagement_category'], item['engagement_score'] = engagement_summary(
+                    item['predicted_likes'], item['predicted_comments'], item['predicted_shares'])
+
+        failed = sum(1 for item in results if item['status'] == 'error')
+        logger.info(f"Batch prediction completed: {len(results) - failed} succeeded, {failed} failed")
+        return jsonify({
+            "results": results,
+            "count": len(results),
+            "failed": failed,
+            "model_info": "Combined Simfluence + Sarcasm",
+            "status": "success"
+        })
+    except Exception as e:
+        logger.error(f"Batch prediction error: {str(e)}")
+        return jsonify({"error": f"Batch prediction failed: {str(e)}"}), 500
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from caption_generator import generate_caption
 from sentiment_analyzer import analyze_sentiment
+from text_analysis import TextAnalysis
 from logger import logger
 from utils import transform_input_features, generate_optimization_recommendations
 
@@ -17,19 +18,22 @@ def optimize_post():
         post_settings = data.get('post_settings', {})
         goals = data.get('optimization_goals', ['engagement'])
         results = {}
+        # Tokenize the content once; every text feature below reads from it
+        analysis = TextAnalysis(content)
         if 'caption' in goals and content:
             caption_result = generate_caption(
                 prompt=content,
                 platform='reddit',
-                tone='engaging'
+                tone='engaging',
+                analysis=analysis
             )
             results['optimized_caption'] = caption_result
         if 'sentiment' in goals and content:
-            sentiment_result = analyze_sentiment(content)
+            sentiment_result = analyze_sentiment(content, analysis=analysis)
             results['sentiment_analysis'] = sentiment_result
         if 'engagement' in goals:
             engagement_input = {
-                "length": len(content),
+                **analysis.engagement_features(),
                 "containsImage": 1 if post_settings.get('containsImage') else 0,
                 "userFollowers": user_data.get('userFollowers', 0),
                 "userKarma": user_data.get('userKarma', 0),
@@ -1,22 +1,78 @@
 from flask import Blueprint, request, jsonify
-from sentiment_analyzer import analyze_sentiment
+from sentiment_analyzer import analyze_sentiment_batch, sentiment_cache
+from sentiment_engines import ENGINES, get_engine
 from logger import logger
 
 sentiment_bp = Blueprint('sentiment', __name__)
 
+MAX_BATCH_SIZE = 20000
+
 @sentiment_bp.route('/analyze/sentiment', methods=['POST'])
 def analyze_text_sentiment():
     try:
         data = request.get_json()
         if not data or 'text' not in data:
             return jsonify({"error": "Text is required"}), 400
-        sentiment_result = analyze_sentiment(data['text'])
+        engine_name = data.get('engine')
+        if engine_name is not None and engine_name not in ENGINES:
+            return jsonify({"error": f"Unknown engine '{engine_name}'. Available: {', '.join(ENGINES)}"}), 400
+        engine = get_engine(engine_name)
+        sentiment_result = engine.analyze(data['text'])
         return jsonify({
             "sentiment": sentiment_result['sentiment'],
             "confidence": sentiment_result['confidence'],
             "scores": sentiment_result['scores'],
+            "engine": engine.name,
             "status": "success"
         })
     except Exception as e:
         logger.error(f"Sentiment analysis error: {str(e)}")
-        return jsonify({"error": f"Sentiment analysis failed: {str(e)}"}), 500 
\ No newline at end of file
+        return jsonify({"error": f"Sentiment analysis failed: {str(e)}"}), 500
+
+@sentiment_bp.route('/analyze/sentiment/batch', methods=['POST'])
+def analyze_text_sentiment_batch():
+    """
+    Analyze many texts in one call
+
+    Expected input:
+    {
+        "texts": ["First comment", "Second comment", ...],
+        "engine": "vader"  # optional: textblob (default), vader, lexicon or fast
+    }
+    """
+    try:
+        data = request.get_json()
+        if not data or not isinstance(data.get('texts'), list):
+            return jsonify({"error": "A list of texts is required"}), 400
+        texts = data['texts']
+        if len(texts) > MAX_BATCH_SIZE:
+            return jsonify({"error": f"At most {MAX_BATCH_SIZE} texts per batch"}), 400
+        engine_name = data.get('engine')
+        if engine_name is not None and engine_name not in ENGINES:
+            return jsonify({"error": f"Unknown engine '{engine_name}'. Available: {', '.join(ENGINES)}"}), 400
+        engine = get_engine(engine_name)
+
+        results = []
+        for item in analyze_sentiment_batch(texts, engine=engine.name):
+            if item['status'] == 'success':
+                # Same fields as the single-text endpoint
+                item = {key: item[key] for key in ('index', 'status', 'sentiment', 'confidence', 'scores')}
+            results.append(item)
+
+        failed = sum(1 for item in results if item['status'] == 'error')
+        logger.info(f"Batch sentiment analysis completed: {len(results) - failed} succeeded, {failed} failed")
+        return jsonify({
+            "results": results,
+            "count": len(results),
+            "failed": failed,
+            "engine": engine.name,
+            "status": "success"
+        })
+    except Exception as e:
+        logger.error(f"Batch sentiment analysis error: {str(e)}")
+        return jsonify({"error": f"Batch sentiment analysis failed: {str(e)}"}), 500
+
+@sentiment_bp.route('/analyze/sentiment/cache', methods=['GET'])
+def sentiment_cache_stats():
+    """Hit/miss/eviction counters of this worker's sentiment result cache"""
+    return jsonify({"cache": sentiment_cache.stats(), "status": "success"})
@@ -5,10 +5,15 @@ import os
 # Add the src directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
 
-from time_predict import predict_optimal_time, format_time_prediction
+from time_predict import (predict_optimal_time, format_time_prediction, predict_time_heatmap,
+                          score_posting_hours, get_time_slot_name)
 
 time_bp = Blueprint('time', __name__)
 
+def _valid_user_data(user_data) -> bool:
+    """user_data must be an object of feature values: numbers, or booleans for 0/1 flags"""
+    return isinstance(user_data, dict) and all(isinstance(value, (int, float)) for value in user_data.values())
+
 @time_bp.route('/predict/optimal-time', methods=['POST'])
 def predict_time():
     """
@@ -53,6 +58,12 @@ def predict_time():
                 "status": "error"
             }), 400
         
+        if not _valid_user_data(user_data):
+            return jsonify({
+                "error": "user_data must be an object of numeric feature values",
+                "status": "error"
+            }), 400
+        
         # Get prediction
         prediction = predict_optimal_time(subreddit, content_type, user_data)
         
@@ -92,16 +103,21 @@ def predict_time_engagement():
         content_type = data.get('content_type', 'text')
         hours = data.get('hours', [9, 12, 15, 18, 21])
         
-        # Get predictions for multiple hours
-        predictions = []
-        for hour in hours:
-            user_data = {'hour': hour}
-            prediction = predict_optimal_time(subreddit, content_type, user_data)
-            predictions.append({
-                "hour": hour,
-                "time_slot": prediction.get('optimal_time_slot', 'Unknown'),
-                "confidence": prediction.get('confidence', 0.5)
-            })
+        if not isinstance(hours, list) or not all(isinstance(h, int) and not isinstance(h, bool) and 0 <= h < 24
+                                                  for h in hours):
+            return jsonify({
+                "error": "hours must be a list of integers between 0 and 23",
+                "status": "error"
+            }), 400
+        
+        # Score all requested hours in one batched prediction
+        scored = score_posting_hours(subreddit, content_type, hours)
+        predictions = [{
+            "hour": slot['hour'],
+            "time_slot": get_time_slot_name(slot['hour']),
+            "score": slot['score'],
+            "confidence": slot['confidence']
+        } for slot in scored]
         
         return jsonify({
             "subreddit": subreddit,
@@ -116,6 +132,69 @@ def predict_time_engagement():
             "status": "error"
         }), 500
 
+@time_bp.route('/predict/time-heatmap', methods=['POST'])
+def predict_time_heatmap_endpoint():
+    """
+    Score every posting hour for a subreddit and content type (weekday is not modelled)
+    
+    Expected input:
+    {
+        "subreddit": "funny",
+        "content_type": "image",
+        "top_n": 10
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({
+                "error": "No data provided",
+                "status": "error"
+            }), 400
+        
+        subreddit = data.get('subreddit', 'funny')
+        content_type = data.get('content_type', 'text')
+        user_data = data.get('user_data', {})
+        top_n = data.get('top_n')
+        
+        if not subreddit or not isinstance(subreddit, str):
+            return jsonify({
+                "error": "Invalid subreddit name",
+                "status": "error"
+            }), 400
+        
+        valid_content_types = ['text', 'image', 'video', 'link']
+        if content_type not in valid_content_types:
+            return jsonify({
+                "error": f"Invalid content_type. Must be one of: {valid_content_types}",
+                "status": "error"
+            }), 400
+        
+        if top_n is not None and (not isinstance(top_n, int) or isinstance(top_n, bool) or top_n < 1):
+            return jsonify({
+                "error": "top_n must be a positive integer",
+                "status": "error"
+            }), 400
+        
+        if not _valid_user_data(user_data):
+            return jsonify({
+                "error": "user_data must be an object of numeric feature values",
+                "status": "error"
+            }), 400
+        
+        heatmap = predict_time_heatmap(subreddit, content_type, user_data)
+        if top_n and 'ranked_slots' in heatmap:
+            heatmap['ranked_slots'] = heatmap['ranked_slots'][:top_n]
+        
+        return jsonify(heatmap)
+        
+    except Exception as e:
+        return jsonify({
+            "error": f"Time heatmap prediction failed: {str(e)}",
+            "status": "error"
+        }), 500
+
 @time_bp.route('/time/status', methods=['GET'])
 def time_status():
     """Check status of time prediction models"""
@@ -130,7 +209,8 @@ def time_status():
                 "models_loaded": True,
                 "global_model": True,
                 "subreddit_models": len(engine.subreddit_models),
-                "content_models": len(engine.content_type_models)
+                "content_models": len(engine.content_type_models),
+                "subreddit_cache": engine.cache_stats()
             })
         else:
             return jsonify({
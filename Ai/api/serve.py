@@ -0,0 +1,179 @@
+"""
+Production entry point: gunicorn with the app preloaded in the master process.
+
+Models and lexicons are loaded once before forking, so every worker shares them
+copy-on-write instead of loading its own copy. Each worker runs several threads,
+so a slow request (e.g. an /ai/* call waiting on Gemini) only occupies one thread.
+
+    python api/serve.py                      # serve on 0.0.0.0:5001
+    python api/serve.py --workers 4 --threads 8
+    python api/serve.py --bench              # requests/second for a canned payload mix
+
+Graceful restarts (gunicorn signals sent to the master):
+    kill -HUP <pid>    restart workers from the preloaded app, finishing in-flight requests
+    kill -USR2 <pid>   start a new master that reloads code and models, then
+    kill -WINCH <old>  stop the old master's workers once the new one is serving
+"""
+import argparse
+import gc
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_BIND = os.getenv("BIND", "0.0.0.0:5001")
+DEFAULT_WORKERS = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+DEFAULT_THREADS = int(os.getenv("GUNICORN_THREADS", 4))
+# Seconds a worker may spend on one request before it is restarted
+DEFAULT_TIMEOUT = int(os.getenv("GUNICORN_TIMEOUT", 120))
+# Seconds workers get to finish in-flight requests on restart/shutdown
+DEFAULT_GRACEFUL_TIMEOUT = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+# Recycle workers after this many requests (0 disables) to bound memory growth
+DEFAULT_MAX_REQUESTS = int(os.getenv("GUNICORN_MAX_REQUESTS", 0))
+
+# Canned request mix used by --bench: (method, path, payload)
+BENCH_REQUESTS = [
+    ("POST", "/predict/engagement", {
+        "length": 120, "containsImage": 1, "userFollowers": 1500, "avgEngagementRate": 0.08,
+        "postTimeOfDay": "evening", "dayOfWeek": "Friday", "topCommentSentiment": "positive"}),
+    ("POST", "/predict/engagement/batch", {"posts": [
+        {"length": 40 + 10 * i, "userFollowers": 100 * i, "postTimeOfDay": "morning"} for i in range(20)]}),
+    ("POST", "/analyze/sentiment", {"text": "This is an amazing update, I love how fast it is now!"}),
+    ("POST", "/analyze/sentiment", {"text": "ngl this update slaps, way less laggy lol", "engine": "vader"}),
+    ("POST", "/predict/optimal-time", {"subreddit": "funny", "content_type": "image"}),
+    ("POST", "/predict/time-heatmap", {"subreddit": "askreddit", "content_type": "text", "top_n": 3}),
+    ("GET", "/health", None),
+]
+
+
+def preload():
+    """Import the app (which warms every model) and load lazily built lexicons"""
+    sys.path.insert(0, API_DIR)
+    from app import app
+    from sentiment_analyzer import analyze_sentiment
+    from sentiment_engines import warm_engines
+
+    # TextBlob parses its sentiment lexicon on first use; VADER when its analyzer is built
+    analyze_sentiment("Warm up the sentiment lexicon")
+    warm_engines()
+    return app
+
+
+def _pre_fork(server, worker):
+    # Move everything loaded so far out of the collector's generations so that
+    # garbage collection in the workers does not write to (and un-share) those pages
+    gc.freeze()
+
+
+def serve(bind: str = DEFAULT_BIND, workers: int = DEFAULT_WORKERS, threads: int = DEFAULT_THREADS,
+          timeout: int = DEFAULT_TIMEOUT, graceful_timeout: int = DEFAULT_GRACEFUL_TIMEOUT,
+          max_requests: int = DEFAULT_MAX_REQUESTS):
+    from gunicorn.app.base import BaseApplication
+
+    class PreloadedApplication(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return preload()
+
+    PreloadedApplication({
+        "bind": bind,
+        "workers": workers,
+        "threads": threads,
+        "worker_class": "gthread" if threads > 1 else "sync",
+        "preload_app": True,
+        "timeout": timeout,
+        "graceful_timeout": graceful_timeout,
+        "max_requests": max_requests,
+        "max_requests_jitter": max_requests // 10,
+        "pre_fork": _pre_fork,
+        "accesslog": "-",
+    }).run()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _send(base_url: str, method: str, path: str, payload) -> float:
+    data = json.dumps(payload).encode() if payload is not None else None
+    request = urllib.request.Request(base_url + path, data=data, method=method,
+                                     headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=60) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+def bench(workers: int, threads: int, requests: int = 600, concurrency: int = 16):
+    """Start the server on a free port, replay BENCH_REQUESTS concurrently and print throughput"""
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--bind", f"127.0.0.1:{port}",
+         "--workers", str(workers), "--threads", str(threads)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.time() + 120
+        while True:
+            try:
+                _send(base_url, "GET", "/health", None)
+                break
+            except OSError:
+                if server.poll() is not None or time.time() > deadline:
+                    raise SystemExit("❌ Server did not start")
+                time.sleep(0.25)
+
+        # Warm every worker's code paths before measuring
+        for method, path, payload in BENCH_REQUESTS * workers:
+            _send(base_url, method, path, payload)
+
+        jobs = [BENCH_REQUESTS[i % len(BENCH_REQUESTS)] for i in range(requests)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(lambda job: _send(base_url, *job), jobs))
+        elapsed = time.perf_counter() - start
+
+        latencies_ms = np.array(latencies) * 1000
+        print(f"🚀 {requests} requests, {workers} workers x {threads} threads, concurrency {concurrency}")
+        print(f"   {requests / elapsed:.1f} requests/second")
+        print(f"   latency p50 {np.percentile(latencies_ms, 50):.1f} ms, "
+              f"p95 {np.percentile(latencies_ms, 95):.1f} ms, p99 {np.percentile(latencies_ms, 99):.1f} ms")
+    finally:
+        server.terminate()
+        server.wait(timeout=DEFAULT_GRACEFUL_TIMEOUT + 5)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the Simfluence AI API with gunicorn")
+    parser.add_argument("--bind", default=DEFAULT_BIND)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS)
+    parser.add_argument("--timeout", type=int, default=DEFAULT_TIMEOUT)
+    parser.add_argument("--graceful-timeout", type=int, default=DEFAULT_GRACEFUL_TIMEOUT)
+    parser.add_argument("--max-requests", type=int, default=DEFAULT_MAX_REQUESTS)
+    parser.add_argument("--bench", action="store_true", help="Benchmark a canned payload mix and exit")
+    parser.add_argument("--bench-requests", type=int, default=600)
+    parser.add_argument("--bench-concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.workers, args.threads, args.bench_requests, args.bench_concurrency)
+    else:
+        serve(args.bind, args.workers, args.threads, args.timeout, args.graceful_timeout, args.max_requests)
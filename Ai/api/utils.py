@@ -1,6 +1,6 @@
 def transform_input_features(data):
-    """Transform user-friendly input to model-ready features"""
-    transformed = {
+    """Fill in defaults for user-friendly input (one-hot encoding is done by the model's FeatureSpec)"""
+    return {
         "length": data.get("length", 0),
         "containsImage": data.get("containsImage", 0),
         "userFollowers": data.get("userFollowers", 0),
@@ -10,23 +10,10 @@ def transform_input_features(data):
         "avgLikes": data.get("avgLikes", 10),
         "avgComments": data.get("avgComments", 2),
         "shouldImprove": 0,
+        "dayOfWeek": data.get("dayOfWeek", "Friday"),
+        "postTimeOfDay": data.get("postTimeOfDay", "Evening"),
+        "topCommentSentiment": data.get("topCommentSentiment", "Positive"),
     }
-    # One-hot encode day of week
-    days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-    day = data.get("dayOfWeek", "Friday")
-    for d in days[:-1]:  # Drop Sunday as reference
-        transformed[f"dayOfWeek_{d}"] = 1 if day == d else 0
-    # One-hot encode time of day
-    times = ["Morning", "Afternoon", "Evening", "Night"]
-    time = data.get("postTimeOfDay", "Evening")
-    for t in times[:-1]:  # Drop Night as reference
-        transformed[f"postTimeOfDay_{t}"] = 1 if time == t else 0
-    # One-hot encode sentiment
-    sentiments = ["Negative", "Neutral", "Positive"]
-    sentiment = data.get("topCommentSentiment", "Positive")
-    for s in sentiments[1:]:  # Drop Negative as reference
-        transformed[f"topCommentSentiment_{s}"] = 1 if sentiment == s else 0
-    return transformed
 
 def generate_optimization_recommendations(results):
     """Generate actionable recommendations based on AI analysis"""
@@ -0,0 +1,185 @@
+"""
+Latency, throughput and memory benchmarks for the text functions.
+
+Each function runs over synthetic texts of several lengths and over batches of
+sample post titles. Results are saved as JSON so runs can be compared, and a
+stored baseline can be used to fail when a function becomes slower.
+
+    python benchmark_suite.py                                   # run, save to ../benchmarks/
+    python benchmark_suite.py --save-baseline                   # also store as the baseline
+    python benchmark_suite.py --baseline ../benchmarks/baseline.json --threshold 20
+"""
+import argparse
+import datetime
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from caption_generator import extract_or_generate_hashtags, generate_caption
+from fast_sentiment import SAMPLE_TITLES, analyze_sentiment_fast
+from sentiment_analyzer import KEYWORD_LEXICONS, analyze_emotion, analyze_sentiment, analyze_sentiment_vader
+from utils import ensure_dir, log, save_json
+
+BENCHMARK_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+DEFAULT_LENGTHS = [10, 100, 1000]   # words per synthetic text
+DEFAULT_BATCH_SIZES = [1, 10, 100]  # sample titles per batch
+# Each measurement repeats until it has this many calls or has run this long
+MIN_CALLS = 30
+MIN_SECONDS = 1.0
+
+# Memoized functions are benchmarked through __wrapped__ so cache hits do not hide the real cost
+FUNCTIONS: Dict[str, Callable[[str], object]] = {
+    "analyze_sentiment": analyze_sentiment.__wrapped__,
+    "analyze_sentiment_vader": analyze_sentiment_vader.__wrapped__,
+    "analyze_sentiment_fast": analyze_sentiment_fast,
+    "analyze_emotion": analyze_emotion.__wrapped__,
+    "generate_caption": lambda text: generate_caption(prompt=text, platform="instagram", include_hashtags=True),
+    "extract_or_generate_hashtags": lambda text: extract_or_generate_hashtags(text, "instagram"),
+}
+
+_FILLER = ("the", "post", "today", "really", "this", "my", "about", "new", "with", "people",
+           "time", "just", "update", "not", "very", "and", "we", "thread", "again", "why")
+
+
+def synthetic_texts(words: int, count: int = 20, seed: int = 42) -> List[str]:
+    """Texts of `words` words mixing filler with sentiment and emotion keywords (about 1 in 5)"""
+    rng = random.Random(seed + words)
+    keywords = [word for lexicon in ("sentiment", "emotion")
+                for category_words in KEYWORD_LEXICONS[lexicon].values() for word in category_words]
+    texts = []
+    for _ in range(count):
+        tokens = [rng.choice(keywords) if rng.random() < 0.2 else rng.choice(_FILLER) for _ in range(words)]
+        texts.append(" ".join(tokens).capitalize() + rng.choice([".", "!", "?"]))
+    return texts
+
+
+def _measure(run_once: Callable[[], None], items_per_run: int) -> Dict:
+    """Time repeated runs of `run_once`, then measure its peak traced memory on one more run"""
+    run_once()  # warm up lazily built lexicons and regexes
+
+    latencies = []
+    started = time.perf_counter()
+    while len(latencies) < MIN_CALLS or time.perf_counter() - started < MIN_SECONDS:
+        start = time.perf_counter()
+        run_once()
+        latencies.append(time.perf_counter() - start)
+    total = sum(latencies)
+
+    tracemalloc.start()
+    run_once()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "runs": len(latencies),
+        "items_per_run": items_per_run,
+        "mean_ms": round(float(latencies_ms.mean()), 4),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(latencies_ms, 95)), 4),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 4),
+        "items_per_second": round(len(latencies) * items_per_run / total, 1),
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+def run_suite(functions: List[str] = None, lengths: List[int] = None, batch_sizes: List[int] = None) -> Dict:
+    """Benchmark every function by text length and by batch size; returns the JSON-ready results"""
+    functions = functions or list(FUNCTIONS)
+    lengths = lengths or DEFAULT_LENGTHS
+    batch_sizes = batch_sizes or DEFAULT_BATCH_SIZES
+
+    results = {}
+    for name in functions:
+        fn = FUNCTIONS[name]
+
+        # Latency per call as the text grows
+        for words in lengths:
+            texts = iter([])
+            corpus = synthetic_texts(words)
+
+            def one_call():
+                nonlocal texts
+                text = next(texts, None)
+                if text is None:
+                    texts = iter(corpus)
+                    text = next(texts)
+                fn(text)
+
+            results[f"{name}|length|{words}"] = _measure(one_call, 1)
+            log(f"{name} length={words}: p50 {results[f'{name}|length|{words}']['p50_ms']} ms", "⏱️")
+
+        # Throughput over batches of sample titles
+        for size in batch_sizes:
+            batch = [SAMPLE_TITLES[i % len(SAMPLE_TITLES)] for i in range(size)]
+            results[f"{name}|batch|{size}"] = _measure(lambda: [fn(text) for text in batch], size)
+            log(f"{name} batch={size}: {results[f'{name}|batch|{size}']['items_per_second']} texts/s", "⏱️")
+
+    return {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold_pct: float) -> List[Dict]:
+    """Measurements whose median latency is more than `threshold_pct` percent above the baseline"""
+    regressions = []
+    for key, result in current["results"].items():
+        before = baseline["results"].get(key)
+        if not before or not before["p50_ms"]:
+            continue
+        change_pct = (result["p50_ms"] / before["p50_ms"] - 1) * 100
+        if change_pct > threshold_pct:
+            regressions.append({"benchmark": key, "baseline_p50_ms": before["p50_ms"],
+                                "p50_ms": result["p50_ms"], "change_pct": round(change_pct, 1)})
+    return regressions
+
+
+if __name__ == "__main__":
+    import json
+
+    parser = argparse.ArgumentParser(description="Benchmark the sentiment, emotion and caption functions")
+    parser.add_argument("--functions", nargs="+", choices=list(FUNCTIONS), default=None)
+    parser.add_argument("--lengths", nargs="+", type=int, default=DEFAULT_LENGTHS)
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=DEFAULT_BATCH_SIZES)
+    parser.add_argument("--output", default=None, help="Results file (default: ../benchmarks/results-<time>.json)")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Also write the results to {BASELINE_PATH}")
+    parser.add_argument("--baseline", default=None, help="Compare against this results file")
+    parser.add_argument("--threshold", type=float, default=20.0,
+                        help="Fail when a median latency is this many percent above the baseline")
+    args = parser.parse_args()
+
+    report = run_suite(args.functions, args.lengths, args.batch_sizes)
+
+    ensure_dir(BENCHMARK_DIR)
+    output = args.output or os.path.join(
+        BENCHMARK_DIR, f"results-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    save_json(report, output)
+    log(f"Saved results to {output}", "💾")
+    if args.save_baseline:
+        save_json(report, BASELINE_PATH)
+        log(f"Saved baseline to {BASELINE_PATH}", "💾")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            for regression in regressions:
+                print(f"❌ {regression['benchmark']}: {regression['baseline_p50_ms']} -> "
+                      f"{regression['p50_ms']} ms ({regression['change_pct']:+}%)")
+            sys.exit(1)
+        print(f"✅ No benchmark more than {args.threshold}% slower than {args.baseline}")
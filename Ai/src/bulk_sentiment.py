@@ -0,0 +1,157 @@
+"""
+Label large comment dumps (CSV or JSONL) with sentiment and emotion.
+
+The input is read in chunks, each chunk is labelled in a worker process and
+written as its own Parquet part file, so memory stays flat however large the
+input is. Re-running the same command resumes after the last completed chunks.
+
+    python bulk_sentiment.py ../data/train-balanced-sarcasm.csv ../data/sarcasm_sentiment \\
+        --text-column comment --engine vader --workers 4
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from sentiment_analyzer import analyze_emotion
+from sentiment_engines import ENGINES, get_engine
+
+DEFAULT_CHUNK_SIZE = 5000
+JOB_FILENAME = "_job.json"
+PART_PATTERN = "part-{:06d}.parquet"
+# Every part file is written with this schema, so chunks whose texts are all empty (all-null
+# labels) still read back together with the rest
+PART_SCHEMA = pa.schema([
+    ("row_id", pa.string()),
+    ("sentiment", pa.string()),
+    ("confidence", pa.float64()),
+    ("dominant_emotion", pa.string()),
+    ("emotion_confidence", pa.float64()),
+])
+
+
+def read_chunks(input_path: str, text_column: str, id_column: Optional[str],
+                chunk_size: int) -> Iterator[Tuple[int, List, List[str]]]:
+    """Yield (chunk index, row ids, texts) without loading the whole file"""
+    columns = [text_column] + ([id_column] if id_column else [])
+    if input_path.endswith((".jsonl", ".json")):
+        reader = pd.read_json(input_path, lines=True, chunksize=chunk_size, dtype=False)
+    else:
+        reader = pd.read_csv(input_path, usecols=columns, chunksize=chunk_size, dtype=str,
+                             keep_default_na=False, on_bad_lines="skip")
+
+    offset = 0
+    for index, chunk in enumerate(reader):
+        texts = chunk[text_column].fillna("").astype(str).tolist()
+        row_ids = chunk[id_column].tolist() if id_column else list(range(offset, offset + len(chunk)))
+        offset += len(chunk)
+        yield index, row_ids, texts
+
+
+def label_chunk(index: int, row_ids: List, texts: List[str], output_dir: str,
+                engine_name: str, with_emotion: bool) -> Tuple[int, int]:
+    """Label one chunk and write it as a Parquet part file; returns (chunk index, rows)"""
+    engine = get_engine(engine_name)
+    rows = []
+    for row_id, text in zip(row_ids, texts):
+        row = {"row_id": None if row_id is None else str(row_id), "sentiment": None, "confidence": None,
+               "dominant_emotion": None, "emotion_confidence": None}
+        if text.strip():
+            result = engine.analyze(text)
+            row["sentiment"] = result["sentiment"]
+            row["confidence"] = float(result["confidence"])
+            if with_emotion:
+                emotion = analyze_emotion(text)
+                row["dominant_emotion"] = emotion["dominant_emotion"]
+                row["emotion_confidence"] = float(emotion["confidence"])
+        rows.append(row)
+
+    # Write under a temporary name and rename, so a part file is either complete or absent
+    part_path = os.path.join(output_dir, PART_PATTERN.format(index))
+    tmp_path = part_path + ".tmp"
+    pq.write_table(pa.Table.from_pylist(rows, schema=PART_SCHEMA), tmp_path)
+    os.replace(tmp_path, part_path)
+    return index, len(rows)
+
+
+def _check_job(output_dir: str, job: Dict):
+    """Refuse to resume into an output directory written with different settings"""
+    job_path = os.path.join(output_dir, JOB_FILENAME)
+    if os.path.exists(job_path):
+        with open(job_path) as f:
+            previous = json.load(f)
+        if previous != job:
+            raise SystemExit(f"❌ {output_dir} was written with different settings: {previous}")
+    else:
+        with open(job_path, "w") as f:
+            json.dump(job, f, indent=2)
+
+
+def run(input_path: str, output_dir: str, text_column: str = "comment", id_column: Optional[str] = None,
+        engine: str = "textblob", with_emotion: bool = True, chunk_size: int = DEFAULT_CHUNK_SIZE,
+        workers: int = os.cpu_count() or 1, report_every: int = 10) -> Dict:
+    """Stream `input_path` through the labelling workers; returns throughput stats"""
+    os.makedirs(output_dir, exist_ok=True)
+    _check_job(output_dir, {"input": os.path.abspath(input_path), "text_column": text_column,
+                            "id_column": id_column, "engine": engine, "emotion": with_emotion,
+                            "chunk_size": chunk_size,
+                            "schema": [f"{field.name}:{field.type}" for field in PART_SCHEMA]})
+    done = {int(name[5:11]) for name in os.listdir(output_dir)
+            if name.startswith("part-") and name.endswith(".parquet")}
+    if done:
+        print(f"🔁 Resuming: {len(done)} chunks already labelled")
+
+    # Build lexicons/analyzers before forking so the workers inherit them
+    get_engine(engine).analyze("warm up")
+
+    start = time.perf_counter()
+    rows_done, chunks_done = 0, 0
+    max_in_flight = max(1, workers) * 2
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        in_flight = set()
+        for index, row_ids, texts in read_chunks(input_path, text_column, id_column, chunk_size):
+            if index in done:
+                continue
+            in_flight.add(pool.submit(label_chunk, index, row_ids, texts, output_dir, engine, with_emotion))
+
+            # Bounded queue: never hold more than a few chunks in memory
+            while len(in_flight) >= max_in_flight:
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    rows_done += future.result()[1]
+                    chunks_done += 1
+                    if chunks_done % report_every == 0:
+                        elapsed = time.perf_counter() - start
+                        print(f"📈 {chunks_done} chunks, {rows_done} rows, {rows_done / elapsed:.0f} rows/s")
+
+        for future in wait(in_flight).done:
+            rows_done += future.result()[1]
+            chunks_done += 1
+
+    elapsed = time.perf_counter() - start
+    stats = {"chunks": chunks_done, "rows": rows_done, "skipped_chunks": len(done),
+             "seconds": round(elapsed, 2), "rows_per_second": round(rows_done / elapsed, 1) if elapsed else 0.0}
+    print(f"✅ Labelled {rows_done} rows in {chunks_done} chunks ({stats['rows_per_second']} rows/s) -> {output_dir}")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Add sentiment and emotion labels to a CSV/JSONL comment dump")
+    parser.add_argument("input", help="CSV or JSONL file")
+    parser.add_argument("output_dir", help="Directory for Parquet part files")
+    parser.add_argument("--text-column", default="comment")
+    parser.add_argument("--id-column", default=None, help="Column copied to row_id (default: row number)")
+    parser.add_argument("--engine", default="textblob", choices=list(ENGINES))
+    parser.add_argument("--no-emotion", action="store_true")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    run(args.input, args.output_dir, args.text_column, args.id_column, args.engine,
+        not args.no_emotion, args.chunk_size, args.workers)
@@ -2,6 +2,8 @@ import os
 from typing import Dict, List
 import random
 
+from text_analysis import TextAnalysis
+
 
 def generate_caption(
     prompt: str,
@@ -9,7 +11,8 @@ def generate_caption(
     tone: str = "casual",
     length: str = "medium",
     include_hashtags: bool = False,
-    target_audience: str = "general"
+    target_audience: str = "general",
+    analysis: TextAnalysis = None
 ) -> Dict:
     """
     Generate AI-powered captions for social media posts
@@ -21,6 +24,7 @@ def generate_caption(
         length: Length preference (short, medium, long)
         include_hashtags: Whether to include hashtags
         target_audience: Target audience description
+        analysis: Optional TextAnalysis of `prompt`, reused for hashtag keywords
 
     Returns:
         Dict with caption, hashtags, confidence, and suggestions
@@ -38,10 +42,11 @@ def generate_caption(
         # Extract hashtags if requested
         hashtags = []
         if include_hashtags:
-            hashtags = extract_or_generate_hashtags(prompt, platform)
+            hashtags = extract_or_generate_hashtags(prompt, platform, analysis)
 
         # Generate suggestions for improvement
-        suggestions = generate_caption_suggestions(generated_caption, platform)
+        suggestions = generate_caption_suggestions(
+            generated_caption, platform, TextAnalysis(generated_caption))
 
         return {
             "caption": generated_caption,
@@ -134,7 +139,7 @@ def generate_template_caption(prompt: str, platform: str, tone: str) -> str:
     return random.choice(tone_templates)
 
 
-def extract_or_generate_hashtags(prompt: str, platform: str) -> List[str]:
+def extract_or_generate_hashtags(prompt: str, platform: str, analysis: TextAnalysis = None) -> List[str]:
     """Generate relevant hashtags based on content"""
 
     # Common hashtags by platform
@@ -145,8 +150,8 @@ def extract_or_generate_hashtags(prompt: str, platform: str) -> List[str]:
     }
 
     # Extract keywords from prompt for custom hashtags
-    keywords = prompt.lower().split()
-    custom_hashtags = [f"#{word}" for word in keywords if len(word) > 3][:3]
+    analysis = analysis or TextAnalysis(prompt)
+    custom_hashtags = [f"#{word}" for word in analysis.content_words()][:3]
 
     # Combine platform-specific and custom hashtags
     base_hashtags = platform_hashtags.get(
@@ -167,26 +172,27 @@ def generate_default_hashtags(platform: str) -> List[str]:
     return defaults.get(platform, [])
 
 
-def generate_caption_suggestions(caption: str, platform: str) -> List[str]:
+def generate_caption_suggestions(caption: str, platform: str, analysis: TextAnalysis = None) -> List[str]:
     """Generate suggestions to improve the caption"""
 
+    analysis = analysis or TextAnalysis(caption)
     suggestions = []
 
     # Check caption length
-    if len(caption) < 20:
+    if analysis.length < 20:
         suggestions.append(
             "Consider adding more detail to increase engagement")
-    elif len(caption) > 200 and platform == "twitter":
+    elif analysis.length > 200 and platform == "twitter":
         suggestions.append(
             "Caption might be too long for Twitter - consider shortening")
 
     # Check for emojis (Instagram/casual platforms)
-    if platform in ["instagram", "facebook"] and "emoji" not in caption.lower():
+    if platform in ["instagram", "facebook"] and not analysis.emojis:
         suggestions.append(
             "Consider adding emojis to make the post more visually appealing")
 
     # Check for questions (engagement)
-    if "?" not in caption:
+    if not analysis.has_question:
         suggestions.append(
             "Add a question to encourage comments and engagement")
 
@@ -1,113 +1,106 @@
 import os
-import pandas as pd
 import numpy as np
-import joblib
-# Removed preprocess import as it's no longer needed
+from model_registry import registry
 
-# Constants
-COMBINED_LIKES_MODEL_PATH = os.path.join("..", "models", "combined_likes_predictor.pkl")
-COMBINED_COMMENTS_MODEL_PATH = os.path.join("..", "models", "combined_comments_predictor.pkl")
-COMBINED_SHARES_MODEL_PATH = os.path.join("..", "models", "combined_shares_predictor.pkl")
+# "auto" uses the multi-output booster when it has been trained, "separate" forces the three boosters
+ENGAGEMENT_MODEL_MODE = os.getenv("ENGAGEMENT_MODEL_MODE", "auto")
 
 def load_combined_models():
-    """Load all combined models"""
-    print("📦 Loading combined models...")
-    
+    """Get all combined models from the process-wide registry"""
     try:
-        likes_model_data = joblib.load(COMBINED_LIKES_MODEL_PATH)
-        comments_model_data = joblib.load(COMBINED_COMMENTS_MODEL_PATH)
-        shares_model_data = joblib.load(COMBINED_SHARES_MODEL_PATH)
+        likes_model_data = registry.get("combined_likes")
+        comments_model_data = registry.get("combined_comments")
+        shares_model_data = registry.get("combined_shares")
         
-        print("✅ All combined models loaded successfully!")
         return likes_model_data, comments_model_data, shares_model_data
     except FileNotFoundError as e:
         print(f"❌ Error: Combined models not found. Please run combined_training.py first.")
         print(f"Missing file: {e}")
         return None, None, None
 
-def prepare_input_features(post_data):
-    """Prepare input features for prediction"""
-    # Create a DataFrame with the input data
-    df = pd.DataFrame([post_data])
-    
-    # Add sarcasm-derived features (using averages from training)
-    df['avg_comment_length'] = 150  # Average from sarcasm dataset
-    df['avg_word_count'] = 25       # Average from sarcasm dataset
-    df['sarcasm_engagement_ratio'] = 0.75  # Average upvote ratio
-    
-    # Create enhanced features
-    df['text_complexity'] = df['length'] * df['avg_word_count']
-    df['engagement_potential'] = df['avgEngagementRate'] * df['sarcasm_engagement_ratio']
-    
-    # Create one-hot encoded categorical features
-    # Time of day features
-    time_slots = ['morning', 'afternoon', 'evening', 'night', 'midnight', 'early_morning']
-    for slot in time_slots:
-        df[f'postTimeOfDay_{slot.title()}'] = 0
-    if 'postTimeOfDay' in df.columns:
-        time_value = df['postTimeOfDay'].iloc[0].lower()
-        if time_value in [slot.lower() for slot in time_slots]:
-            df[f'postTimeOfDay_{time_value.title()}'] = 1
-    
-    # Day of week features
-    days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    for day in days:
-        df[f'dayOfWeek_{day}'] = 0
-    if 'dayOfWeek' in df.columns:
-        day_value = df['dayOfWeek'].iloc[0]
-        if day_value in days:
-            df[f'dayOfWeek_{day_value}'] = 1
+def load_multi_output_model():
+    """Single booster predicting likes, comments and shares together (None if not in use)"""
+    if ENGAGEMENT_MODEL_MODE == "separate":
+        return None
+    return registry.get_optional("combined_engagement")
+
+def load_engagement_predictor():
+    """
+    Return (spec, predict, model_info) for the active engagement model(s), or None
+    `predict` maps a feature matrix to an (n_rows, 3) array of likes/comments/shares
+    """
+    multi_model_data = load_multi_output_model()
+    if multi_model_data is not None:
+        model = multi_model_data['predictor']
+        return (multi_model_data['spec'],
+                lambda X: model.predict(X).reshape(len(X), 3),
+                multi_model_data['dataset_info'])
     
-    # Sentiment features
-    sentiments = ['positive', 'negative', 'neutral', 'humorous']
-    for sentiment in sentiments:
-        df[f'topCommentSentiment_{sentiment.title()}'] = 0
-    if 'topCommentSentiment' in df.columns:
-        sentiment_value = df['topCommentSentiment'].iloc[0].lower()
-        if sentiment_value in [s.lower() for s in sentiments]:
-            df[f'topCommentSentiment_{sentiment_value.title()}'] = 1
+    likes_model_data, comments_model_data, shares_model_data = load_combined_models()
+    if likes_model_data is None:
+        return None
     
-    return df
+    def predict(X):
+        return np.column_stack([
+            likes_model_data['predictor'].predict(X),
+            comments_model_data['predictor'].predict(X),
+            shares_model_data['predictor'].predict(X)
+        ])
+    return likes_model_data['spec'], predict, likes_model_data['dataset_info']
+
+def predict_engagement_batch(posts):
+    """
+    Predict engagement for many posts with one predict call per model
+    
+    Returns a list aligned with `posts`; invalid items carry an `errors` list
+    instead of predictions. Returns None if the models are not available.
+    """
+    predictor = load_engagement_predictor()
+    if predictor is None:
+        return None
+    spec, predict, _ = predictor
+    
+    results = [None] * len(posts)
+    valid_indices = []
+    for i, post in enumerate(posts):
+        errors = spec.validate(post)
+        if errors:
+            results[i] = {'index': i, 'status': 'error', 'errors': errors}
+        else:
+            valid_indices.append(i)
+    
+    if valid_indices:
+        X = spec.transform_many([posts[i] for i in valid_indices])
+        counts = np.maximum(0, np.rint(predict(X))).astype(int)
+        
+        for row, i in enumerate(valid_indices):
+            results[i] = {
+                'index': i,
+                'status': 'success',
+                'predicted_likes': int(counts[row, 0]),
+                'predicted_comments': int(counts[row, 1]),
+                'predicted_shares': int(counts[row, 2])
+            }
+    
+    return results
 
 def predict_engagement(post_data):
     """Predict engagement using combined models"""
     # Load models
-    likes_model_data, comments_model_data, shares_model_data = load_combined_models()
-    
-    if likes_model_data is None:
+    predictor = load_engagement_predictor()
+    if predictor is None:
         return None
+    spec, predict, model_info = predictor
     
-    # Prepare input features
-    input_df = prepare_input_features(post_data)
-    
-    # Get feature columns from the model
-    feature_columns = likes_model_data['features']
-    
-    # Ensure all required features are present
-    missing_features = set(feature_columns) - set(input_df.columns)
-    if missing_features:
-        print(f"⚠️ Missing features: {missing_features}")
-        # Add missing features with default values
-        for feature in missing_features:
-            input_df[feature] = 0
-    
-    # Select only the features used by the model
-    X = input_df[feature_columns]
-    
-    # Make predictions
-    likes_model = likes_model_data['model']
-    comments_model = comments_model_data['model']
-    shares_model = shares_model_data['model']
-    
-    predicted_likes = likes_model.predict(X)[0]
-    predicted_comments = comments_model.predict(X)[0]
-    predicted_shares = shares_model.predict(X)[0]
+    # Encode the request straight into the model's input vector and predict all targets
+    X = spec.transform(post_data).reshape(1, -1)
+    predicted_likes, predicted_comments, predicted_shares = predict(X)[0]
     
     return {
         'predicted_likes': max(0, int(round(predicted_likes))),
         'predicted_comments': max(0, int(round(predicted_comments))),
         'predicted_shares': max(0, int(round(predicted_shares))),
-        'model_info': likes_model_data['dataset_info']
+        'model_info': model_info
     }
 
 def predict_from_text(post_text, user_data=None):
@@ -1,4 +1,7 @@
 import os
+import io
+import time
+import argparse
 import pandas as pd
 import numpy as np
 import joblib
@@ -7,11 +10,21 @@ from sklearn.metrics import mean_squared_error, r2_score
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 import re
+from model_registry import MODELS_DIR
+from feature_spec import COMBINED_CONSTANTS, combined_engagement_spec, spec_path_for
+from utils import save_json
 
-# Constants
-SIMFLUENCE_DATA_PATH = os.path.join("..", "data", "simfluence_reddit_training_ultimate.csv")
-SARCASM_DATA_PATH = os.path.join("..", "data", "train-balanced-sarcasm.csv")
-MODEL_SAVE_PATH = os.path.join("..", "models", "combined_likes_predictor.pkl")
+# Constants (resolved from this file, so training works from any working directory)
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data"))
+SIMFLUENCE_DATA_PATH = os.path.join(DATA_DIR, "simfluence_reddit_training_ultimate.csv")
+SARCASM_DATA_PATH = os.path.join(DATA_DIR, "train-balanced-sarcasm.csv")
+MODEL_SAVE_PATH = os.path.join(MODELS_DIR, "combined_likes_predictor.pkl")
+MULTI_OUTPUT_MODEL_PATH = os.path.join(MODELS_DIR, "combined_engagement_predictor.pkl")
+BENCHMARK_RESULTS_PATH = os.path.join(MODELS_DIR, "multi_output_benchmark.json")
+
+TARGET_COLUMNS = ['receivedLikes', 'receivedComments', 'receivedShares']
+TARGET_NAMES = ['likes', 'comments', 'shares']
+NON_FEATURE_COLUMNS = TARGET_COLUMNS + ['suggestions', 'postText', 'hashtags']
 
 def load_simfluence_data():
     """Load and preprocess the simfluence dataset"""
@@ -219,19 +232,25 @@ def train_combined_models(combined_df):
         "model": likes_model,
         "features": feature_columns,
         "dataset_info": "Combined Simfluence + Sarcasm"
-    }, os.path.join("..", "models", "combined_likes_predictor.pkl"))
+    }, os.path.join(MODELS_DIR, "combined_likes_predictor.pkl"))
     
     joblib.dump({
         "model": comments_model,
         "features": feature_columns,
         "dataset_info": "Combined Simfluence + Sarcasm"
-    }, os.path.join("..", "models", "combined_comments_predictor.pkl"))
+    }, os.path.join(MODELS_DIR, "combined_comments_predictor.pkl"))
     
     joblib.dump({
         "model": shares_model,
         "features": feature_columns,
         "dataset_info": "Combined Simfluence + Sarcasm"
-    }, os.path.join("..", "models", "combined_shares_predictor.pkl"))
+    }, os.path.join(MODELS_DIR, "combined_shares_predictor.pkl"))
+    
+    # Save the compiled feature schema next to each model so serving encodes
+    # requests exactly like training (including the sarcasm-derived constants)
+    spec = combined_engagement_spec(feature_columns, _combined_constants(combined_df))
+    for name in ['likes', 'comments', 'shares']:
+        spec.save(spec_path_for(os.path.join(MODELS_DIR, f"combined_{name}_predictor.pkl")))
     
     return {
         'likes_model': likes_model,
@@ -245,7 +264,125 @@ def train_combined_models(combined_df):
         }
     }
 
-def main():
+def _combined_constants(combined_df):
+    """Sarcasm-derived constants actually present in the training frame"""
+    return {name: float(combined_df[name].iloc[0]) if name in combined_df.columns else value
+            for name, value in COMBINED_CONSTANTS.items()}
+
+def _split_multi_target(combined_df):
+    """Same 80/20 split as train_combined_models, with all three targets kept together"""
+    feature_columns = [col for col in combined_df.columns if col not in NON_FEATURE_COLUMNS]
+    X = combined_df[feature_columns]
+    Y = combined_df[TARGET_COLUMNS]
+    X_train, X_test, Y_train, Y_test = train_test_split(X, Y, test_size=0.2, random_state=42)
+    return feature_columns, X_train, X_test, Y_train, Y_test
+
+def _multi_output_regressor():
+    # One tree per boosting round predicts likes, comments and shares together
+    return XGBRegressor(n_estimators=200, learning_rate=0.1, random_state=42,
+                        tree_method="hist", multi_strategy="multi_output_tree")
+
+def _target_metrics(Y_test, Y_pred):
+    return {
+        name: {
+            'mse': float(mean_squared_error(Y_test.iloc[:, i], Y_pred[:, i])),
+            'r2': float(r2_score(Y_test.iloc[:, i], Y_pred[:, i]))
+        }
+        for i, name in enumerate(TARGET_NAMES)
+    }
+
+def train_multi_output_model(combined_df):
+    """Train a single multi-target booster for likes, comments and shares"""
+    print("🚀 Training multi-output engagement model...")
+    
+    feature_columns, X_train, X_test, Y_train, Y_test = _split_multi_target(combined_df)
+    
+    model = _multi_output_regressor()
+    model.fit(X_train, Y_train)
+    
+    metrics = _target_metrics(Y_test, model.predict(X_test))
+    for name, values in metrics.items():
+        print(f"✅ Multi-output {name} - MSE: {values['mse']:.2f}, R²: {values['r2']:.3f}")
+    
+    print("💾 Saving multi-output model...")
+    joblib.dump({
+        "model": model,
+        "features": feature_columns,
+        "targets": TARGET_NAMES,
+        "dataset_info": "Combined Simfluence + Sarcasm (multi-output)"
+    }, MULTI_OUTPUT_MODEL_PATH)
+    combined_engagement_spec(feature_columns, _combined_constants(combined_df)).save(
+        spec_path_for(MULTI_OUTPUT_MODEL_PATH))
+    
+    return {
+        'model': model,
+        'feature_columns': feature_columns,
+        'metrics': metrics
+    }
+
+def _artifact_size(model):
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    return buffer.tell()
+
+def _median_latency_ms(predict, X, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict(X)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+def benchmark_multi_output(combined_df, repeats=200):
+    """
+    Compare three separate boosters against one multi-output booster:
+    single-row and batch latency, artifact size and per-target accuracy
+    """
+    print("⏱️ Benchmarking three separate models vs one multi-output model...")
+    
+    feature_columns, X_train, X_test, Y_train, Y_test = _split_multi_target(combined_df)
+    
+    separate = []
+    for i in range(len(TARGET_COLUMNS)):
+        model = XGBRegressor(n_estimators=200, learning_rate=0.1, random_state=42)
+        model.fit(X_train, Y_train.iloc[:, i])
+        separate.append(model)
+    multi = _multi_output_regressor()
+    multi.fit(X_train, Y_train)
+    
+    def predict_separate(X):
+        return np.column_stack([model.predict(X) for model in separate])
+    
+    X_row = X_test.iloc[:1].to_numpy(dtype=np.float32)
+    X_batch = X_test.to_numpy(dtype=np.float32)
+    
+    results = {}
+    for name, predict, size in [
+        ('separate', predict_separate, sum(_artifact_size(m) for m in separate)),
+        ('multi_output', multi.predict, _artifact_size(multi)),
+    ]:
+        results[name] = {
+            'single_row_ms': _median_latency_ms(predict, X_row, repeats),
+            'batch_ms': _median_latency_ms(predict, X_batch, max(1, repeats // 10)),
+            'batch_rows': int(len(X_batch)),
+            'artifact_bytes': int(size),
+            'metrics': _target_metrics(Y_test, predict(X_test))
+        }
+    
+    print("\n📊 MULTI-OUTPUT BENCHMARK")
+    print("=" * 60)
+    for name, values in results.items():
+        print(f"{name:>13}: single row {values['single_row_ms']:.3f} ms, "
+              f"batch of {values['batch_rows']} {values['batch_ms']:.2f} ms, "
+              f"{values['artifact_bytes'] / 1024:.0f} KB")
+        for target, m in values['metrics'].items():
+            print(f"{'':>15}{target}: MSE={m['mse']:.2f}, R²={m['r2']:.3f}")
+    
+    save_json(results, BENCHMARK_RESULTS_PATH)
+    print(f"✅ Benchmark results saved to {BENCHMARK_RESULTS_PATH}")
+    return results
+
+def main(multi_output=False, benchmark=False):
     """Main training function"""
     print("🎯 COMBINED DATASET TRAINING")
     print("=" * 60)
@@ -260,9 +397,15 @@ def main():
         print("🔄 Combining datasets...")
         combined_df = combine_datasets(simfluence_df, sarcasm_df, sarcasm_features)
         
+        if benchmark:
+            benchmark_multi_output(combined_df)
+            return
+        
         # Train models
         print("🚀 Training models...")
         results = train_combined_models(combined_df)
+        if multi_output:
+            train_multi_output_model(combined_df)
         
         # Print summary
         print("\n📈 TRAINING SUMMARY")
@@ -273,7 +416,7 @@ def main():
         for metric, values in results['metrics'].items():
             print(f"  {metric.capitalize()}: MSE={values['mse']:.2f}, R²={values['r2']:.3f}")
         
-        print(f"\n✅ Models saved to ../models/")
+        print(f"\n✅ Models saved to {MODELS_DIR}")
         print("🎉 Combined training completed successfully!")
         
     except Exception as e:
@@ -288,6 +431,8 @@ def main():
             # Train with simfluence data only
             print("🚀 Training with simfluence data only...")
             results = train_combined_models(simfluence_df)
+            if multi_output:
+                train_multi_output_model(simfluence_df)
             
             print("\n📈 FALLBACK TRAINING SUMMARY")
             print("=" * 60)
@@ -297,7 +442,7 @@ def main():
             for metric, values in results['metrics'].items():
                 print(f"  {metric.capitalize()}: MSE={values['mse']:.2f}, R²={values['r2']:.3f}")
             
-            print(f"\n✅ Models saved to ../models/")
+            print(f"\n✅ Models saved to {MODELS_DIR}")
             print("🎉 Fallback training completed successfully!")
             
         except Exception as fallback_error:
@@ -305,4 +450,10 @@ def main():
             print("💡 Please check your data files and try again.")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Train the combined engagement models")
+    parser.add_argument("--multi-output", action="store_true",
+                        help="also train a single multi-output booster for likes/comments/shares")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="compare separate vs multi-output models instead of training")
+    args = parser.parse_args()
+    main(multi_output=args.multi_output, benchmark=args.benchmark) 
\ No newline at end of file
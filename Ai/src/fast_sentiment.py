@@ -0,0 +1,302 @@
+"""
+Lexicon-only sentiment for high-volume paths.
+
+TextBlob's sentiment lexicon (en-sentiment.xml) and our sentiment keyword lists
+are flattened once into a single dict of token -> (polarity, subjectivity,
+intensity, is_modifier, keyword). A text is then scored in one pass over its
+tokens, following TextBlob's rules: intensifiers ("very good") scale the next
+word, negations ("not good") flip and halve it, "!" boosts the previous word and
+emoticons count as words. Unlike TextBlob, "n't" contractions negate too.
+
+Agreement with analyze_sentiment on SAMPLE_TITLES: the final label matches on
+all 67 titles and the polarity label (> 0.1 / < -0.1) on 64; the three that
+differ are contractions such as "isn't good", which TextBlob reads as positive.
+Re-measure on a real dump with
+
+    python fast_sentiment.py ../data/train-balanced-sarcasm.csv --column comment
+"""
+import argparse
+import re
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from sentiment_analyzer import KEYWORD_LEXICONS, analyze_sentiment, analyze_sentiment_keywords, combine_sentiment_scores
+
+# Measured with `python fast_sentiment.py` on SAMPLE_TITLES (see module docstring)
+AGREEMENT_RATE = {"label": 1.0, "polarity_label": 0.955}
+
+NEGATIONS = frozenset(("no", "not", "n't", "never"))
+
+# Short, post-title style texts used to measure agreement with TextBlob
+SAMPLE_TITLES = [
+    "This is the best pizza I have ever had",
+    "Worst customer service experience of my life",
+    "My cat knocked my coffee off the table again",
+    "I'm not happy with how this turned out",
+    "Finally finished my first marathon!",
+    "Really disappointed with the new update",
+    "Just a regular Tuesday at the office",
+    "Absolutely stunning sunset over the lake tonight",
+    "Why is everything so expensive now?",
+    "The new season is not bad at all",
+    "Can anyone recommend a good budget laptop?",
+    "My landlord is ignoring a broken heater in winter",
+    "Very happy with my new garden setup :)",
+    "I hate Mondays so much",
+    "This game is incredibly fun with friends",
+    "TIL octopuses have three hearts",
+    "My code finally works and I don't know why",
+    "Terrible weather ruined our camping trip",
+    "Made homemade bread for the first time, pretty proud",
+    "Is it normal for my dog to sleep this much?",
+    "The movie was okay, nothing special",
+    "What a beautiful day to go hiking!!",
+    "Lost my wallet and my phone on the same day",
+    "Our team won the championship!",
+    "This product is useless and a waste of money",
+    "Just got promoted at work, so excited",
+    "Anyone else find this update really confusing?",
+    "Simple tips to keep your plants alive",
+    "My grandmother turned 100 today",
+    "This is honestly the most frustrating bug I've seen",
+    "Never buying from this store again",
+    "Quick question about tax forms",
+    "Look at this amazing view from my balcony",
+    "The ending of that show was so sad",
+    "I can't believe how good this soup is",
+    "Traffic was awful this morning",
+    "Perfect weekend with the family",
+    "My first attempt at painting, be gentle",
+    "The service here is slow but the food is great",
+    "Feeling a bit lonely lately",
+    "Does anyone know a fix for this error?",
+    "Built a bookshelf from scrap wood",
+    "Horrible experience with the airline, never again",
+    "Such a cute puppy <3",
+    "This is not the worst idea I've heard",
+    "Interesting article about climate policy",
+    "My kid drew this and I love it",
+    "The concert was loud and chaotic but fun",
+    "Huge thanks to the stranger who helped me today",
+    "I'm so tired of this nonsense",
+    "New personal record at the gym!",
+    "The instructions were clear and easy to follow",
+    "Why does my sourdough keep failing?",
+    "Honestly a pretty average burger",
+    "Caught my first fish today :D",
+    "Rent increased again, this is ridiculous",
+    "What's your favorite underrated movie?",
+    "Extremely rare coin I found in my change",
+    "Sad news about the local bookstore closing",
+    "The hotel room was clean and comfortable",
+    "Not sure how I feel about this redesign",
+    "Brilliant performance by the whole cast",
+    "Weird noise coming from my car engine",
+    "This update isn't good at all",
+    "The sequel wasn't bad, kind of fun actually",
+    "I don't love the new logo",
+    "Why didn't anyone tell me about this great trick?",
+]
+
+
+def _clamp(value: float) -> float:
+    return max(-1.0, min(value, 1.0))
+
+
+class FastSentimentAnalyzer:
+    """Precomputed polarity table plus a single-pass scorer"""
+
+    def __init__(self):
+        from textblob.en import sentiment as pattern_lexicon
+        from textblob._text import EMOTICONS
+
+        pattern_lexicon.get("good")  # the lexicon XML is parsed on first access
+
+        # token -> (polarity, subjectivity, intensity, is_modifier, keyword); polarity is
+        # None for keyword-only words, which TextBlob does not score
+        table = {}
+        for word, senses in dict.items(pattern_lexicon):
+            polarity, subjectivity, intensity = senses[None]
+            is_modifier = any(pos in pattern_lexicon.modifiers for pos in senses)
+            table[word] = (polarity, subjectivity, intensity, is_modifier, None)
+        for category, words in KEYWORD_LEXICONS["sentiment"].items():
+            for word in words:
+                entry = table.get(word, (None, None, None, False, None))
+                table[word] = entry[:4] + (category,)
+        self.table = table
+
+        # Emoticons that TextBlob recognizes (it skips purely alphabetic ones such as "xd")
+        self.emoticons = {emoticon.lower(): polarity
+                          for (_, polarity), emoticons in EMOTICONS.items()
+                          for emoticon in emoticons if not emoticon.isalpha()}
+        emoticon_pattern = "|".join(re.escape(e) for e in sorted(self.emoticons, key=len, reverse=True))
+        self.token_re = re.compile(
+            rf"(?<!\S)(?:{emoticon_pattern})(?!\S)"  # emoticons, as whole tokens
+            r"|\(!\)"                                  # sarcasm marker
+            r"|[a-z0-9]+(?=n't\b)|n't"                 # "don't" -> "do", "n't"
+            r"|[a-z0-9]+(?:[-'][a-z0-9]+)*"            # words, "so-so", "it's"
+            r"|[^\w\s]"                                # punctuation, one mark at a time
+        )
+
+    def score(self, text: str) -> Tuple[float, float, Dict[str, List[str]]]:
+        """(polarity, subjectivity, sentiment keywords found per category) for `text`"""
+        table, emoticons = self.table, self.emoticons
+        assessments = []  # [polarity, subjectivity, intensity, negated]
+        keywords = {"positive": [], "negative": [], "neutral": []}
+        modifier = None   # preceding known adverb ("very")
+        negated = False   # preceding negation ("not")
+
+        for word in self.token_re.findall(text.lower()):
+            entry = table.get(word)
+            if entry is not None and entry[4] is not None and word not in keywords[entry[4]]:
+                keywords[entry[4]].append(word)
+
+            if entry is not None and entry[0] is not None:
+                polarity, subjectivity, intensity, is_modifier, _ = entry
+                if modifier is None:
+                    assessments.append([polarity, subjectivity, intensity, False])
+                else:
+                    last = assessments[-1]
+                    last[0] = _clamp(polarity * last[2])
+                    last[1] = _clamp(subjectivity * last[2])
+                    last[2] = intensity
+                if negated:
+                    assessments[-1][2] = 1.0 / assessments[-1][2]
+                    assessments[-1][3] = True
+                modifier = word if is_modifier else None
+                negated = word in NEGATIONS
+                continue
+
+            if word in NEGATIONS:
+                negated = True
+            elif negated and len(word.strip("'")) > 1:
+                negated = False  # negation carries over short words only ("not a good")
+            if negated and modifier is not None and modifier.endswith("ly"):
+                assessments[-1][3] = True  # "really not good"
+                negated = False
+            elif modifier is not None and len(word) > 2:
+                modifier = None
+            if word == "!" and assessments:
+                assessments[-1][0] = _clamp(assessments[-1][0] * 1.25)
+            elif word == "(!)":
+                assessments.append([0.0, 1.0, 1.0, False])
+            elif word in emoticons:
+                assessments.append([emoticons[word], 1.0, 1.0, False])
+
+        if not assessments:
+            return 0.0, 0.0, keywords
+        count = len(assessments)
+        polarity = sum(p * -0.5 if neg else p for p, _, _, neg in assessments) / count
+        subjectivity = sum(a[1] for a in assessments) / count
+        return polarity, subjectivity, keywords
+
+    def analyze(self, text: str) -> Dict:
+        """Same response schema as analyze_sentiment"""
+        polarity, subjectivity, keywords = self.score(text)
+
+        if polarity > 0.1:
+            sentiment = "positive"
+        elif polarity < -0.1:
+            sentiment = "negative"
+        else:
+            sentiment = "neutral"
+
+        # Keyword scores from the same pass, in the shape keyword_matcher produces
+        found = [{"word": word, "category": category}
+                 for category, words in KEYWORD_LEXICONS["sentiment"].items()
+                 for word in words if word in keywords[category]]
+        matches = {"sentiment": {"distinct": {c: len(w) for c, w in keywords.items()}, "keywords": found}}
+        enhanced_scores = analyze_sentiment_keywords(text, matches)
+
+        return {
+            "sentiment": combine_sentiment_scores(sentiment, enhanced_scores, polarity),
+            "confidence": round(min(abs(polarity) + 0.3, 1.0), 2),
+            "scores": {
+                "polarity": round(polarity, 2),
+                "subjectivity": round(subjectivity, 2),
+                "positive_score": enhanced_scores["positive"],
+                "negative_score": enhanced_scores["negative"],
+                "neutral_score": enhanced_scores["neutral"]
+            },
+            "keywords": enhanced_scores["keywords"]
+        }
+
+
+_fast_analyzer = None
+_fast_analyzer_lock = threading.Lock()
+
+
+def get_fast_analyzer() -> FastSentimentAnalyzer:
+    """Process-wide analyzer; the polarity table is built on first use"""
+    global _fast_analyzer
+    if _fast_analyzer is None:
+        with _fast_analyzer_lock:
+            if _fast_analyzer is None:
+                _fast_analyzer = FastSentimentAnalyzer()
+    return _fast_analyzer
+
+
+def analyze_sentiment_fast(text: str) -> Dict:
+    """
+    Lexicon-only sentiment, typically well under 50µs for a title.
+
+    Not cached: scoring costs about as much as a cache lookup would.
+    """
+    return get_fast_analyzer().analyze(text)
+
+
+def agreement_rate(texts: List[str]) -> Dict:
+    """How often the fast mode agrees with analyze_sentiment (TextBlob) on `texts`"""
+    analyzer = get_fast_analyzer()
+    same_label = same_polarity_label = 0
+    polarity_error = 0.0
+    for text in texts:
+        fast = analyzer.analyze(text)
+        full = analyze_sentiment.__wrapped__(text)
+        same_label += fast["sentiment"] == full["sentiment"]
+        fast_polarity, full_polarity = fast["scores"]["polarity"], full["scores"]["polarity"]
+        same_polarity_label += (fast_polarity > 0.1, fast_polarity < -0.1) == (full_polarity > 0.1, full_polarity < -0.1)
+        polarity_error += abs(fast_polarity - full_polarity)
+    n = max(len(texts), 1)
+    return {
+        "texts": len(texts),
+        "label_agreement": round(same_label / n, 3),
+        "polarity_label_agreement": round(same_polarity_label / n, 3),
+        "mean_abs_polarity_diff": round(polarity_error / n, 3),
+    }
+
+
+def _median_us(fn, texts: List[str], repeat: int = 5) -> float:
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            fn(text)
+        runs.append((time.perf_counter() - start) / len(texts))
+    return sorted(runs)[len(runs) // 2] * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Agreement and speed of the fast sentiment mode vs TextBlob")
+    parser.add_argument("csv", nargs="?", help="Optional CSV to sample texts from (default: SAMPLE_TITLES)")
+    parser.add_argument("--column", default="comment")
+    parser.add_argument("--sample", type=int, default=5000)
+    args = parser.parse_args()
+
+    if args.csv:
+        import pandas as pd
+        frame = pd.read_csv(args.csv, usecols=[args.column], dtype=str, nrows=args.sample * 4).dropna()
+        texts = frame[args.column].sample(min(args.sample, len(frame)), random_state=42).tolist()
+    else:
+        texts = SAMPLE_TITLES
+
+    start = time.perf_counter()
+    get_fast_analyzer()
+    print(f"📚 Built polarity table ({len(get_fast_analyzer().table)} tokens) in "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms")
+
+    print(f"🤝 Agreement with TextBlob: {agreement_rate(texts)}")
+    fast_us = _median_us(analyze_sentiment_fast, texts)
+    full_us = _median_us(analyze_sentiment.__wrapped__, texts, repeat=3)
+    print(f"⚡ fast {fast_us:.1f} µs/text vs textblob {full_us:.1f} µs/text ({full_us / fast_us:.0f}x)")
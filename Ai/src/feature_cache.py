@@ -0,0 +1,78 @@
+"""
+Per-file cache of engineered training features.
+
+Each source file's engineered frame is stored as Parquet under a name made of
+the source, a hash of the file's content and the feature pipeline version.
+A retrain only re-engineers files whose content changed (or that are new) and
+loads the rest from the cache; bumping the pipeline version invalidates all of it.
+"""
+import hashlib
+import os
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def file_content_hash(path: str) -> str:
+    """sha256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FeatureCache:
+    """Parquet files named <source>__<content hash>__<pipeline version>.parquet"""
+
+    def __init__(self, cache_dir: str, version: str):
+        self.cache_dir = cache_dir
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, file_path: str) -> str:
+        return f"{file_content_hash(file_path)[:16]}__{self.version}"
+
+    def path(self, source: str, key: str) -> str:
+        """Parquet file holding the entry for (source, key), whether or not it exists yet"""
+        return os.path.join(self.cache_dir, f"{source}__{key}.parquet")
+
+    def _entries(self, source: str):
+        prefix = f"{source}__"
+        return [name for name in os.listdir(self.cache_dir)
+                if name.startswith(prefix) and name.endswith(".parquet") and name.count("__") == 2]
+
+    def get(self, source: str, key: str) -> Optional[pd.DataFrame]:
+        path = self.path(source, key)
+        if not os.path.exists(path):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pd.read_parquet(path)
+
+    def put(self, source: str, key: str, df: pd.DataFrame):
+        """Store the frame for this content, replacing entries for older content of the same source"""
+        path = self.path(source, key)
+        tmp_path = path + ".tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        for name in self._entries(source):
+            if name != os.path.basename(path):
+                os.remove(os.path.join(self.cache_dir, name))
+
+    def prune(self, sources: Iterable[str]) -> int:
+        """Remove entries whose source file no longer exists; returns how many were removed"""
+        keep = set(sources)
+        removed = 0
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".parquet") and name.count("__") == 2 and name.split("__")[0] not in keep:
+                os.remove(os.path.join(self.cache_dir, name))
+                removed += 1
+        return removed
+
+    def stats(self) -> Dict:
+        return {"cache_dir": self.cache_dir, "version": self.version, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,206 @@
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+SPEC_VERSION = 1
+
+# Raw categorical request fields shared by the engagement models
+ENGAGEMENT_CATEGORICAL_FIELDS = ['postTimeOfDay', 'dayOfWeek', 'topCommentSentiment']
+
+# Sarcasm-derived features added by combined_training.combine_datasets
+COMBINED_CONSTANTS = {
+    'avg_comment_length': 150,
+    'avg_word_count': 25,
+    'sarcasm_engagement_ratio': 0.75,
+}
+COMBINED_PRODUCTS = {
+    'text_complexity': ['length', 'avg_word_count'],
+    'engagement_potential': ['avgEngagementRate', 'sarcasm_engagement_ratio'],
+}
+
+
+def normalize_category(value) -> str:
+    """Canonical form of a category so 'Evening', 'evening' and 'early_morning' match the trained columns"""
+    return str(value).strip().lower().replace('_', ' ')
+
+
+class FeatureSpec:
+    """
+    Compiled description of a model's input vector.
+
+    The column order, one-hot slots and derived features are resolved once, so a
+    request dict (or a list of them) becomes a float32 numpy array without pandas.
+    Categories without a column (e.g. the reference level dropped at training time)
+    encode as all zeros; missing numeric fields encode as 0.
+    """
+
+    def __init__(self,
+                 feature_columns: List[str],
+                 categorical_fields: Optional[List[str]] = None,
+                 constants: Optional[Dict[str, float]] = None,
+                 products: Optional[Dict[str, List[str]]] = None):
+        self.feature_columns = list(feature_columns)
+        self.categorical_fields = list(categorical_fields or [])
+        self.constants = dict(constants or {})
+        self.products = {name: list(factors) for name, factors in (products or {}).items()}
+        self._compile()
+
+    def _compile(self):
+        self.column_index = {col: i for i, col in enumerate(self.feature_columns)}
+        self.n_features = len(self.feature_columns)
+
+        # field -> {normalized category -> column index}
+        self.one_hot_slots = {field: {} for field in self.categorical_fields}
+        for col, idx in self.column_index.items():
+            for field in self.categorical_fields:
+                prefix = f'{field}_'
+                if col.startswith(prefix):
+                    self.one_hot_slots[field].setdefault(normalize_category(col[len(prefix):]), idx)
+
+        derived = set(self.constants) | set(self.products)
+        # Columns read straight from the request (numeric fields and pre-encoded one-hot columns)
+        self.direct_slots = [(col, idx) for col, idx in self.column_index.items() if col not in derived]
+        self.numeric_fields = [
+            col for col, _ in self.direct_slots
+            if not any(col.startswith(f'{field}_') for field in self.categorical_fields)
+        ]
+        self.constant_slots = [(self.column_index[name], value)
+                               for name, value in self.constants.items() if name in self.column_index]
+        self.product_slots = [(self.column_index[name], factors)
+                              for name, factors in self.products.items() if name in self.column_index]
+
+    def validate(self, record) -> List[str]:
+        """Return validation errors for one request dict (empty when valid)"""
+        if not isinstance(record, dict):
+            return ["Each item must be a JSON object"]
+
+        errors = []
+        for field in self.numeric_fields:
+            value = record.get(field)
+            if value is not None and (isinstance(value, str) or not np.isscalar(value)):
+                errors.append(f"Field '{field}' must be numeric")
+        for field in self.categorical_fields:
+            value = record.get(field)
+            if value is not None and not isinstance(value, str):
+                errors.append(f"Field '{field}' must be a string")
+        return errors
+
+    def _value(self, record: Dict, name: str) -> float:
+        if name in self.constants:
+            return self.constants[name]
+        return record.get(name) or 0
+
+    def transform(self, record: Dict) -> np.ndarray:
+        """Encode one request dict as a 1-D float32 vector"""
+        x = np.zeros(self.n_features, dtype=np.float32)
+        for col, idx in self.direct_slots:
+            value = record.get(col)
+            if value:
+                x[idx] = value
+        for idx, value in self.constant_slots:
+            x[idx] = value
+        for idx, (a, b) in self.product_slots:
+            x[idx] = self._value(record, a) * self._value(record, b)
+        for field, slots in self.one_hot_slots.items():
+            value = record.get(field)
+            if value:
+                idx = slots.get(normalize_category(value))
+                if idx is not None:
+                    x[idx] = 1
+        return x
+
+    def transform_many(self, records: List[Dict]) -> np.ndarray:
+        """Encode a list of request dicts as a 2-D float32 matrix in one pass per column"""
+        n_rows = len(records)
+        X = np.zeros((n_rows, self.n_features), dtype=np.float32)
+        if n_rows == 0:
+            return X
+
+        for col, idx in self.direct_slots:
+            X[:, idx] = np.fromiter((record.get(col) or 0 for record in records),
+                                    dtype=np.float64, count=n_rows)
+        for idx, value in self.constant_slots:
+            X[:, idx] = value
+        for idx, factors in self.product_slots:
+            columns = []
+            for name in factors:
+                if name in self.constants:
+                    columns.append(np.float64(self.constants[name]))
+                else:
+                    columns.append(np.fromiter((record.get(name) or 0 for record in records),
+                                               dtype=np.float64, count=n_rows))
+            X[:, idx] = columns[0] * columns[1]
+
+        # Scatter every one-hot 1 with a single fancy-index assignment
+        rows, cols = [], []
+        for field, slots in self.one_hot_slots.items():
+            for row, record in enumerate(records):
+                value = record.get(field)
+                if value:
+                    idx = slots.get(normalize_category(value))
+                    if idx is not None:
+                        rows.append(row)
+                        cols.append(idx)
+        if rows:
+            X[rows, cols] = 1
+        return X
+
+    def to_dict(self) -> Dict:
+        return {
+            'version': SPEC_VERSION,
+            'feature_columns': self.feature_columns,
+            'categorical_fields': self.categorical_fields,
+            'constants': self.constants,
+            'products': self.products,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'FeatureSpec':
+        return cls(
+            feature_columns=data['feature_columns'],
+            categorical_fields=data.get('categorical_fields'),
+            constants=data.get('constants'),
+            products=data.get('products'),
+        )
+
+    def save(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> 'FeatureSpec':
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def spec_path_for(model_path: str) -> str:
+    """Location of the spec saved next to a model artifact"""
+    return os.path.splitext(model_path)[0] + '.spec.json'
+
+
+def engagement_spec(feature_columns: List[str]) -> FeatureSpec:
+    """Spec for the legacy likes/comments/shares models"""
+    return FeatureSpec(feature_columns, ENGAGEMENT_CATEGORICAL_FIELDS)
+
+
+def combined_engagement_spec(feature_columns: List[str],
+                             constants: Optional[Dict[str, float]] = None) -> FeatureSpec:
+    """Spec for the combined Simfluence + Sarcasm models"""
+    return FeatureSpec(feature_columns, ENGAGEMENT_CATEGORICAL_FIELDS,
+                       constants=constants or COMBINED_CONSTANTS, products=COMBINED_PRODUCTS)
+
+
+if __name__ == "__main__":
+    # Write specs next to the existing model artifacts
+    from model_registry import registry, SPEC_BUILDERS
+
+    for name, filename in registry.model_files.items():
+        model_path = os.path.join(registry.models_dir, filename)
+        if not os.path.exists(model_path):
+            continue
+        artifact = registry.get(name)
+        spec = SPEC_BUILDERS[name](artifact['features'])
+        spec.save(spec_path_for(model_path))
+        print(f"✅ Saved feature spec for {name} ({spec.n_features} features)")
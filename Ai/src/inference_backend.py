@@ -0,0 +1,396 @@
+import json
+import os
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+# Backend used when a model has no explicit override: "numpy", "xgboost" or "onnx"
+DEFAULT_BACKEND = os.getenv("INFERENCE_BACKEND", "numpy")
+
+# Per-model overrides, e.g. INFERENCE_BACKENDS="combined_likes=xgboost,time_global=onnx"
+BACKEND_OVERRIDES = dict(
+    item.split("=", 1) for item in os.getenv("INFERENCE_BACKENDS", "").split(",") if "=" in item
+)
+
+# Objectives whose prediction is the raw margin, or a known transform of it
+_IDENTITY_OBJECTIVES = {"reg:squarederror", "reg:squaredlogerror", "reg:absoluteerror",
+                        "reg:pseudohubererror", "reg:quantileerror"}
+_EXP_OBJECTIVES = {"count:poisson", "reg:gamma", "reg:tweedie"}
+_SIGMOID_OBJECTIVES = {"reg:logistic", "binary:logistic"}
+
+
+def backend_for(name: str) -> str:
+    """Backend configured for a model name"""
+    return BACKEND_OVERRIDES.get(name, DEFAULT_BACKEND)
+
+
+class XGBoostBackend:
+    """Predicts with the estimator itself (reference implementation)"""
+
+    name = "xgboost"
+
+    def __init__(self, model):
+        self.model = model
+
+    def predict(self, X):
+        return self.model.predict(X)
+
+
+class NumpyTreeBackend:
+    """
+    Array-backed tree ensemble evaluator.
+
+    Every tree of the booster is flattened into shared node arrays (feature,
+    threshold, children, default direction, leaf value). Prediction walks all
+    trees for all rows at once, one vectorized step per tree level, which avoids
+    XGBoost's DMatrix construction and thread dispatch for small inputs.
+    """
+
+    name = "numpy"
+
+    def __init__(self, model):
+        self.model = model
+        self.arrays = flatten_booster(_get_booster(model))
+        self._unpack()
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], model=None) -> "NumpyTreeBackend":
+        """Build a backend from previously flattened node arrays (e.g. memory-mapped files)"""
+        backend = cls.__new__(cls)
+        backend.model = model
+        backend.arrays = arrays
+        backend._unpack()
+        return backend
+
+    def _unpack(self):
+        # np.asarray keeps memory-mapped arrays as views, so forked workers share their pages
+        a = {key: np.asarray(value) for key, value in self.arrays.items()}
+        self.feature = a["feature"]
+        self.threshold = a["threshold"]
+        self.default_left = a["default_left"]
+        self.children = a["children"]
+        self.leaf_value = a["leaf_value"]
+        self.roots = a["roots"]
+        self.tree_group = a["tree_group"]
+        self.base_margin = a["base_margin"]
+        self._feature2 = a["feature2"]
+        self._threshold2 = a["threshold2"]
+        self._default_right2 = a["default_right2"]
+        self._children2 = a["children2"]
+        self._roots2 = 2 * self.roots
+        self.depth = int(a["meta"][0])
+        self.n_targets = int(a["meta"][1])
+        self.vector_leaf = bool(a["meta"][2])
+        self.transform = int(a["meta"][3])
+        # Trees contributing to each output, in boosting order
+        if self.vector_leaf:
+            self._group_trees = [np.arange(len(self.roots))] * self.n_targets
+        else:
+            self._group_trees = [np.flatnonzero(self.tree_group == g) for g in range(self.n_targets)]
+
+    def _leaves(self, X: np.ndarray) -> np.ndarray:
+        """Leaf node reached in every tree, shape (n_rows, n_trees)"""
+        has_missing = np.isnan(X).any()
+        if X.shape[0] == 1:
+            # Single row: plain 1-D gathers are much cheaper than 2-D fancy indexing
+            x = X[0]
+            slot = self._roots2
+            for _ in range(self.depth):
+                value = x.take(self._feature2.take(slot))
+                go_right = value >= self._threshold2.take(slot)
+                if has_missing:
+                    missing = np.isnan(value)
+                    go_right[missing] = self._default_right2.take(slot[missing])
+                slot = self._children2.take(slot + go_right)
+            return (slot // 2).reshape(1, -1)
+
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.broadcast_to(self.roots, (X.shape[0], len(self.roots)))
+        for _ in range(self.depth):
+            value = X[rows, self.feature[node]]
+            go_right = ~(value < self.threshold[node])
+            if has_missing:
+                missing = np.isnan(value)
+                go_right[missing] = ~self.default_left[node[missing]]
+            node = self.children[node, go_right.view(np.int8)]
+        return node
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        node = self._leaves(X)
+        leaf = self.leaf_value[node]
+
+        # Sequential float32 sum in boosting order (base margin is already in the first tree)
+        margin = np.empty((X.shape[0], self.n_targets), dtype=np.float32)
+        for g, trees in enumerate(self._group_trees):
+            if not len(trees):
+                margin[:, g] = self.base_margin[g]
+            elif self.vector_leaf:
+                margin[:, g] = np.cumsum(leaf[:, :, g], axis=1, dtype=np.float32)[:, -1]
+            elif self.n_targets == 1:
+                margin[:, g] = np.cumsum(leaf, axis=1, dtype=np.float32)[:, -1]
+            else:
+                margin[:, g] = np.cumsum(leaf[:, trees], axis=1, dtype=np.float32)[:, -1]
+
+        if self.transform == 1:
+            margin = np.exp(margin)
+        elif self.transform == 2:
+            margin = 1.0 / (1.0 + np.exp(-margin))
+
+        return margin[:, 0] if self.n_targets == 1 else margin
+
+
+class OnnxBackend:
+    """Predicts through ONNX Runtime (requires onnxmltools and onnxruntime)"""
+
+    name = "onnx"
+
+    def __init__(self, model):
+        from onnxmltools import convert_xgboost
+        from onnxmltools.convert.common.data_types import FloatTensorType
+        import onnxruntime
+
+        self.model = model
+        # The converter only understands positional feature names (f0, f1, ...)
+        booster = _get_booster(model).copy()
+        booster.feature_names = None
+        n_features = booster.num_features()
+        onnx_model = convert_xgboost(booster, initial_types=[("input", FloatTensorType([None, n_features]))])
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = 1
+        self.session = onnxruntime.InferenceSession(onnx_model.SerializeToString(), options,
+                                                    providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        output = self.session.run(None, {self.input_name: X})[0]
+        return output[:, 0] if output.ndim == 2 and output.shape[1] == 1 else output
+
+
+BACKENDS = {
+    "xgboost": XGBoostBackend,
+    "numpy": NumpyTreeBackend,
+    "onnx": OnnxBackend,
+}
+
+
+def _get_booster(model):
+    return model.get_booster() if hasattr(model, "get_booster") else model
+
+
+def unwrap_model(model):
+    """Original estimator behind a backend (or the object itself)"""
+    return getattr(model, "model", None) or model
+
+
+def _parse_base_score(value) -> np.ndarray:
+    # Stored as "5E-1" or, for multi-target models, "[1.4E0,1.0E0,4.9E-1]"
+    return np.array([float(v) for v in str(value).strip("[]").split(",")], dtype=np.float64)
+
+
+def flatten_booster(booster) -> Dict[str, np.ndarray]:
+    """Flatten a booster's trees into node arrays for NumpyTreeBackend"""
+    learner = json.loads(booster.save_raw("json"))["learner"]
+    objective = learner["objective"]["name"]
+    gbm = learner["gradient_booster"]
+    if gbm.get("name", "gbtree") != "gbtree" or "model" not in gbm:
+        raise NotImplementedError(f"Unsupported booster: {gbm.get('name')}")
+    model = gbm["model"]
+
+    n_targets = max(1, int(learner["learner_model_param"].get("num_target", 1)),
+                    int(learner["learner_model_param"].get("num_class", 0)))
+    base_score = _parse_base_score(learner["learner_model_param"]["base_score"])
+    if base_score.size == 1:
+        base_score = np.repeat(base_score, n_targets)
+
+    if objective in _IDENTITY_OBJECTIVES:
+        transform, base_margin = 0, base_score
+    elif objective in _EXP_OBJECTIVES:
+        transform, base_margin = 1, np.log(base_score)
+    elif objective in _SIGMOID_OBJECTIVES:
+        transform, base_margin = 2, np.log(base_score / (1 - base_score))
+    else:
+        raise NotImplementedError(f"Unsupported objective: {objective}")
+
+    trees = model["trees"]
+    vector_leaf = any(int(t["tree_param"].get("size_leaf_vector", 1)) > 1 for t in trees)
+
+    features, thresholds, lefts, rights, defaults, values, roots = [], [], [], [], [], [], []
+    max_depth, offset = 0, 0
+    for tree in trees:
+        if any(int(s) != 0 for s in tree.get("split_type", [])):
+            raise NotImplementedError("Categorical splits are not supported")
+
+        left = np.asarray(tree["left_children"], dtype=np.int64)
+        right = np.asarray(tree["right_children"], dtype=np.int64)
+        n_nodes = len(left)
+        is_leaf = left == -1
+        node_ids = np.arange(n_nodes)
+
+        if vector_leaf:
+            # Leaves store a row index into leaf_weights in right_children
+            leaf_weights = np.asarray(tree["leaf_weights"], dtype=np.float32).reshape(-1, n_targets)
+            value = np.zeros((n_nodes, n_targets), dtype=np.float32)
+            value[is_leaf] = leaf_weights[right[is_leaf]]
+        else:
+            value = np.where(is_leaf, np.asarray(tree["split_conditions"], dtype=np.float32), 0)
+
+        # Leaves point at themselves so extra traversal steps are no-ops
+        features.append(np.where(is_leaf, 0, np.asarray(tree["split_indices"], dtype=np.int64)))
+        thresholds.append(np.where(is_leaf, np.inf, np.asarray(tree["split_conditions"], dtype=np.float32)))
+        lefts.append(np.where(is_leaf, node_ids, left) + offset)
+        rights.append(np.where(is_leaf, node_ids, right) + offset)
+        defaults.append(np.asarray(tree["default_left"], dtype=bool))
+        values.append(value)
+        roots.append(offset)
+
+        max_depth = max(max_depth, _tree_depth(left, right))
+        offset += n_nodes
+
+    tree_group = np.asarray(model.get("tree_info") if not vector_leaf else [0] * len(trees), dtype=np.int32)
+    leaf_value = np.concatenate(values).astype(np.float32)
+    roots = np.asarray(roots, dtype=np.int32)
+
+    # Fold the base margin into the leaves of each output's first tree: XGBoost starts its
+    # float32 running sum from the base margin, so this reproduces its rounding exactly
+    first_node = np.append(roots, offset)
+    if vector_leaf and len(trees):
+        leaf_value[first_node[0]:first_node[1]] += base_margin.astype(np.float32)
+    elif not vector_leaf:
+        for g in range(n_targets):
+            trees_in_group = np.flatnonzero(tree_group == g)
+            if len(trees_in_group):
+                t = trees_in_group[0]
+                leaf_value[first_node[t]:first_node[t + 1]] += np.float32(base_margin[g])
+
+    feature = np.concatenate(features).astype(np.int32)
+    threshold = np.concatenate(thresholds).astype(np.float32)
+    default_left = np.concatenate(defaults)
+    children = np.stack([np.concatenate(lefts), np.concatenate(rights)], axis=1).astype(np.int32)
+    return {
+        "feature": feature,
+        "threshold": threshold,
+        "default_left": default_left,
+        "children": children,
+        "leaf_value": leaf_value,
+        "roots": roots,
+        "tree_group": tree_group,
+        "base_margin": base_margin.astype(np.float32),
+        # Single-row layout: slot 2*i holds node i's test, slot 2*i + 1 its "go right" child.
+        # A step is then three 1-D gathers: feature/threshold at 2*i, child at 2*i + (x >= threshold)
+        "feature2": np.repeat(feature, 2),
+        "threshold2": np.repeat(threshold, 2),
+        "default_right2": np.repeat(~default_left, 2),
+        "children2": (2 * children).ravel(),
+        "meta": np.asarray([max_depth, n_targets, int(vector_leaf), transform], dtype=np.int64),
+    }
+
+
+def _tree_depth(left: np.ndarray, right: np.ndarray) -> int:
+    depth = np.zeros(len(left), dtype=np.int64)
+    # XGBoost stores parents before children, so one forward pass is enough
+    for node in range(len(left)):
+        if left[node] != -1:
+            depth[left[node]] = depth[node] + 1
+            depth[right[node]] = depth[node] + 1
+    return int(depth.max()) if len(depth) else 0
+
+
+def make_probe_matrix(model, n_rows: int = 64, seed: int = 0, arrays: Optional[Dict[str, np.ndarray]] = None) -> np.ndarray:
+    """
+    Inputs that land on both sides of the model's split thresholds (and some missing values)
+    Pass `arrays` (e.g. a NumpyTreeBackend's) to reuse already flattened nodes instead of re-walking the booster
+    """
+    booster = _get_booster(model)
+    n_features = booster.num_features()
+    if arrays is None:
+        arrays = flatten_booster(booster)
+    is_split = np.isfinite(arrays["threshold"])
+    rng = np.random.default_rng(seed)
+
+    X = rng.normal(0, 1, size=(n_rows, n_features)).astype(np.float32)
+    for f in range(n_features):
+        cuts = arrays["threshold"][is_split & (arrays["feature"] == f)]
+        if len(cuts):
+            picks = rng.choice(cuts, size=n_rows)
+            X[:, f] = np.where(rng.random(n_rows) < 0.5, np.nextafter(picks, -np.inf), picks)
+    X[rng.random(X.shape) < 0.05] = np.nan
+    return X
+
+
+def check_parity(model, backend, X: Optional[np.ndarray] = None, rtol: float = 1e-5, atol: float = 1e-4) -> float:
+    """
+    Assert that `backend` reproduces XGBoost's predictions on `X` (probe inputs by default)
+    Returns the largest absolute difference
+    """
+    if X is None:
+        X = make_probe_matrix(model, arrays=getattr(backend, "arrays", None))
+    expected = np.asarray(unwrap_model(model).predict(X), dtype=np.float64)
+    actual = np.asarray(backend.predict(X), dtype=np.float64)
+    np.testing.assert_allclose(actual, expected, rtol=rtol, atol=atol)
+    return float(np.max(np.abs(actual - expected))) if expected.size else 0.0
+
+
+def make_backend(model, kind: str = None, verify: bool = True):
+    """
+    Wrap a fitted XGBoost model in the requested inference backend
+    Falls back to XGBoost if the backend is unavailable or fails the parity check
+    """
+    kind = kind or DEFAULT_BACKEND
+    if kind == "xgboost" or kind not in BACKENDS:
+        return XGBoostBackend(model)
+    try:
+        backend = BACKENDS[kind](model)
+        if verify:
+            check_parity(model, backend)
+        return backend
+    except Exception as e:
+        print(f"⚠️ {kind} inference backend unavailable, using xgboost: {str(e).splitlines()[0]}")
+        return XGBoostBackend(model)
+
+
+def benchmark_backends(model, X_row, repeats: int = 500) -> Dict[str, float]:
+    """Median single-row latency in microseconds for every available backend"""
+    results = {}
+    for kind in BACKENDS:
+        backend = make_backend(model, kind)
+        if backend.name != kind:
+            continue
+        backend.predict(X_row)
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            backend.predict(X_row)
+            timings.append((time.perf_counter() - start) * 1e6)
+        results[kind] = float(np.median(timings))
+    return results
+
+
+if __name__ == "__main__":
+    # Parity and single-row latency for every model the API serves
+    from model_registry import MODELS_DIR, registry
+    from time_prediction import TimePredictionEngine
+
+    models = {name: registry.get_model(name)[0] for name in registry.model_files
+              if registry.get_optional(name) is not None}
+    engine = TimePredictionEngine()
+    engine.load_models(MODELS_DIR)
+    if engine.global_model:
+        models["time_global"] = unwrap_model(engine.global_model)
+        for subreddit in list(engine.subreddit_models)[:3]:
+            models[f"time_{subreddit}"] = unwrap_model(engine.subreddit_models[subreddit])
+
+    for name, model in models.items():
+        backend = NumpyTreeBackend(model)
+        probe = make_probe_matrix(model, arrays=backend.arrays)
+        diff = check_parity(model, backend, probe)
+        latency = benchmark_backends(model, probe[:1])
+        timings = ", ".join(f"{kind} {us:.0f}µs" for kind, us in latency.items())
+        print(f"✅ {name}: max |diff| {diff:.2e}; single row {timings}")
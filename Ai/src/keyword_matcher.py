@@ -0,0 +1,142 @@
+import re
+import time
+from typing import Dict, List
+
+
+class KeywordMatcher:
+    """
+    Compiled matcher for several keyword lexicons at once.
+
+    Every keyword of every lexicon goes into one word-boundary regex, so a text is
+    scanned once regardless of how many keywords or lexicons there are, and
+    "bad" no longer matches inside "badge". The regex is built as a prefix trie,
+    so at each word start the engine follows one branch per character instead of
+    trying every keyword in turn. A keyword may belong to several lexicons
+    (e.g. "happy" is both a positive sentiment word and a joy emotion).
+
+    lexicons: {lexicon name: {category: [keywords]}}
+    """
+
+    def __init__(self, lexicons: Dict[str, Dict[str, List[str]]]):
+        self.lexicons = {name: {category: [w.lower() for w in words] for category, words in categories.items()}
+                         for name, categories in lexicons.items()}
+
+        # keyword -> [(lexicon, category, rank)], rank being the keyword's position in its lexicon
+        self._entries = {}
+        for name, categories in self.lexicons.items():
+            rank = 0
+            for category, words in categories.items():
+                for word in words:
+                    self._entries.setdefault(word, []).append((name, category, rank))
+                    rank += 1
+
+        self.pattern = re.compile(r"\b" + _trie_regex(self._entries) + r"\b")
+
+    def match(self, text: str) -> Dict:
+        """
+        Scan `text` once and return, per lexicon:
+          counts    {category: occurrences}
+          distinct  {category: number of different keywords found}
+          keywords  [{"word", "category"}] in lexicon order
+        plus positions, a list of (offset, keyword) for every occurrence
+        """
+        positions = []
+        occurrences = {}
+        for m in self.pattern.finditer(text.lower()):
+            word = m.group()
+            positions.append((m.start(), word))
+            occurrences[word] = occurrences.get(word, 0) + 1
+
+        result = {name: {"counts": dict.fromkeys(categories, 0),
+                         "distinct": dict.fromkeys(categories, 0),
+                         "keywords": []}
+                  for name, categories in self.lexicons.items()}
+        found = {name: [] for name in self.lexicons}
+        for word, n in occurrences.items():
+            for name, category, rank in self._entries[word]:
+                result[name]["counts"][category] += n
+                result[name]["distinct"][category] += 1
+                found[name].append((rank, word, category))
+
+        for name, hits in found.items():
+            result[name]["keywords"] = [{"word": word, "category": category} for _, word, category in sorted(hits)]
+        result["positions"] = positions
+        return result
+
+
+def _trie_regex(words) -> str:
+    """Regex alternation for `words` factored into a character trie (e.g. ha(?:ppy|rd|te))"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        is_word_end = "" in node
+        if len(branches) == 1 and not is_word_end:
+            return branches[0]
+        # "(...)?" lets the regex stop at a shorter keyword; the trailing \b picks the right length
+        return "(?:" + "|".join(branches) + ")" + ("?" if is_word_end else "")
+
+    return build(trie)
+
+
+def _substring_match(lexicons: Dict[str, Dict[str, List[str]]], text: str) -> Dict:
+    """
+    The previous approach, kept as the benchmark baseline: one substring test per keyword,
+    repeated by analyze_sentiment_keywords (count, then collect), analyze_emotion and the fallback
+    """
+    text_lower = text.lower()
+    sentiment = lexicons["sentiment"]
+    return {
+        "counts": {category: sum(1 for word in words if word in text_lower)
+                   for category, words in sentiment.items()},
+        "keywords": [word for words in sentiment.values() for word in words if word in text_lower],
+        "emotion": {category: sum(1 for word in words if word in text_lower)
+                    for category, words in lexicons["emotion"].items()},
+        "fallback": {category: sum(1 for word in words if word in text_lower)
+                     for category, words in lexicons["fallback"].items()},
+    }
+
+
+def _median_us(fn, text: str, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(text)
+        timings.append((time.perf_counter() - start) * 1e6)
+    return sorted(timings)[len(timings) // 2]
+
+
+if __name__ == "__main__":
+    # Compiled scan vs. per-keyword substring tests on short posts, long posts and comment threads
+    import random
+    from sentiment_analyzer import KEYWORD_LEXICONS, keyword_matcher
+
+    rng = random.Random(0)
+    keywords = [w for categories in KEYWORD_LEXICONS.values() for words in categories.values() for w in words]
+    filler = ("the post about this new update was shared by a user who said that it works on "
+              "every device and the badge shows how many people liked it").split()
+
+    def make_text(n_words: int) -> str:
+        return " ".join(rng.choice(keywords) if rng.random() < 0.05 else rng.choice(filler)
+                        for _ in range(n_words))
+
+    samples = {
+        "short post (30 words)": make_text(30),
+        "long post (400 words)": make_text(400),
+        "comment thread (5000 words)": "\n".join(make_text(50) for _ in range(100)),
+    }
+    for label, text in samples.items():
+        repeats = 2000 if len(text) < 5000 else 200
+        baseline = _median_us(lambda t: _substring_match(KEYWORD_LEXICONS, t), text, repeats)
+        compiled = _median_us(keyword_matcher.match, text, repeats)
+        print(f"📊 {label}: substring {baseline:.1f}µs, compiled {compiled:.1f}µs ({baseline / compiled:.1f}x)")
+
+    example = "Loved the badge, it is not bad at all, honestly happy and happy again"
+    print(f"🧪 {example!r} -> {keyword_matcher.match(example)['sentiment']['keywords']}")
@@ -0,0 +1,422 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+import xgboost
+from xgboost import XGBRegressor
+
+from feature_spec import FeatureSpec
+from inference_backend import NumpyTreeBackend, backend_for, check_parity, flatten_booster, make_backend, unwrap_model
+import version_lease
+
+BUNDLE_FORMAT_VERSION = 1
+MANIFEST_FILENAME = "manifest.json"
+
+BUNDLES_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "models", "bundles"))
+# Text file inside BUNDLES_DIR naming the bundle version to serve
+CURRENT_FILENAME = "CURRENT"
+
+# Explicit bundle directory to serve, or "off" to always use the loose model files
+MODEL_BUNDLE = os.getenv("MODEL_BUNDLE", "")
+# Threads used to verify checksums and load artifacts
+BUNDLE_LOAD_WORKERS = int(os.getenv("BUNDLE_LOAD_WORKERS", min(8, os.cpu_count() or 1)))
+
+# Artifact keys that are neither the model nor derived at load time; the rest goes into metadata
+_ARTIFACT_KEYS = {"model", "features", "feature_columns", "spec", "predictor"}
+
+
+class ModelBundle:
+    """
+    Read-only, versioned set of models described by a manifest.
+
+    Each model is stored as a native XGBoost UBJSON booster plus the flattened
+    node arrays used by NumpyTreeBackend. The arrays are memory-mapped, so
+    pre-forked workers share one copy of them in the page cache, and the booster
+    is only read when a model is served by another backend. Feature schemas are
+    stored once and referenced by every model that uses them.
+    """
+
+    def __init__(self, path: str, manifest: Dict):
+        self.path = path
+        self.manifest = manifest
+        self.version = manifest["version"]
+        self.models = manifest["models"]
+        self._schemas = {}
+
+    @classmethod
+    def open(cls, path: str, verify: bool = True, max_workers: int = BUNDLE_LOAD_WORKERS) -> "ModelBundle":
+        """Open the bundle at `path`, checking every file against its manifest checksum"""
+        with open(os.path.join(path, MANIFEST_FILENAME)) as f:
+            manifest = json.load(f)
+        if manifest.get("format_version") != BUNDLE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported model bundle format: {manifest.get('format_version')}")
+
+        bundle = cls(path, manifest)
+        if verify:
+            bundle.verify(max_workers)
+        return bundle
+
+    def _entries(self) -> List[Dict]:
+        entries = list(self.manifest["schemas"].values()) + list(self.manifest["files"].values())
+        for entry in self.models.values():
+            entries.append(entry["booster"])
+            entries.extend(entry.get("arrays", {}).values())
+        return entries
+
+    def verify(self, max_workers: int = BUNDLE_LOAD_WORKERS):
+        """Raise ValueError if any artifact is missing or does not match its checksum"""
+        entries = self._entries()
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            digests = list(pool.map(lambda e: _file_sha256(os.path.join(self.path, e["path"])), entries))
+        corrupt = [e["path"] for e, digest in zip(entries, digests) if digest != e["sha256"]]
+        if corrupt:
+            raise ValueError(f"Model bundle {self.version} failed checksum verification: {', '.join(corrupt[:5])}")
+
+    def has(self, name: str) -> bool:
+        return name in self.models
+
+    def names(self, group: Optional[str] = None) -> List[str]:
+        return [name for name, entry in self.models.items() if group is None or entry["group"] == group]
+
+    def keys(self, group: str) -> Dict[str, str]:
+        """Model key (e.g. subreddit) -> model name for every model in `group`"""
+        return {entry["key"]: name for name, entry in self.models.items() if entry["group"] == group}
+
+    def spec(self, name: str) -> FeatureSpec:
+        schema_id = self.models[name]["schema"]
+        spec = self._schemas.get(schema_id)
+        if spec is None:
+            spec = FeatureSpec.load(os.path.join(self.path, self.manifest["schemas"][schema_id]["path"]))
+            self._schemas[schema_id] = spec
+        return spec
+
+    def metadata(self, name: str) -> Dict:
+        return dict(self.models[name].get("metadata", {}))
+
+    def load_model(self, name: str) -> XGBRegressor:
+        """Read the native booster for `name` into an XGBRegressor"""
+        model = XGBRegressor()
+        model.load_model(os.path.join(self.path, self.models[name]["booster"]["path"]))
+        return model
+
+    def load_arrays(self, name: str) -> Optional[Dict[str, np.ndarray]]:
+        """Memory-map the node arrays for `name` (None if the model has none)"""
+        arrays = self.models[name].get("arrays")
+        if not arrays:
+            return None
+        return {key: np.load(os.path.join(self.path, entry["path"]), mmap_mode="r")
+                for key, entry in arrays.items()}
+
+    def predictor(self, name: str, kind: Optional[str] = None):
+        """Inference backend for `name`; parity of the node arrays was checked when the bundle was built"""
+        kind = kind or backend_for(name)
+        if kind == "numpy":
+            arrays = self.load_arrays(name)
+            if arrays is not None:
+                return NumpyTreeBackend.from_arrays(arrays)
+        return make_backend(self.load_model(name), kind)
+
+    def artifact(self, name: str) -> Dict:
+        """Artifact dict in the registry's layout (model, features, spec, predictor, metadata...)"""
+        spec = self.spec(name)
+        predictor = self.predictor(name)
+        artifact = self.metadata(name)
+        artifact.update({
+            "model": getattr(predictor, "model", None),
+            "features": spec.feature_columns,
+            "spec": spec,
+            "predictor": predictor,
+        })
+        return artifact
+
+    def file_path(self, key: str) -> Optional[str]:
+        entry = self.manifest["files"].get(key)
+        return os.path.join(self.path, entry["path"]) if entry else None
+
+    def read_json(self, key: str) -> Optional[Dict]:
+        path = self.file_path(key)
+        if path is None:
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def model_stats(self, name: str) -> Dict:
+        entry = self.models[name]
+        arrays = entry.get("arrays", {})
+        return {
+            "path": os.path.join(self.path, entry["booster"]["path"]),
+            "file_size_bytes": entry["booster"]["bytes"] + sum(a["bytes"] for a in arrays.values()),
+            "mapped_bytes": sum(a["bytes"] for a in arrays.values()),
+        }
+
+    def info(self) -> Dict:
+        return {
+            "version": self.version,
+            "path": self.path,
+            "created_at": self.manifest["created_at"],
+            "models": len(self.models),
+            "schemas": len(self.manifest["schemas"]),
+        }
+
+
+def _file_sha256(path: str) -> Optional[str]:
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _json_metadata(artifact: Dict) -> Dict:
+    """JSON-serializable extra fields of a pickled artifact (dataset_info, metrics, ...)"""
+    metadata = {}
+    for key, value in artifact.items():
+        if key in _ARTIFACT_KEYS:
+            continue
+        try:
+            json.dumps(value)
+        except TypeError:
+            continue
+        metadata[key] = value
+    return metadata
+
+
+class _BundleWriter:
+    """Writes artifacts into a bundle directory and records them in the manifest"""
+
+    def __init__(self, path: str, version: str):
+        self.path = path
+        self.manifest = {
+            "format_version": BUNDLE_FORMAT_VERSION,
+            "version": version,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "xgboost_version": xgboost.__version__,
+            "schemas": {},
+            "models": {},
+            "files": {},
+        }
+
+    def _entry(self, relative_path: str) -> Dict:
+        full_path = os.path.join(self.path, relative_path)
+        return {"path": relative_path, "sha256": _file_sha256(full_path), "bytes": os.path.getsize(full_path)}
+
+    def _write_json(self, relative_path: str, data) -> Dict:
+        full_path = os.path.join(self.path, relative_path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w") as f:
+            json.dump(data, f, sort_keys=True)
+        return self._entry(relative_path)
+
+    def add_schema(self, spec: FeatureSpec) -> str:
+        """Store a feature schema once and return its id (a prefix of its content hash)"""
+        data = spec.to_dict()
+        schema_id = hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()[:16]
+        if schema_id not in self.manifest["schemas"]:
+            self.manifest["schemas"][schema_id] = self._write_json(f"schemas/{schema_id}.json", data)
+        return schema_id
+
+    def add_model(self, name: str, model, spec: FeatureSpec, group: str, key: str = None, metadata: Dict = None):
+        model = unwrap_model(model)
+        booster_path = f"boosters/{name}.ubj"
+        os.makedirs(os.path.join(self.path, "boosters"), exist_ok=True)
+        model.get_booster().save_model(os.path.join(self.path, booster_path))
+
+        entry = {
+            "group": group,
+            "key": key or name,
+            "schema": self.add_schema(spec),
+            "booster": self._entry(booster_path),
+            "metadata": metadata or {},
+        }
+
+        # Node arrays are only shipped when they reproduce XGBoost exactly enough to serve
+        try:
+            arrays = flatten_booster(model.get_booster())
+            entry["parity_max_diff"] = check_parity(model, NumpyTreeBackend.from_arrays(arrays))
+        except Exception as e:
+            print(f"⚠️ {name}: node arrays skipped, serving from the booster ({str(e).splitlines()[0]})")
+        else:
+            os.makedirs(os.path.join(self.path, "arrays", name), exist_ok=True)
+            entry["arrays"] = {}
+            for array_name, array in arrays.items():
+                array_path = f"arrays/{name}/{array_name}.npy"
+                np.save(os.path.join(self.path, array_path), np.ascontiguousarray(array))
+                entry["arrays"][array_name] = self._entry(array_path)
+
+        self.manifest["models"][name] = entry
+
+    def add_json_file(self, key: str, filename: str, data):
+        self.manifest["files"][key] = self._write_json(filename, data)
+
+    def finish(self):
+        with open(os.path.join(self.path, MANIFEST_FILENAME), "w") as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+
+
+def build_bundle(models_dir: str = None, bundles_dir: str = None, version: str = None, keep: int = 3,
+                 time_models_dir: str = None, make_current: bool = True) -> str:
+    """
+    Package the loose model files in `models_dir` into a new bundle under `bundles_dir`
+    (default: <models_dir>/bundles) and, with `make_current`, make it current
+    Time models come from `time_models_dir` (default: the current ones in `models_dir`).
+    Engagement models without a loose file are carried over from the current bundle.
+    Returns the bundle directory
+    """
+    from model_registry import MODELS_DIR, ModelRegistry, OPTIONAL_MODELS
+    from time_prediction import TimePredictionEngine, LOOKUP_TABLE_FILENAME
+
+    models_dir = models_dir or MODELS_DIR
+    bundles_dir = bundles_dir or os.path.join(models_dir, "bundles")
+    version = version or datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S-%f")
+    final_path = os.path.join(bundles_dir, version)
+    if os.path.exists(final_path):
+        raise ValueError(f"Model bundle {version} already exists")
+
+    # Write into a temporary directory and rename, so a bundle is never seen half-written
+    tmp_path = os.path.join(bundles_dir, f".{version}.tmp")
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    writer = _BundleWriter(tmp_path, version)
+
+    # Engagement models, straight from the pickles and their feature specs
+    loose_registry = ModelRegistry(models_dir, use_bundle=False)
+    previous = None
+    previous_path = _pointed_bundle_path(bundles_dir)
+    if previous_path is not None:
+        try:
+            previous = ModelBundle.open(previous_path)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not open current bundle {previous_path} to carry models over: {e}")
+    for name in loose_registry.model_files:
+        artifact = loose_registry.get_optional(name)
+        if artifact is not None:
+            writer.add_model(name, artifact["model"], artifact["spec"], "engagement",
+                             metadata=_json_metadata(artifact))
+            print(f"📦 Bundled {name}")
+        elif previous is not None and previous.has(name):
+            writer.add_model(name, previous.load_model(name), previous.spec(name), "engagement",
+                             metadata=previous.metadata(name))
+            print(f"📦 Bundled {name} (carried over from bundle {previous.version})")
+        elif name not in OPTIONAL_MODELS:
+            print(f"⚠️ {name} has no model file in {models_dir} or the current bundle; not bundled")
+
+    # Time models share one feature schema; the lookup table travels with them
+    engine = TimePredictionEngine()
+    engine.load_models(time_models_dir or models_dir, lazy=False)
+    if engine.global_model:
+        time_spec = FeatureSpec(engine.feature_columns)
+        writer.add_model("time_global", engine.global_model, time_spec, "time_global",
+                         metadata={"one_hot_missing": engine.one_hot_missing})
+        for subreddit, model in engine.subreddit_models.items():
+            writer.add_model(f"time_{subreddit}", model, time_spec, "time_subreddit", key=subreddit)
+        for content_type, model in engine.content_type_models.items():
+            writer.add_model(f"time_content_{content_type}", model, time_spec, "time_content", key=content_type)
+        writer.add_json_file("time_prediction_lookup", LOOKUP_TABLE_FILENAME,
+                             {"table": engine.optimal_time_table})
+        print(f"📦 Bundled {1 + len(engine.subreddit_models) + len(engine.content_type_models)} time models")
+
+    writer.finish()
+    os.rename(tmp_path, final_path)
+    print(f"✅ Model bundle {version} written to {final_path}")
+    if make_current:
+        publish_bundle(final_path, keep)
+    return final_path
+
+
+def publish_bundle(path: str, keep: int = 3):
+    """Make the built bundle at `path` current and prune all but the newest `keep` bundles"""
+    bundles_dir, version = os.path.split(path)
+    set_current_bundle(version, bundles_dir)
+    _prune_bundles(bundles_dir, keep, version)
+
+
+def set_current_bundle(version: str, bundles_dir: str = BUNDLES_DIR):
+    tmp_path = os.path.join(bundles_dir, f".{CURRENT_FILENAME}.tmp")
+    with open(tmp_path, "w") as f:
+        f.write(version + "\n")
+    os.replace(tmp_path, os.path.join(bundles_dir, CURRENT_FILENAME))
+
+
+def _prune_bundles(bundles_dir: str, keep: int, current: str):
+    versions = sorted(v for v in os.listdir(bundles_dir)
+                      if not v.startswith(".") and os.path.isdir(os.path.join(bundles_dir, v)))
+    for version in versions[:-keep] if keep > 0 else []:
+        # A running server may still map arrays from an older bundle it opened
+        if version != current and not version_lease.in_use(os.path.join(bundles_dir, version)):
+            shutil.rmtree(os.path.join(bundles_dir, version), ignore_errors=True)
+
+
+def current_bundle_path(bundles_dir: str = BUNDLES_DIR) -> Optional[str]:
+    """Directory of the bundle to serve (MODEL_BUNDLE, else the CURRENT pointer), or None"""
+    if MODEL_BUNDLE:
+        return None if MODEL_BUNDLE == "off" else MODEL_BUNDLE
+    return _pointed_bundle_path(bundles_dir)
+
+
+def _pointed_bundle_path(bundles_dir: str) -> Optional[str]:
+    pointer = os.path.join(bundles_dir, CURRENT_FILENAME)
+    if not os.path.exists(pointer):
+        return None
+    with open(pointer) as f:
+        return os.path.join(bundles_dir, f.read().strip())
+
+
+_current_bundle = None
+_current_bundle_resolved = False
+_current_bundle_lock = threading.Lock()
+
+
+def get_current_bundle() -> Optional[ModelBundle]:
+    """
+    Process-wide bundle shared by the model registry and the time engine
+    Resolved once; None when no bundle is built or it fails verification
+    """
+    global _current_bundle, _current_bundle_resolved
+    if _current_bundle_resolved:
+        return _current_bundle
+
+    with _current_bundle_lock:
+        if not _current_bundle_resolved:
+            path = current_bundle_path()
+            if path is not None:
+                start = time.perf_counter()
+                try:
+                    _current_bundle = ModelBundle.open(path)
+                    version_lease.hold(path)
+                    print(f"📦 Opened model bundle {_current_bundle.version} ({len(_current_bundle.models)} models) "
+                          f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+                except (OSError, ValueError) as e:
+                    print(f"⚠️ Could not open model bundle {path}, using loose model files: {e}")
+            _current_bundle_resolved = True
+    return _current_bundle
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or inspect versioned model bundles")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="Package the loose model files into a new bundle")
+    build_parser.add_argument("--models-dir", default=None)
+    build_parser.add_argument("--version", default=None)
+    build_parser.add_argument("--keep", type=int, default=3, help="Number of bundle versions to keep")
+    verify_parser = subparsers.add_parser("verify", help="Check every artifact against the manifest")
+    verify_parser.add_argument("path", nargs="?", default=None)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        build_bundle(args.models_dir, version=args.version, keep=args.keep)
+    else:
+        path = args.path or current_bundle_path()
+        if path is None:
+            raise SystemExit("❌ No model bundle found; run `python model_bundle.py build` first")
+        bundle = ModelBundle.open(path)
+        print(f"✅ Model bundle {bundle.version}: {len(bundle.models)} models, checksums OK")
@@ -0,0 +1,217 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import joblib
+
+from inference_backend import backend_for, make_backend
+from model_bundle import BUNDLE_LOAD_WORKERS, get_current_bundle
+from feature_spec import FeatureSpec, combined_engagement_spec, engagement_spec, spec_path_for
+
+MODELS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "models"))
+
+# Registry name -> artifact file inside MODELS_DIR
+MODEL_FILES = {
+    "likes": "likes_predictor.pkl",
+    "comments": "comments_predictor.pkl",
+    "shares": "shares_predictor.pkl",
+    "combined_likes": "combined_likes_predictor.pkl",
+    "combined_comments": "combined_comments_predictor.pkl",
+    "combined_shares": "combined_shares_predictor.pkl",
+    "combined_engagement": "combined_engagement_predictor.pkl",
+}
+
+# Artifacts that only exist when trained explicitly (e.g. combined_training.py --multi-output)
+OPTIONAL_MODELS = {"combined_engagement"}
+
+# Used to compile a FeatureSpec when no spec file was saved next to the model
+SPEC_BUILDERS = {
+    "likes": engagement_spec,
+    "comments": engagement_spec,
+    "shares": engagement_spec,
+    "combined_likes": combined_engagement_spec,
+    "combined_comments": combined_engagement_spec,
+    "combined_shares": combined_engagement_spec,
+    "combined_engagement": combined_engagement_spec,
+}
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of model artifacts.
+    Each artifact is loaded once and then shared by every caller. Models come
+    from the current model bundle when one has been built (see model_bundle.py),
+    otherwise from the loose pickles in models_dir.
+    """
+
+    def __init__(self, models_dir: str = MODELS_DIR, model_files: Dict[str, str] = None,
+                 use_bundle: bool = True):
+        self.models_dir = models_dir
+        self.model_files = dict(model_files or MODEL_FILES)
+        self.use_bundle = use_bundle
+        self._artifacts = {}
+        self._stats = {}
+        self._missing = set()
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Dict:
+        """Return the artifact dict (model, features, spec, predictor, ...) for `name`, loading it on first use"""
+        artifact = self._artifacts.get(name)
+        if artifact is not None:
+            return artifact
+
+        with self._lock:
+            # Another thread may have finished loading while we waited
+            artifact = self._artifacts.get(name)
+            if artifact is None:
+                artifact = self._load(name)
+                self._artifacts[name] = artifact
+        return artifact
+
+    def get_optional(self, name: str) -> Optional[Dict]:
+        """Like get(), but returns None (and remembers it) when the artifact file does not exist"""
+        if name in self._missing:
+            return None
+        if name in self._artifacts:
+            return self._artifacts[name]
+        bundle = self._bundle()
+        if bundle is not None:
+            if bundle.has(name):
+                return self.get(name)
+            self._missing.add(name)
+            return None
+        if not os.path.exists(self._path(name)):
+            self._missing.add(name)
+            return None
+        return self.get(name)
+
+    def get_model(self, name: str):
+        """Return (model, feature_columns) for `name`"""
+        artifact = self.get(name)
+        if artifact["model"] is None:
+            # Served from memory-mapped node arrays; read the booster only when asked for it
+            artifact["model"] = self._bundle().load_model(name)
+        return artifact["model"], artifact["features"]
+
+    def _bundle(self):
+        return get_current_bundle() if self.use_bundle else None
+
+    def _load(self, name: str) -> Dict:
+        bundle = self._bundle()
+        if bundle is not None and bundle.has(name):
+            return self._load_from_bundle(bundle, name)
+
+        path = self._path(name)
+        start = time.perf_counter()
+        artifact = joblib.load(path)
+        artifact["spec"] = self._load_spec(name, path, artifact["features"])
+        artifact["predictor"] = make_backend(artifact["model"], backend_for(name))
+        load_seconds = time.perf_counter() - start
+
+        self._stats[name] = {
+            "path": path,
+            "load_seconds": round(load_seconds, 4),
+            "file_size_bytes": os.path.getsize(path),
+            "memory_bytes": _estimate_model_memory(artifact.get("model")),
+            "n_features": len(artifact.get("features", [])),
+            "backend": artifact["predictor"].name,
+        }
+        print(f"📦 Loaded {name} model in {load_seconds * 1000:.1f} ms")
+        return artifact
+
+    def _load_from_bundle(self, bundle, name: str) -> Dict:
+        start = time.perf_counter()
+        artifact = bundle.artifact(name)
+        load_seconds = time.perf_counter() - start
+
+        self._stats[name] = {
+            **bundle.model_stats(name),
+            "load_seconds": round(load_seconds, 4),
+            "memory_bytes": _estimate_model_memory(artifact["model"]),
+            "n_features": len(artifact["features"]),
+            "backend": artifact["predictor"].name,
+            "bundle_version": bundle.version,
+        }
+        print(f"📦 Loaded {name} model from bundle {bundle.version} in {load_seconds * 1000:.1f} ms")
+        return artifact
+
+    def _path(self, name: str) -> str:
+        if name not in self.model_files:
+            raise KeyError(f"Unknown model: {name}")
+        return os.path.join(self.models_dir, self.model_files[name])
+
+    def get_spec(self, name: str) -> FeatureSpec:
+        """Return the compiled FeatureSpec for `name`"""
+        return self.get(name)["spec"]
+
+    def _load_spec(self, name: str, model_path: str, feature_columns: List[str]) -> FeatureSpec:
+        spec_path = spec_path_for(model_path)
+        if os.path.exists(spec_path):
+            spec = FeatureSpec.load(spec_path)
+            if spec.feature_columns == list(feature_columns):
+                return spec
+            print(f"⚠️ Feature spec for {name} does not match the model, rebuilding it")
+        return SPEC_BUILDERS.get(name, FeatureSpec)(feature_columns)
+
+    def warm(self, names: Optional[List[str]] = None) -> Dict:
+        """Load every known artifact up front; missing files are reported, not raised"""
+        names = names or list(self.model_files)
+        errors = {}
+
+        # Bundled artifacts are independent files, so read them concurrently
+        bundle = self._bundle()
+        if bundle is not None:
+            pending = [name for name in names if bundle.has(name) and name not in self._artifacts]
+            with ThreadPoolExecutor(max_workers=BUNDLE_LOAD_WORKERS) as pool:
+                futures = {name: pool.submit(self._load_from_bundle, bundle, name) for name in pending}
+            with self._lock:
+                for name, future in futures.items():
+                    if future.exception() is None:
+                        self._artifacts.setdefault(name, future.result())
+
+        for name in names:
+            try:
+                if name in OPTIONAL_MODELS:
+                    self.get_optional(name)
+                else:
+                    self.get(name)
+            except Exception as e:
+                errors[name] = str(e)
+                print(f"⚠️ Could not load {name} model: {e}")
+        return {"loaded": sorted(self._artifacts), "errors": errors}
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._artifacts
+
+    def stats(self) -> Dict:
+        """Load time and memory footprint for every loaded model"""
+        bundle = self._bundle()
+        return {
+            "bundle": bundle.info() if bundle is not None else None,
+            "models": dict(self._stats),
+            "total_memory_bytes": sum(s["memory_bytes"] for s in self._stats.values()),
+            "total_load_seconds": round(sum(s["load_seconds"] for s in self._stats.values()), 4),
+        }
+
+    def clear(self):
+        """Drop all cached artifacts (e.g. after retraining)"""
+        with self._lock:
+            self._artifacts.clear()
+            self._stats.clear()
+            self._missing.clear()
+
+
+def _estimate_model_memory(model) -> int:
+    """Approximate resident size of a model from its serialized booster"""
+    if model is None:
+        return 0
+    try:
+        return len(model.get_booster().save_raw())
+    except Exception:
+        return 0
+
+
+# Shared instance used by predict.py, combined_predict.py and the API
+registry = ModelRegistry()
@@ -1,64 +1,23 @@
-import joblib
-import pandas as pd
-import os
-
-MODEL_PATH = os.path.join("..", "models", "likes_predictor.pkl")
+from model_registry import registry
 
 def load_model():
-    print("📦 Loading model...")
-    model_data = joblib.load(MODEL_PATH)
-    return model_data["model"], model_data["features"]
-
-def predict_likes(new_input: dict):
-    model, feature_columns = load_model()
-
-    # Create dataframe with expected feature columns
-    input_df = pd.DataFrame([new_input])
-
-    # Ensure all feature columns exist
-    for col in feature_columns:
-        if col not in input_df.columns:
-            input_df[col] = 0  # fill missing with 0
+    return registry.get_model("likes")
 
-    input_df = input_df[feature_columns]  # reorder to match training
-
-    # Predict
-    prediction = model.predict(input_df)
+def _predict_one(name: str, new_input: dict):
+    """Encode `new_input` with the model's FeatureSpec and return the rounded prediction"""
+    artifact = registry.get(name)
+    x = artifact["spec"].transform(new_input).reshape(1, -1)
+    prediction = artifact["predictor"].predict(x)
     return max(0, int(round(prediction[0])))
 
-def predict_comments(new_input: dict):
-    model, feature_columns = load_comments_model()
-
-    # Create dataframe with expected feature columns
-    input_df = pd.DataFrame([new_input])
-
-    # Ensure all feature columns exist
-    for col in feature_columns:
-        if col not in input_df.columns:
-            input_df[col] = 0  # fill missing with 0
-
-    input_df = input_df[feature_columns]  # reorder to match training
+def predict_likes(new_input: dict):
+    return _predict_one("likes", new_input)
 
-    # Predict
-    prediction = model.predict(input_df)
-    return max(0, int(round(prediction[0])))
+def predict_comments(new_input: dict):
+    return _predict_one("comments", new_input)
 
 def predict_shares(new_input: dict):
-    model, feature_columns = load_shares_model()
-
-    # Create dataframe with expected feature columns
-    input_df = pd.DataFrame([new_input])
-
-    # Ensure all feature columns exist
-    for col in feature_columns:
-        if col not in input_df.columns:
-            input_df[col] = 0  # fill missing with 0
-
-    input_df = input_df[feature_columns]  # reorder to match training
-
-    # Predict
-    prediction = model.predict(input_df)
-    return max(0, int(round(prediction[0])))
+    return _predict_one("shares", new_input)
 
 def predict_engagement_category(predicted_likes):
     if predicted_likes < 10:
@@ -71,14 +30,10 @@ def predict_engagement_category(predicted_likes):
         return "viral"
 
 def load_comments_model():
-    print("📦 Loading comments model...")
-    model_data = joblib.load(os.path.join("..", "models", "comments_predictor.pkl"))
-    return model_data["model"], model_data["features"]
+    return registry.get_model("comments")
 
 def load_shares_model():
-    print("📦 Loading shares model...")
-    model_data = joblib.load(os.path.join("..", "models", "shares_predictor.pkl"))
-    return model_data["model"], model_data["features"]
+    return registry.get_model("shares")
 
 if __name__ == "__main__":
     # 🧪 Example input (must match feature format used in training)
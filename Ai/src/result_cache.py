@@ -0,0 +1,106 @@
+import copy
+import functools
+import hashlib
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for cache keys: NFC unicode and collapsed whitespace (case is kept)"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with a time-to-live, keyed by a hash of normalized text.
+
+    Keys also include a namespace (e.g. "textblob") and a version string, so a
+    new library or lexicon version never serves results computed by the old one.
+    Values are deep-copied on the way out so callers can modify what they get.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 600):
+        self.max_size = max(0, int(max_size))
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(namespace: str, version: str, text: str) -> str:
+        digest = hashlib.blake2b(normalize_text(text).encode("utf-8"), digest_size=16).hexdigest()
+        return f"{namespace}:{version}:{digest}"
+
+    def get(self, key: str):
+        """Cached value for `key`, or None on a miss (or when expired)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(value)
+
+    def put(self, key: str, value):
+        if self.max_size == 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def memoize(self, namespace: str, version: str, passthrough: tuple = ()):
+        """
+        Decorator caching fn(text) by content; calls with extra arguments
+        (e.g. precomputed keyword matches) or non-string text bypass the cache.
+        Keyword arguments named in `passthrough` only carry precomputed work
+        for the same text (e.g. a TextAnalysis), so they are forwarded on a
+        miss without affecting the key.
+        """
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(text, *args, **kwargs):
+                forwarded = {name: kwargs.pop(name) for name in passthrough if name in kwargs}
+                if args or kwargs or not isinstance(text, str) or self.max_size == 0:
+                    return fn(text, *args, **kwargs, **forwarded)
+                key = self.make_key(namespace, version, text)
+                result = self.get(key)
+                if result is None:
+                    result = fn(text, **forwarded)
+                    self.put(key, result)
+                return result
+            return wrapper
+        return decorator
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.expirations = 0
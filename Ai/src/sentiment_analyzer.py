@@ -1,20 +1,92 @@
 from textblob import TextBlob
+import multiprocessing
+import os
 import re
-from typing import Dict, List
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Dict, List, Optional
 import numpy as np
+from keyword_matcher import KeywordMatcher
+from result_cache import ResultCache
 
+# Process pool used by analyze_sentiment_batch (TextBlob is CPU-bound and holds the GIL);
+# every gunicorn worker gets its own pool, so by default the cores are split between them
+SENTIMENT_POOL_WORKERS = int(os.getenv("SENTIMENT_POOL_WORKERS",
+                                       max(1, (os.cpu_count() or 1) // int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)))))
+# Texts sent to a pool worker per task
+SENTIMENT_CHUNK_SIZE = int(os.getenv("SENTIMENT_CHUNK_SIZE", 250))
 
-def analyze_sentiment(text: str) -> Dict:
+# Results cached per process by normalized text; size 0 disables the cache
+SENTIMENT_CACHE_SIZE = int(os.getenv("SENTIMENT_CACHE_SIZE", 10000))
+SENTIMENT_CACHE_TTL = float(os.getenv("SENTIMENT_CACHE_TTL", 600))
+# Bump when the analysis logic or lexicons below change so stale results are never served
+ANALYZER_VERSION = "1"
+
+sentiment_cache = ResultCache(SENTIMENT_CACHE_SIZE, SENTIMENT_CACHE_TTL)
+
+
+def _library_version(package: str) -> str:
+    try:
+        from importlib.metadata import version
+        return version(package)
+    except Exception:
+        return "unknown"
+
+# Keyword lexicons, all matched by one compiled scan (see keyword_matcher.py)
+KEYWORD_LEXICONS = {
+    "sentiment": {
+        "positive": [
+            "amazing", "awesome", "great", "love", "best", "excellent", "fantastic",
+            "wonderful", "perfect", "incredible", "outstanding", "brilliant", "good",
+            "happy", "excited", "thrilled", "delighted", "pleased", "satisfied",
+            "recommend", "impressed", "quality", "beautiful", "helpful", "useful"
+        ],
+        "negative": [
+            "terrible", "awful", "hate", "worst", "bad", "horrible", "disappointing",
+            "frustrated", "angry", "sad", "upset", "annoyed", "disgusted", "poor",
+            "useless", "waste", "broken", "problem", "issue", "fail", "wrong",
+            "difficult", "hard", "struggle", "concerned", "worried", "disappointed"
+        ],
+        "neutral": [
+            "okay", "fine", "average", "normal", "standard", "regular", "typical",
+            "basic", "simple", "plain", "ordinary", "common", "usual", "so-so"
+        ],
+    },
+    # Smaller lists used when TextBlob fails
+    "fallback": {
+        "positive": ["good", "great", "love", "amazing", "awesome", "best", "excellent"],
+        "negative": ["bad", "hate", "terrible", "awful", "worst", "horrible", "disappointing"],
+    },
+    "emotion": {
+        "joy": ["happy", "excited", "thrilled", "delighted", "cheerful", "ecstatic"],
+        "anger": ["angry", "furious", "mad", "irritated", "annoyed", "frustrated"],
+        "sadness": ["sad", "depressed", "upset", "disappointed", "gloomy", "melancholy"],
+        "fear": ["scared", "afraid", "worried", "anxious", "nervous", "terrified"],
+        "surprise": ["surprised", "amazed", "shocked", "astonished", "stunned"],
+        "disgust": ["disgusted", "revolted", "repulsed", "sick", "nauseated"]
+    },
+}
+
+keyword_matcher = KeywordMatcher(KEYWORD_LEXICONS)
+
+
+@sentiment_cache.memoize("textblob", f"{ANALYZER_VERSION}-{_library_version('textblob')}", passthrough=("analysis",))
+def analyze_sentiment(text: str, analysis=None) -> Dict:
     """
     Analyze sentiment of text using TextBlob and rule-based analysis
 
     Args:
         text: Text to analyze
+        analysis: Optional TextAnalysis of `text`, reused for keyword matches
 
     Returns:
         Dict with sentiment, confidence, and detailed scores
     """
 
+    matches = analysis.keyword_matches if analysis is not None else None
+
     try:
         # Use TextBlob for basic sentiment analysis
         blob = TextBlob(text)
@@ -34,7 +106,7 @@ def analyze_sentiment(text: str) -> Dict:
         confidence = min(abs(polarity) + 0.3, 1.0)
 
         # Enhanced analysis with keyword detection
-        enhanced_scores = analyze_sentiment_keywords(text)
+        enhanced_scores = analyze_sentiment_keywords(text, matches)
 
         # Combine TextBlob and keyword analysis
         final_sentiment = combine_sentiment_scores(
@@ -56,40 +128,94 @@ def analyze_sentiment(text: str) -> Dict:
     except Exception as e:
         print(f"Error in sentiment analysis: {str(e)}")
         # Fallback to basic rule-based analysis
-        return analyze_sentiment_fallback(text)
+        return analyze_sentiment_fallback(text, matches)
 
 
-def analyze_sentiment_keywords(text: str) -> Dict:
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    """Process pool shared by every batch call in this process (None when one worker is configured)"""
+    global _pool
+    if SENTIMENT_POOL_WORKERS <= 1:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: a forked child of a threaded gunicorn worker inherits whatever
+            # locks (cache, engines, this one) another thread held at that moment and can deadlock
+            _pool = ProcessPoolExecutor(max_workers=SENTIMENT_POOL_WORKERS,
+                                        mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def _reset_pool(broken: ProcessPoolExecutor):
+    """Drop a pool whose worker died so the next _get_pool() builds a fresh one"""
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _analyze_chunk(texts: List[str], engine: Optional[str] = None) -> List[Dict]:
+    from sentiment_engines import get_engine
+    analyze = get_engine(engine).analyze
+    return [analyze(text) for text in texts]
+
+
+def analyze_sentiment_batch(texts: List, chunk_size: int = SENTIMENT_CHUNK_SIZE,
+                            engine: Optional[str] = None) -> List[Dict]:
+    """
+    Analyze many texts with a sentiment engine (see sentiment_engines.py), spreading
+    chunks of them over a process pool
+
+    Returns a list aligned with `texts`: each item is the analyze_sentiment result plus
+    `index` and `status`; items that are not non-empty strings carry an `error` instead.
+    Batches that fit in one chunk are analyzed in-process to skip the IPC round trip.
+    """
+    results = [None] * len(texts)
+    valid_indices = []
+    for i, text in enumerate(texts):
+        if isinstance(text, str) and text.strip():
+            valid_indices.append(i)
+        else:
+            results[i] = {"index": i, "status": "error", "error": "Text must be a non-empty string"}
+
+    chunks = [valid_indices[start:start + chunk_size] for start in range(0, len(valid_indices), chunk_size)]
+    analyzed = None
+    # A killed pool worker breaks the whole pool: rebuild it once, then fall back to in-process
+    for _ in range(2):
+        pool = _get_pool() if len(chunks) > 1 else None
+        if pool is None:
+            break
+        try:
+            analyzed = list(pool.map(partial(_analyze_chunk, engine=engine),
+                                     [[texts[i] for i in chunk] for chunk in chunks]))
+            break
+        except BrokenProcessPool:
+            print("⚠️ Sentiment process pool broken, restarting it")
+            _reset_pool(pool)
+    if analyzed is None:
+        analyzed = (_analyze_chunk([texts[i] for i in chunk], engine) for chunk in chunks)
+
+    # pool.map yields chunks in submission order, so results stay aligned with `texts`
+    for chunk, chunk_results in zip(chunks, analyzed):
+        for i, result in zip(chunk, chunk_results):
+            results[i] = {"index": i, "status": "success", **result}
+    return results
+
+
+def analyze_sentiment_keywords(text: str, matches: Optional[Dict] = None) -> Dict:
     """Enhanced sentiment analysis using keyword detection"""
 
-    # Positive keywords
-    positive_keywords = [
-        "amazing", "awesome", "great", "love", "best", "excellent", "fantastic",
-        "wonderful", "perfect", "incredible", "outstanding", "brilliant", "good",
-        "happy", "excited", "thrilled", "delighted", "pleased", "satisfied",
-        "recommend", "impressed", "quality", "beautiful", "helpful", "useful"
-    ]
-
-    # Negative keywords
-    negative_keywords = [
-        "terrible", "awful", "hate", "worst", "bad", "horrible", "disappointing",
-        "frustrated", "angry", "sad", "upset", "annoyed", "disgusted", "poor",
-        "useless", "waste", "broken", "problem", "issue", "fail", "wrong",
-        "difficult", "hard", "struggle", "concerned", "worried", "disappointed"
-    ]
-
-    # Neutral keywords
-    neutral_keywords = [
-        "okay", "fine", "average", "normal", "standard", "regular", "typical",
-        "basic", "simple", "plain", "ordinary", "common", "usual", "so-so"
-    ]
-
-    text_lower = text.lower()
-
-    # Count keyword occurrences
-    positive_count = sum(1 for word in positive_keywords if word in text_lower)
-    negative_count = sum(1 for word in negative_keywords if word in text_lower)
-    neutral_count = sum(1 for word in neutral_keywords if word in text_lower)
+    matches = matches or keyword_matcher.match(text)
+    sentiment_matches = matches["sentiment"]
+
+    # Count distinct keywords per category
+    positive_count = sentiment_matches["distinct"]["positive"]
+    negative_count = sentiment_matches["distinct"]["negative"]
+    neutral_count = sentiment_matches["distinct"]["neutral"]
 
     total_sentiment_words = positive_count + negative_count + neutral_count
 
@@ -106,17 +232,9 @@ def analyze_sentiment_keywords(text: str) -> Dict:
     negative_score = negative_count / total_sentiment_words
     neutral_score = neutral_count / total_sentiment_words
 
-    # Find detected keywords
-    detected_keywords = []
-    for word in positive_keywords:
-        if word in text_lower:
-            detected_keywords.append({"word": word, "sentiment": "positive"})
-    for word in negative_keywords:
-        if word in text_lower:
-            detected_keywords.append({"word": word, "sentiment": "negative"})
-    for word in neutral_keywords:
-        if word in text_lower:
-            detected_keywords.append({"word": word, "sentiment": "neutral"})
+    # Detected keywords, in lexicon order
+    detected_keywords = [{"word": k["word"], "sentiment": k["category"]}
+                         for k in sentiment_matches["keywords"]]
 
     return {
         "positive": round(positive_score, 2),
@@ -145,18 +263,12 @@ def combine_sentiment_scores(textblob_sentiment: str, keyword_scores: Dict, pola
         return "neutral"
 
 
-def analyze_sentiment_fallback(text: str) -> Dict:
+def analyze_sentiment_fallback(text: str, matches: Optional[Dict] = None) -> Dict:
     """Fallback sentiment analysis using basic rules"""
 
-    positive_words = ["good", "great", "love",
-                      "amazing", "awesome", "best", "excellent"]
-    negative_words = ["bad", "hate", "terrible",
-                      "awful", "worst", "horrible", "disappointing"]
-
-    text_lower = text.lower()
-
-    positive_count = sum(1 for word in positive_words if word in text_lower)
-    negative_count = sum(1 for word in negative_words if word in text_lower)
+    fallback_matches = (matches or keyword_matcher.match(text))["fallback"]
+    positive_count = fallback_matches["distinct"]["positive"]
+    negative_count = fallback_matches["distinct"]["negative"]
 
     if positive_count > negative_count:
         sentiment = "positive"
@@ -182,28 +294,17 @@ def analyze_sentiment_fallback(text: str) -> Dict:
     }
 
 
-def analyze_emotion(text: str) -> Dict:
+@sentiment_cache.memoize("emotion", ANALYZER_VERSION, passthrough=("analysis",))
+def analyze_emotion(text: str, matches: Optional[Dict] = None, analysis=None) -> Dict:
     """
     Analyze emotions in text beyond just sentiment
 
     Returns: Dict with emotion categories and scores
     """
 
-    emotion_keywords = {
-        "joy": ["happy", "excited", "thrilled", "delighted", "cheerful", "ecstatic"],
-        "anger": ["angry", "furious", "mad", "irritated", "annoyed", "frustrated"],
-        "sadness": ["sad", "depressed", "upset", "disappointed", "gloomy", "melancholy"],
-        "fear": ["scared", "afraid", "worried", "anxious", "nervous", "terrified"],
-        "surprise": ["surprised", "amazed", "shocked", "astonished", "stunned"],
-        "disgust": ["disgusted", "revolted", "repulsed", "sick", "nauseated"]
-    }
-
-    text_lower = text.lower()
-    emotion_scores = {}
-
-    for emotion, keywords in emotion_keywords.items():
-        count = sum(1 for word in keywords if word in text_lower)
-        emotion_scores[emotion] = count
+    if matches is None and analysis is not None:
+        matches = analysis.keyword_matches
+    emotion_scores = dict((matches or keyword_matcher.match(text))["emotion"]["distinct"])
 
     # Normalize scores
     total_emotions = sum(emotion_scores.values())
@@ -211,7 +312,7 @@ def analyze_emotion(text: str) -> Dict:
         emotion_scores = {k: round(v / total_emotions, 2)
                           for k, v in emotion_scores.items()}
     else:
-        emotion_scores = {k: 0 for k in emotion_keywords.keys()}
+        emotion_scores = {k: 0 for k in KEYWORD_LEXICONS["emotion"]}
 
     # Find dominant emotion
     dominant_emotion = max(emotion_scores.items(), key=lambda x: x[1])
@@ -251,38 +352,56 @@ def get_sentiment_suggestions(sentiment: str, confidence: float) -> List[str]:
 
 # Alternative: Using VADER sentiment (more suitable for social media)
 
+_vader_analyzer = None
+_vader_lock = threading.Lock()
+
 
+def get_vader_analyzer():
+    """
+    Process-wide VADER analyzer (None if vaderSentiment is not installed)
+    Building one parses the whole VADER lexicon, so it is only done once
+    """
+    global _vader_analyzer
+    if _vader_analyzer is None:
+        with _vader_lock:
+            if _vader_analyzer is None:
+                try:
+                    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+                except ImportError:
+                    return None
+                _vader_analyzer = SentimentIntensityAnalyzer()
+    return _vader_analyzer
+
+
+@sentiment_cache.memoize("vader", f"{ANALYZER_VERSION}-{_library_version('vaderSentiment')}")
 def analyze_sentiment_vader(text: str) -> Dict:
     """
     Analyze sentiment using VADER (Valence Aware Dictionary and sEntiment Reasoner)
     Better for social media content with slang, emoticons, etc.
     Requires: pip install vaderSentiment
     """
-    try:
-        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    analyzer = get_vader_analyzer()
+    if analyzer is None:
+        # Fallback to TextBlob if VADER not available
+        return analyze_sentiment(text)
 
-        analyzer = SentimentIntensityAnalyzer()
-        scores = analyzer.polarity_scores(text)
+    scores = analyzer.polarity_scores(text)
 
-        # Determine overall sentiment
-        if scores['compound'] >= 0.05:
-            sentiment = 'positive'
-        elif scores['compound'] <= -0.05:
-            sentiment = 'negative'
-        else:
-            sentiment = 'neutral'
+    # Determine overall sentiment
+    if scores['compound'] >= 0.05:
+        sentiment = 'positive'
+    elif scores['compound'] <= -0.05:
+        sentiment = 'negative'
+    else:
+        sentiment = 'neutral'
 
-        return {
-            "sentiment": sentiment,
-            "confidence": abs(scores['compound']),
-            "scores": {
-                "positive": scores['pos'],
-                "negative": scores['neg'],
-                "neutral": scores['neu'],
-                "compound": scores['compound']
-            }
+    return {
+        "sentiment": sentiment,
+        "confidence": abs(scores['compound']),
+        "scores": {
+            "positive": scores['pos'],
+            "negative": scores['neg'],
+            "neutral": scores['neu'],
+            "compound": scores['compound']
         }
-
-    except ImportError:
-        # Fallback to TextBlob if VADER not available
-        return analyze_sentiment(text)
+    }
@@ -0,0 +1,125 @@
+import os
+import threading
+from typing import Dict, List
+
+from textblob import TextBlob
+
+from fast_sentiment import analyze_sentiment_fast, get_fast_analyzer
+from sentiment_analyzer import (analyze_sentiment, analyze_sentiment_fallback, analyze_sentiment_vader,
+                                get_vader_analyzer, keyword_matcher)
+
+# Engine used when a request does not name one
+DEFAULT_SENTIMENT_ENGINE = os.getenv("SENTIMENT_ENGINE", "textblob")
+
+
+class TextBlobEngine:
+    """TextBlob polarity combined with keyword scores (the original analyze_sentiment)"""
+
+    name = "textblob"
+
+    def analyze(self, text: str) -> Dict:
+        return analyze_sentiment(text)
+
+    def polarity_scores(self, texts: List[str]) -> List[Dict]:
+        scores = []
+        for text in texts:
+            sentiment = TextBlob(text).sentiment
+            scores.append({"polarity": sentiment.polarity, "subjectivity": sentiment.subjectivity})
+        return scores
+
+
+class VaderEngine:
+    """VADER, tuned for social media (slang, emphasis, emoticons); the lexicon is parsed once"""
+
+    name = "vader"
+
+    def __init__(self):
+        self.analyzer = get_vader_analyzer()
+        if self.analyzer is None:
+            raise ImportError("vaderSentiment is not installed")
+
+    def analyze(self, text: str) -> Dict:
+        return analyze_sentiment_vader(text)
+
+    def polarity_scores(self, texts: List[str]) -> List[Dict]:
+        polarity_scores = self.analyzer.polarity_scores
+        return [polarity_scores(text) for text in texts]
+
+
+class LexiconEngine:
+    """Keyword counts only; the cheapest engine and the fallback when TextBlob fails"""
+
+    name = "lexicon"
+
+    def analyze(self, text: str) -> Dict:
+        return analyze_sentiment_fallback(text)
+
+    def polarity_scores(self, texts: List[str]) -> List[Dict]:
+        scores = []
+        for text in texts:
+            counts = keyword_matcher.match(text)["fallback"]["distinct"]
+            total = counts["positive"] + counts["negative"]
+            scores.append({
+                "positive": counts["positive"],
+                "negative": counts["negative"],
+                "polarity": (counts["positive"] - counts["negative"]) / total if total else 0.0,
+            })
+        return scores
+
+
+class FastEngine:
+    """TextBlob's lexicon as a precomputed table scored in one pass; same schema as textblob"""
+
+    name = "fast"
+
+    def __init__(self):
+        self.analyzer = get_fast_analyzer()
+
+    def analyze(self, text: str) -> Dict:
+        return analyze_sentiment_fast(text)
+
+    def polarity_scores(self, texts: List[str]) -> List[Dict]:
+        scores = []
+        for text in texts:
+            polarity, subjectivity, _ = self.analyzer.score(text)
+            scores.append({"polarity": polarity, "subjectivity": subjectivity})
+        return scores
+
+
+ENGINES = {
+    "textblob": TextBlobEngine,
+    "vader": VaderEngine,
+    "lexicon": LexiconEngine,
+    "fast": FastEngine,
+}
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(name: str = None):
+    """Return the process-wide instance of a sentiment engine, building it on first use"""
+    name = name or DEFAULT_SENTIMENT_ENGINE
+    if name not in ENGINES:
+        raise ValueError(f"Unknown sentiment engine '{name}'. Available: {', '.join(ENGINES)}")
+
+    engine = _engines.get(name)
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(name)
+            if engine is None:
+                engine = ENGINES[name]()
+                _engines[name] = engine
+    return engine
+
+
+def warm_engines() -> List[str]:
+    """Build every available engine up front (e.g. before forking workers)"""
+    loaded = []
+    for name in ENGINES:
+        try:
+            get_engine(name)
+            loaded.append(name)
+        except ImportError as e:
+            print(f"⚠️ Sentiment engine {name} unavailable: {e}")
+    return loaded
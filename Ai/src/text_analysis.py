@@ -0,0 +1,65 @@
+import re
+from functools import cached_property
+from typing import Dict, List
+
+# Words (letters/digits with inner apostrophes or hyphens, e.g. "don't", "so-so"), hashtags and emojis
+_WORD_RE = re.compile(r"[^\W_]+(?:['’-][^\W_]+)*")
+_HASHTAG_RE = re.compile(r"#(\w+)")
+_EMOJI_RE = re.compile(
+    "[\U0001F300-\U0001FAFF\U00002600-\U000027BF\U0001F000-\U0001F2FF\U0001F900-\U0001F9FF⬀-⯿]"
+)
+
+
+class TextAnalysis:
+    """
+    One tokenization of a text, shared by every text feature of a request.
+
+    Sentiment, emotion, caption suggestions, hashtags and the engagement model
+    all read from the same object instead of lowercasing and scanning the text
+    again. Keyword matches are computed on first use.
+    """
+
+    def __init__(self, text: str):
+        self.text = text or ""
+        self.lower = self.text.lower()
+        self.length = len(self.text)
+        self.words = _WORD_RE.findall(self.lower)
+        self.hashtags = _HASHTAG_RE.findall(self.text)
+        self.emojis = _EMOJI_RE.findall(self.text)
+        self.question_count = self.text.count("?")
+
+        letters = sum(1 for char in self.text if char.isalpha())
+        uppercase = sum(1 for char in self.text if char.isupper())
+        self.uppercase_ratio = uppercase / letters if letters else 0.0
+
+    @property
+    def word_count(self) -> int:
+        return len(self.words)
+
+    @property
+    def has_question(self) -> bool:
+        return self.question_count > 0
+
+    @cached_property
+    def keyword_matches(self) -> Dict:
+        """Sentiment/emotion lexicon matches (see keyword_matcher.py)"""
+        from sentiment_analyzer import keyword_matcher
+        return keyword_matcher.match(self.text)
+
+    def content_words(self, min_length: int = 4) -> List[str]:
+        """Words long enough to be topical (used for hashtag suggestions)"""
+        return [word for word in self.words if len(word) >= min_length]
+
+    def engagement_features(self) -> Dict:
+        """Text-derived inputs of the engagement models"""
+        return {"length": self.length}
+
+    def to_dict(self) -> Dict:
+        return {
+            "length": self.length,
+            "word_count": self.word_count,
+            "hashtags": self.hashtags,
+            "emojis": self.emojis,
+            "question_count": self.question_count,
+            "uppercase_ratio": round(self.uppercase_ratio, 3),
+        }
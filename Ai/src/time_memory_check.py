@@ -0,0 +1,120 @@
+"""
+Memory-cap check for external-memory time-model training.
+
+Writes a synthetic timeline whose CSVs are larger than the memory cap, trains the
+time models on it with TIME_TRAINING_MODE=external in a child process and fails
+unless training completes with the child's peak RSS under the cap.
+
+The cap is on the child's whole RSS, not only the training data: the interpreter with
+pandas, pyarrow and xgboost imported already sits at roughly 250 MB before reading a
+row, so a cap only means something well above that floor (e.g. --memory-cap-mb 120 on
+60 MB of CSV fails at a ~290 MB peak, nearly all of it the floor).
+
+    python time_memory_check.py                          # 512 MB cap, 1.5x that much data
+    python time_memory_check.py --memory-cap-mb 400 --data-mb 1000 --compare
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# Peak RSS the external-memory training has to stay under
+TIME_TRAIN_MEMORY_CAP_MB = int(os.getenv("TIME_TRAIN_MEMORY_CAP_MB", 512))
+# Approximate RSS of a training process before any data is read (interpreter plus imports)
+TRAIN_RSS_FLOOR_MB = 250
+
+_WORDS = np.array("the quick brown fox jumps over lazy dog reddit post today update why new".split())
+
+
+def write_synthetic_timeline(out_dir: str, data_mb: float, rows_per_file: int = 50000, seed: int = 42) -> int:
+    """Write timeline CSVs (one per synthetic subreddit) until they total `data_mb` MB; returns the row count"""
+    os.makedirs(out_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    written, rows, index = 0, 0, 0
+    while written < data_mb * 2**20:
+        epoch = rng.integers(1_600_000_000, 1_700_000_000, rows_per_file)
+        # Alternate epoch seconds and date strings, like the real per-subreddit exports
+        created = epoch.astype(float) if index % 2 == 0 else pd.to_datetime(epoch, unit="s").strftime("%Y-%m-%d %H:%M:%S")
+        has_body = rng.random(rows_per_file) < 0.5
+        df = pd.DataFrame({
+            "created_utc": created,
+            "title": [" ".join(rng.choice(_WORDS, 8)) for _ in range(rows_per_file)],
+            "body": [" ".join(rng.choice(_WORDS, 60)) if body else "" for body in has_body],
+            "post_type": rng.choice(["text", "image", "video", "link"], rows_per_file),
+            "score": rng.integers(0, 5000, rows_per_file),
+            "upvote_ratio": rng.random(rows_per_file).round(2),
+            "num_comments": rng.integers(0, 500, rows_per_file),
+            "num_awards": rng.integers(0, 5, rows_per_file),
+            "num_crossposts": rng.integers(0, 5, rows_per_file),
+            "subscribers": rng.integers(1000, 10_000_000),
+        })
+        path = os.path.join(out_dir, f"synthetic{index:03d}.csv")
+        df.to_csv(path, index=False)
+        written += os.path.getsize(path)
+        rows += rows_per_file
+        index += 1
+    return rows
+
+
+def _train(mode: str, data_dir: str, models_dir: str, results):
+    """Child process: train into `models_dir` without touching the real models or feature cache"""
+    os.environ["TIME_FEATURE_CACHE_DIR"] = "off"
+    from time_prediction import train_time_prediction_system
+    engine = train_time_prediction_system(mode, data_dir, models_dir, bundle=False)
+    results.put(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+    sys.exit(0 if engine is not None else 1)
+
+
+def run_training(mode: str, data_dir: str, models_dir: str) -> dict:
+    """Train in a fresh child process; returns its exit code, peak RSS (MB) and duration"""
+    start = time.perf_counter()
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_train, args=(mode, data_dir, models_dir, results))
+    process.start()
+    process.join()
+    return {
+        "exitcode": process.exitcode,
+        "peak_rss_mb": round(results.get(), 1) if not results.empty() else None,
+        "seconds": round(time.perf_counter() - start, 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that external-memory time training stays under a memory cap")
+    parser.add_argument("--memory-cap-mb", type=float, default=TIME_TRAIN_MEMORY_CAP_MB)
+    parser.add_argument("--data-mb", type=float, default=None, help="Synthetic CSV size (default: 1.5x the cap)")
+    parser.add_argument("--rows-per-file", type=int, default=50000)
+    parser.add_argument("--compare", action="store_true", help="Also train in memory and report its peak RSS")
+    args = parser.parse_args()
+    data_mb = args.data_mb or args.memory_cap_mb * 1.5
+    if args.memory_cap_mb <= TRAIN_RSS_FLOOR_MB:
+        print(f"⚠️ A {args.memory_cap_mb:.0f} MB cap is below the ~{TRAIN_RSS_FLOOR_MB} MB a training process "
+              f"uses before reading any data; expect this check to fail")
+
+    with tempfile.TemporaryDirectory(prefix="time-memory-check-") as workdir:
+        data_dir = os.path.join(workdir, "timeline")
+        rows = write_synthetic_timeline(data_dir, data_mb, args.rows_per_file)
+        print(f"🧪 Synthetic timeline: {rows} posts, {data_mb:.0f} MB of CSV, memory cap {args.memory_cap_mb:.0f} MB")
+
+        external = run_training("external", data_dir, os.path.join(workdir, "models-external"))
+        if external["exitcode"] != 0:
+            print(f"❌ External-memory training failed (exit code {external['exitcode']})")
+            sys.exit(1)
+        print(f"📏 External-memory training: peak RSS {external['peak_rss_mb']} MB in {external['seconds']}s")
+
+        if args.compare:
+            memory = run_training("memory", data_dir, os.path.join(workdir, "models-memory"))
+            print(f"📏 In-memory training: peak RSS {memory['peak_rss_mb']} MB in {memory['seconds']}s "
+                  f"(exit code {memory['exitcode']})")
+
+        if external["peak_rss_mb"] > args.memory_cap_mb:
+            print(f"❌ External-memory peak RSS above the {args.memory_cap_mb:.0f} MB cap")
+            sys.exit(1)
+        print(f"✅ Trained on {data_mb:.0f} MB of timeline under the {args.memory_cap_mb:.0f} MB cap")
@@ -1,16 +1,35 @@
-import joblib
 import os
-from time_prediction import TimePredictionEngine
+import threading
+from time_prediction import TimePredictionEngine, DEFAULT_SUBREDDIT_CACHE_SIZE
+from model_registry import MODELS_DIR
+from model_bundle import get_current_bundle
+
+# Maximum number of subreddit models kept in memory at once
+SUBREDDIT_CACHE_SIZE = int(os.getenv('TIME_MODEL_CACHE_SIZE', DEFAULT_SUBREDDIT_CACHE_SIZE))
+
+_engine = None
+_engine_lock = threading.Lock()
 
 def load_time_prediction_model():
-    """Load the time prediction model"""
-    try:
-        engine = TimePredictionEngine()
-        engine.load_models()
-        return engine
-    except Exception as e:
-        print(f"Warning: Could not load time prediction model: {e}")
-        return None
+    """Return the process-wide time prediction engine, loading it on first use"""
+    global _engine
+    if _engine is not None:
+        return _engine
+    
+    with _engine_lock:
+        if _engine is None:
+            try:
+                engine = TimePredictionEngine(subreddit_cache_size=SUBREDDIT_CACHE_SIZE)
+                bundle = get_current_bundle()
+                if bundle is not None and bundle.has('time_global'):
+                    engine.load_bundle(bundle)
+                else:
+                    engine.load_models(MODELS_DIR)
+                _engine = engine
+            except Exception as e:
+                print(f"Warning: Could not load time prediction model: {e}")
+                return None
+    return _engine
 
 def predict_optimal_time(subreddit: str, content_type: str = "text", user_data: dict = None):
     """
@@ -45,6 +64,30 @@ def predict_optimal_time(subreddit: str, content_type: str = "text", user_data:
             "error": str(e)
         }
 
+def predict_time_heatmap(subreddit: str, content_type: str = "text", user_data: dict = None):
+    """
+    Score all 24 posting hours for a subreddit and content type (weekday is not modelled)
+    
+    Returns:
+        Dict with the 24 hourly scores and the hours ranked best first
+    """
+    engine = load_time_prediction_model()
+    if not engine or not engine.global_model:
+        return {
+            "subreddit": subreddit,
+            "content_type": content_type,
+            "status": "fallback",
+            "error": "Time prediction models not available"
+        }
+    return engine.predict_time_heatmap(subreddit, content_type, user_data)
+
+def score_posting_hours(subreddit: str, content_type: str, hours: list, user_data: dict = None):
+    """Score a list of candidate posting hours in one batch (empty list if models are unavailable)"""
+    engine = load_time_prediction_model()
+    if not engine or not engine.global_model:
+        return []
+    return engine.score_time_slots(subreddit, content_type, [{'hour': hour} for hour in hours], user_data)
+
 def get_time_slot_name(hour: int) -> str:
     """Convert hour to time slot name"""
     if 0 <= hour < 6:
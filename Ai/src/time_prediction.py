@@ -1,67 +1,501 @@
 import pandas as pd
 import numpy as np
 import os
-from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
+import json
+import ctypes
+import hashlib
+import shutil
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Tuple, Optional
 import joblib
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as pa_ds
+import pyarrow.parquet as pq
+import scipy.sparse as sp
+import multiprocessing
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import xgboost as xgb
 from xgboost import XGBRegressor, XGBClassifier
 from sklearn.model_selection import TimeSeriesSplit
 from sklearn.metrics import mean_squared_error, accuracy_score
+from inference_backend import backend_for, make_backend, unwrap_model
+from model_registry import MODELS_DIR
+from timestamp_parser import parse_timestamps
+from feature_cache import FeatureCache
+import version_lease
 import warnings
 warnings.filterwarnings('ignore')
 
+DEFAULT_SUBREDDIT_CACHE_SIZE = 16
+
+# Timeline CSVs used for training, resolved from this file rather than the working directory
+TIME_DATA_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data", "timeline"))
+
+# Weights used to blend the global, subreddit and content-type hour predictions
+ENSEMBLE_WEIGHTS = {'global': 0.3, 'subreddit': 0.5, 'content_type': 0.2}
+
+CONTENT_TYPES = ['text', 'image', 'video', 'link']
+
+# Precomputed (subreddit, content_type) answers persisted next to the models
+LOOKUP_TABLE_FILENAME = 'time_prediction_lookup.json'
+# Running per-(subreddit, hour) post counts and engagement sums, kept for incremental updates
+TARGET_AGGREGATES_FILENAME = 'time_target_aggregates.json'
+# Text file in the models dir naming the time-<version> directory to serve; without it the
+# time models are the loose files in the models dir itself (the layout before versioning)
+TIME_MODELS_POINTER = 'TIME_CURRENT'
+# Versioned time model directories kept after a new one is published
+TIME_MODEL_VERSIONS_KEPT = int(os.getenv('TIME_MODEL_VERSIONS_KEPT', 3))
+# Table key used for subreddits without their own model or one-hot column
+UNKNOWN_SUBREDDIT_KEY = '*'
+
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Columns of the timeline CSVs the feature pipeline reads, with their types; everything else is
+# skipped at parse time. created_utc stays a string: its format varies per file (see timestamp_parser.py)
+TIMELINE_SCHEMA = {
+    'created_utc': pa.string(),
+    'title': pa.string(),
+    'body': pa.string(),
+    'post_type': pa.string(),
+    'score': pa.float64(),
+    'upvote_ratio': pa.float64(),
+    'num_comments': pa.float64(),
+    'num_awards': pa.float64(),
+    'num_crossposts': pa.float64(),
+    'subscribers': pa.float64(),
+}
+TIMELINE_NUMERIC_COLUMNS = [name for name, dtype in TIMELINE_SCHEMA.items() if dtype == pa.float64()]
+TIMELINE_EXCLUDED_FILES = {'50_subreddits_list.csv'}
+# Threads reading timeline CSVs concurrently
+TIME_INGEST_WORKERS = int(os.getenv("TIME_INGEST_WORKERS", min(8, os.cpu_count() or 1)))
+# Optional Parquet copy of the timeline, partitioned by subreddit; reused while newer than every CSV
+TIME_PARQUET_DIR = os.getenv("TIME_PARQUET_DIR") or None
+
+# Processes fitting subreddit/content-type models in parallel; each fit gets an equal share of the
+# cores as XGBoost threads so the pool never runs more threads than there are cores
+TIME_TRAIN_WORKERS = int(os.getenv("TIME_TRAIN_WORKERS", os.cpu_count() or 1))
+# Rows a subreddit or content type needs before it gets its own model
+MIN_GROUP_ROWS = 100
+GLOBAL_MODEL_PARAMS = {'n_estimators': 100, 'max_depth': 6, 'learning_rate': 0.1, 'random_state': 42}
+GROUP_MODEL_PARAMS = {'n_estimators': 50, 'max_depth': 4, 'random_state': 42}
+# Boosting rounds added to each model by TimePredictionEngine.update
+TIME_UPDATE_ROUNDS = int(os.getenv("TIME_UPDATE_ROUNDS", 10))
+# New rows a subreddit or content type needs before update() continues boosting its model
+MIN_UPDATE_ROWS = 10
+
+# Bump when engineer_time_features or create_optimal_time_targets change, so cached features are rebuilt
+FEATURE_PIPELINE_VERSION = "2"
+# Engineered features cached per timeline CSV ("off" disables)
+TIME_FEATURE_CACHE_DIR = os.getenv("TIME_FEATURE_CACHE_DIR", os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "data", "feature_cache")))
+
+# "memory" trains on the consolidated frame; "external" streams the cached per-file features to
+# XGBoost in batches (external memory), for timelines that do not fit in memory
+TIME_TRAINING_MODE = os.getenv("TIME_TRAINING_MODE", "memory")
+# Rows per batch handed to XGBoost in external-memory mode
+TIME_EXTERNAL_BATCH_ROWS = int(os.getenv("TIME_EXTERNAL_BATCH_ROWS", 100000))
+# Where XGBoost writes its external-memory pages (default: the system temp directory)
+TIME_EXTERNAL_PAGE_DIR = os.getenv("TIME_EXTERNAL_PAGE_DIR") or None
+
+# Raw columns only read to derive features; dropped once engineered to keep training frames small
+DERIVED_SOURCE_COLUMNS = ['created_utc', 'created_datetime', 'title', 'body', 'post_type']
+# Compact dtypes of the engineered columns. score, upvote_ratio and num_comments stay float64
+# since the targets are computed from them; the model sees every feature as float32 anyway
+ENGINEERED_DTYPES = {
+    'hour': 'int8', 'day_of_week': 'int8', 'day_of_month': 'int8', 'month': 'int8', 'year': 'int16',
+    'is_weekend': 'int8', 'has_body': 'int8', 'is_image': 'int8', 'is_video': 'int8',
+    'is_text': 'int8', 'is_link': 'int8', 'title_length': 'float32', 'body_length': 'float32',
+    'num_awards': 'float32', 'num_crossposts': 'float32', 'subscribers': 'float32',
+}
+SEASONS = pd.CategoricalDtype(['Fall', 'Spring', 'Summer', 'Winter'])
+TIME_SLOTS = ['Night', 'Morning', 'Afternoon', 'Evening']
+
+# Model inputs: numeric features, then one one-hot column per level of each categorical feature
+NUMERIC_FEATURES = [
+    'hour', 'day_of_week', 'day_of_month', 'month', 'year',
+    'is_weekend', 'title_length', 'has_body', 'body_length',
+    'is_image', 'is_video', 'is_text', 'is_link',
+    'score', 'upvote_ratio', 'num_comments', 'num_awards', 'num_crossposts',
+    'subscribers'
+]
+CATEGORICAL_FEATURES = ['season', 'time_slot', 'subreddit']
+ONE_HOT_PREFIXES = tuple(f'{feature}_' for feature in CATEGORICAL_FEATURES)
+
+
+def read_timeline_csv(file_path: str) -> pa.Table:
+    """Read the pipeline's columns from one timeline CSV with the pyarrow engine"""
+    read_options = pa_csv.ReadOptions(use_threads=False)  # files are read in parallel instead
+    # Skip rows with the wrong number of fields instead of failing the whole file
+    parse_options = pa_csv.ParseOptions(newlines_in_values=True, invalid_row_handler=lambda row: 'skip')
+    # The system allocator returns parse buffers to the OS; mimalloc keeps them, nearly doubling peak RSS
+    memory_pool = pa.system_memory_pool()
+    try:
+        convert_options = pa_csv.ConvertOptions(
+            column_types=TIMELINE_SCHEMA, include_columns=list(TIMELINE_SCHEMA),
+            include_missing_columns=True, strings_can_be_null=True)
+        return pa_csv.read_csv(file_path, read_options=read_options, parse_options=parse_options,
+                               convert_options=convert_options, memory_pool=memory_pool)
+    except pa.ArrowInvalid:
+        # A malformed numeric cell: read those columns as text and coerce them like pandas would
+        convert_options = pa_csv.ConvertOptions(
+            column_types={name: pa.string() for name in TIMELINE_SCHEMA},
+            include_columns=list(TIMELINE_SCHEMA), include_missing_columns=True,
+            strings_can_be_null=True)
+        table = pa_csv.read_csv(file_path, read_options=read_options, parse_options=parse_options,
+                                convert_options=convert_options, memory_pool=memory_pool)
+        for name in TIMELINE_NUMERIC_COLUMNS:
+            index = table.schema.get_field_index(name)
+            values = pd.to_numeric(table.column(name).to_pandas(), errors='coerce')
+            table = table.set_column(index, name, pa.array(values, type=pa.float64()))
+        return table
+
+
+def _fit_group_model(name: str, X: sp.csr_matrix, y: pd.Series, n_jobs: int) -> Tuple[str, XGBRegressor]:
+    """Fit one subreddit or content-type model (runs in a training worker process)"""
+    model = XGBRegressor(**GROUP_MODEL_PARAMS, n_jobs=n_jobs)
+    model.fit(X, y)
+    return name, model
+
+
+def _continue_boosting(model: XGBRegressor, X: sp.csr_matrix, y: pd.Series, rounds: int) -> XGBRegressor:
+    """Add `rounds` trees fitted on (X, y) to a trained model, keeping its hyperparameters"""
+    params = model.get_params()
+    params['n_estimators'] = rounds
+    updated = type(model)(**params)
+    updated.fit(X, y, xgb_model=model.get_booster())
+    return updated
+
+
+def encode_features(df: pd.DataFrame, feature_columns: List[str]) -> sp.csr_matrix:
+    """
+    Rows of `df` as a float32 CSR matrix over `feature_columns` (see prepare_features):
+    every numeric feature is stored, each categorical feature adds a 1 in its level's column
+    """
+    column_index = {col: i for i, col in enumerate(feature_columns)}
+    numeric = [col for col in feature_columns if not col.startswith(ONE_HOT_PREFIXES)]
+    
+    # One (column, value) slot per numeric feature and per categorical feature
+    indices = np.empty((len(df), len(numeric) + len(CATEGORICAL_FEATURES)), dtype=np.int32)
+    data = np.ones(indices.shape, dtype=np.float32)
+    for slot, col in enumerate(numeric):
+        indices[:, slot] = column_index[col]
+        data[:, slot] = df[col].to_numpy(dtype=np.float32, na_value=0) if col in df.columns else 0
+    for slot, feature in enumerate(CATEGORICAL_FEATURES, start=len(numeric)):
+        if feature not in df.columns:
+            indices[:, slot] = -1
+            continue
+        values = df[feature]
+        if not isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype('category')
+        # Column of each level (-1 without one); the extra entry is for missing values (code -1)
+        level_columns = [column_index.get(f'{feature}_{level}', -1) for level in values.cat.categories]
+        indices[:, slot] = np.array(level_columns + [-1], dtype=np.int32)[values.cat.codes.to_numpy()]
+    
+    present = indices >= 0
+    indptr = np.zeros(len(df) + 1, dtype=np.int64)
+    np.cumsum(present.sum(axis=1), out=indptr[1:])
+    if present.all():
+        indices, data = indices.ravel(), data.ravel()
+    else:
+        indices, data = indices[present], data[present]
+    return sp.csr_matrix((data, indices, indptr), shape=(len(df), len(feature_columns)))
+
+
+def _take_rows(X, rows: np.ndarray):
+    """Rows of a training matrix by position (CSR matrix, or DataFrame for models trained before it)"""
+    return X.iloc[rows] if isinstance(X, pd.DataFrame) else X[rows]
+
+
+def _one_hot_levels(values: pd.Series) -> List:
+    """Levels of a categorical feature in pd.get_dummies column order"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return list(values.cat.categories)
+    return sorted(values.dropna().unique())
+
+
+def hour_time_slot(hour: int) -> Optional[str]:
+    """Time slot one-hot level for an hour, matching pd.cut(bins=[0, 6, 12, 18, 24]) used in training"""
+    if 0 < hour <= 6:
+        return 'Night'
+    elif 6 < hour <= 12:
+        return 'Morning'
+    elif 12 < hour <= 18:
+        return 'Afternoon'
+    elif 18 < hour <= 24:
+        return 'Evening'
+    return None
+
+
+def _fit_external(params: Dict, batches: "EngineeredBatchIter") -> Tuple[XGBRegressor, float]:
+    """
+    Fit an XGBRegressor with `params` on a batch iterator: hist quantiles are sketched batch by
+    batch into an external-memory DMatrix. Returns the model and its training MSE.
+    """
+    if hasattr(xgb, 'ExtMemQuantileDMatrix'):
+        dtrain = xgb.ExtMemQuantileDMatrix(batches)
+    else:
+        # xgboost < 3.0: a DMatrix over an iterator with a cache prefix also pages batches to disk
+        dtrain = xgb.DMatrix(batches)
+    model = XGBRegressor(**params)
+    evals_result = {}
+    booster = xgb.train(model.get_xgb_params(), dtrain, num_boost_round=model.n_estimators,
+                        evals=[(dtrain, 'train')], evals_result=evals_result, verbose_eval=False)
+    # Same estimator type as the in-memory path, so saving, serving and update() work unchanged
+    model.load_model(bytearray(booster.save_raw('ubj')))
+    return model, evals_result['train']['rmse'][-1] ** 2
+
+
+class EngineeredBatchIter(xgb.DataIter):
+    """
+    Feeds cached engineered timeline files to XGBoost `batch_rows` rows at a time, encoded
+    over fixed feature columns. Only one batch is in memory at once; XGBoost keeps its
+    pages under `cache_prefix`. With `row_filter` (a 0/1 column such as 'is_image') only
+    the rows where it is 1 are used.
+    """
+
+    def __init__(self, paths: List[str], feature_columns: List[str], cache_prefix: str,
+                 batch_rows: int = TIME_EXTERNAL_BATCH_ROWS, row_filter: Optional[str] = None):
+        self.paths = list(paths)
+        self.feature_columns = feature_columns
+        self.batch_rows = batch_rows
+        self.row_filter = row_filter
+        self._batches = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def _read_batches(self):
+        columns = NUMERIC_FEATURES + CATEGORICAL_FEATURES + ['optimal_hour']
+        for path in self.paths:
+            parquet = pq.ParquetFile(path)
+            present = [col for col in columns if col in parquet.schema_arrow.names]
+            for batch in parquet.iter_batches(batch_size=self.batch_rows, columns=present):
+                df = batch.to_pandas()
+                if self.row_filter:
+                    df = df[df[self.row_filter] == 1]
+                if len(df):
+                    yield df
+
+    def next(self, input_data: Callable) -> bool:
+        if self._batches is None:
+            self._batches = self._read_batches()
+        df = next(self._batches, None)
+        if df is None:
+            return False
+        input_data(data=encode_features(df, self.feature_columns), label=df['optimal_hour'].to_numpy())
+        return True
+
+    def reset(self):
+        self._batches = None
+
+
+class LazyModelCache(Mapping):
+    """
+    Read-only mapping of subreddit -> model that loads artifacts on first access
+    and keeps at most `capacity` of them in memory (least recently used is evicted)
+    """
+
+    def __init__(self, loader: Callable[[str], object], keys: Iterable[str],
+                 capacity: int = DEFAULT_SUBREDDIT_CACHE_SIZE):
+        self._loader = loader
+        self._keys = set(keys)
+        self.capacity = max(1, int(capacity))
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __getitem__(self, key: str):
+        if key not in self._keys:
+            raise KeyError(key)
+
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                self.hits += 1
+                return model
+
+            self.misses += 1
+            model = self._loader(key)
+            self._models[key] = model
+            if len(self._models) > self.capacity:
+                self._models.popitem(last=False)
+                self.evictions += 1
+            return model
+
+    def __contains__(self, key) -> bool:
+        # Answer from the known keys without loading anything
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(sorted(self._keys))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "capacity": self.capacity,
+            "available": len(self._keys),
+            "loaded": len(self._models),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+
 class TimePredictionEngine:
     """
     Advanced time prediction engine for optimal posting times
     Maintains separate models for different subreddits and content types
     """
     
-    def __init__(self, data_path: str = "data/timeline"):
+    def __init__(self, data_path: str = TIME_DATA_PATH,
+                 subreddit_cache_size: int = DEFAULT_SUBREDDIT_CACHE_SIZE):
         self.data_path = data_path
         self.models = {}
         self.feature_columns = []
         self.subreddit_models = {}
         self.content_type_models = {}
         self.global_model = None
+        self.subreddit_cache_size = subreddit_cache_size
+        self.optimal_time_table = {}
+        self.timestamp_report = {}
+        self.target_aggregates = {}
+        # Whether the models saw unset one-hot columns as missing (sparse training) or as 0
+        self.one_hot_missing = False
         
-    def load_and_consolidate_data(self) -> pd.DataFrame:
+    def load_and_consolidate_data(self, workers: int = TIME_INGEST_WORKERS,
+                                  parquet_dir: Optional[str] = TIME_PARQUET_DIR) -> pd.DataFrame:
         """
         Load and consolidate all timeline CSV files
+
+        Files are read concurrently and only the columns in TIMELINE_SCHEMA are kept.
+        With `parquet_dir`, a Parquet copy partitioned by subreddit is written and
+        reused by later runs until a CSV changes.
         """
         print("📊 Loading and consolidating timeline data...")
         
-        all_data = []
         timeline_dir = os.path.join(self.data_path)
         
         if not os.path.exists(timeline_dir):
             print(f"❌ Timeline directory not found: {timeline_dir}")
             return pd.DataFrame()
         
-        # Load each subreddit CSV file
-        for filename in os.listdir(timeline_dir):
-            if filename.endswith('.csv') and filename != '50_subreddits_list.csv':
-                subreddit_name = filename.replace('.csv', '')
-                file_path = os.path.join(timeline_dir, filename)
-                
-                try:
-                    df = pd.read_csv(file_path, low_memory=False)
-                    df['subreddit'] = subreddit_name
-                    all_data.append(df)
-                    print(f"✅ Loaded {subreddit_name}: {len(df)} posts")
-                except Exception as e:
-                    print(f"❌ Error loading {filename}: {str(e)}")
-                    print(f"   ⚠️  Skipping corrupted file: {filename}")
-        
-        if not all_data:
+        csv_files = sorted(filename for filename in os.listdir(timeline_dir)
+                           if filename.endswith('.csv') and filename not in TIMELINE_EXCLUDED_FILES)
+        newest_csv = max((os.path.getmtime(os.path.join(timeline_dir, f)) for f in csv_files), default=0)
+        if parquet_dir and os.path.isdir(parquet_dir) and os.path.getmtime(parquet_dir) >= newest_csv:
+            partitioning = pa_ds.partitioning(pa.schema([('subreddit', pa.string())]), flavor='hive')
+            table = pa_ds.dataset(parquet_dir, format='parquet', partitioning=partitioning).to_table(
+                memory_pool=pa.system_memory_pool())
+            consolidated_df = table.to_pandas(split_blocks=True, self_destruct=True,
+                                              memory_pool=pa.system_memory_pool())
+            print(f"📈 Total consolidated data: {len(consolidated_df)} posts from "
+                  f"{consolidated_df['subreddit'].nunique()} subreddits (Parquet copy {parquet_dir})")
+            return consolidated_df
+        
+        def load_file(filename: str):
+            try:
+                table = read_timeline_csv(os.path.join(timeline_dir, filename))
+            except Exception as e:
+                print(f"❌ Error loading {filename}: {str(e)}")
+                print(f"   ⚠️  Skipping corrupted file: {filename}")
+                return None
+            subreddit_name = filename.replace('.csv', '')
+            print(f"✅ Loaded {subreddit_name}: {table.num_rows} posts")
+            return table.append_column('subreddit', pa.repeat(pa.scalar(subreddit_name), table.num_rows))
+        
+        # Load each subreddit CSV file (pyarrow parses outside the GIL, so threads run in parallel)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            tables = [table for table in pool.map(load_file, csv_files) if table is not None]
+        
+        if not tables:
             print("❌ No data files found!")
             return pd.DataFrame()
         
         # Consolidate all data
-        consolidated_df = pd.concat(all_data, ignore_index=True)
-        print(f"📈 Total consolidated data: {len(consolidated_df)} posts from {len(all_data)} subreddits")
+        table = pa.concat_tables(tables)
+        if parquet_dir:
+            pa_ds.write_dataset(table, parquet_dir, format='parquet', partitioning=['subreddit'],
+                                partitioning_flavor='hive', existing_data_behavior='delete_matching')
+            os.utime(parquet_dir)
+            print(f"💾 Wrote Parquet copy partitioned by subreddit to {parquet_dir}")
+        subreddit_count = len(tables)
+        del tables
+        # Release each Arrow column as soon as it is converted so the data is never held twice
+        consolidated_df = table.to_pandas(split_blocks=True, self_destruct=True,
+                                         memory_pool=pa.system_memory_pool())
+        del table
+        print(f"📈 Total consolidated data: {len(consolidated_df)} posts from {subreddit_count} subreddits")
+        
+        return consolidated_df
+    
+    def load_engineered_data(self, cache: FeatureCache) -> pd.DataFrame:
+        """
+        Engineered features and targets for every timeline CSV, re-engineering only
+        files whose content changed since the last run (see feature_cache.py)
+        """
+        print("📊 Loading engineered timeline data (feature cache)...")
+        
+        if not os.path.exists(self.data_path):
+            print(f"❌ Timeline directory not found: {self.data_path}")
+            return pd.DataFrame()
+        
+        csv_files = sorted(filename for filename in os.listdir(self.data_path)
+                           if filename.endswith('.csv') and filename not in TIMELINE_EXCLUDED_FILES)
+        frames, timestamp_report = [], {}
+        for filename in csv_files:
+            df, _ = self._engineered_file(cache, filename, timestamp_report)
+            if df is not None:
+                frames.append(df)
         
+        # Shared categories, so the subreddit column stays categorical when the frames are combined
+        subreddits = sorted(str(df['subreddit'].iloc[0]) for df in frames if len(df))
+        for df in frames:
+            df['subreddit'] = df['subreddit'].astype(pd.CategoricalDtype(subreddits))
+        cache.prune(filename.replace('.csv', '') for filename in csv_files)
+        self.timestamp_report = timestamp_report
+        if not frames:
+            print("❌ No data files found!")
+            return pd.DataFrame()
+        
+        consolidated_df = pd.concat(frames, ignore_index=True)
+        print(f"📈 Total engineered data: {len(consolidated_df)} posts from {len(frames)} subreddits "
+              f"({cache.hits} from cache, {cache.misses} re-engineered)")
         return consolidated_df
     
+    def _engineered_file(self, cache: FeatureCache, filename: str,
+                         timestamp_report: Dict) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+        """
+        Engineered features and targets of one timeline CSV and the path of its cache entry,
+        engineering and caching the file on a miss; (None, None) when it cannot be read
+        """
+        subreddit_name = filename.replace('.csv', '')
+        file_path = os.path.join(self.data_path, filename)
+        key = cache.key(file_path)
+        df = cache.get(subreddit_name, key)
+        if df is None:
+            try:
+                df = read_timeline_csv(file_path).to_pandas()
+            except Exception as e:
+                print(f"❌ Error loading {filename}: {str(e)}")
+                print(f"   ⚠️  Skipping corrupted file: {filename}")
+                return None, None
+            df['subreddit'] = subreddit_name
+            # Both steps only look within one subreddit, so each file can be engineered on its own
+            df = self.create_optimal_time_targets(self.engineer_time_features(df))
+            timestamp_report.update(self.timestamp_report)
+            cache.put(subreddit_name, key, df)
+        return df, cache.path(subreddit_name, key)
+    
     def engineer_time_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Engineer comprehensive time-based features
@@ -72,12 +506,13 @@ class TimePredictionEngine:
         print("   📅 Converting timestamps...")
         original_count = len(df)
         
-        # Try different date formats and handle errors
-        df['created_datetime'] = pd.to_datetime(
-            df['created_utc'], 
-            errors='coerce',  # Convert errors to NaT
-            format='mixed'    # Try to infer format for each row
-        )
+        # Detect the format once per source file and parse each file in one vectorized call;
+        # only rows that don't match fall back to per-row parsing (see timestamp_parser.py)
+        df['created_datetime'], self.timestamp_report = parse_timestamps(df, 'created_utc', 'subreddit')
+        for source, report in self.timestamp_report.items():
+            if report['unparsed'] or report['missing']:
+                print(f"   ⚠️  {source}: {report['unparsed']} unparsed, {report['missing']} missing "
+                      f"timestamps (format {report['format']})")
         
         # Remove rows with invalid timestamps
         invalid_timestamps = df['created_datetime'].isna().sum()
@@ -100,12 +535,12 @@ class TimePredictionEngine:
             3: 'Spring', 4: 'Spring', 5: 'Spring',
             6: 'Summer', 7: 'Summer', 8: 'Summer',
             9: 'Fall', 10: 'Fall', 11: 'Fall'
-        })
+        }).astype(SEASONS)
         
         # Time slots
         df['time_slot'] = pd.cut(df['hour'], 
                                 bins=[0, 6, 12, 18, 24], 
-                                labels=['Night', 'Morning', 'Afternoon', 'Evening'])
+                                labels=TIME_SLOTS)
         
         # Content features
         df['title_length'] = df['title'].str.len()
@@ -118,6 +553,9 @@ class TimePredictionEngine:
         df['is_text'] = (df['post_type'] == 'text').astype(int)
         df['is_link'] = (df['post_type'] == 'link').astype(int)
         
+        # The raw text and timestamps are no longer needed
+        df = df.drop(columns=[col for col in DERIVED_SOURCE_COLUMNS if col in df.columns])
+        
         # Engagement features
         df['engagement_score'] = df['score'] * df['upvote_ratio'] * (1 + df['num_comments'] * 0.1)
         
@@ -128,6 +566,11 @@ class TimePredictionEngine:
                 df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
                 print(f"   📊 Processed {col} column")
         
+        # Compact dtypes for everything training reads
+        df = df.astype({col: dtype for col, dtype in ENGINEERED_DTYPES.items() if col in df.columns})
+        if 'subreddit' in df.columns and not isinstance(df['subreddit'].dtype, pd.CategoricalDtype):
+            df['subreddit'] = df['subreddit'].astype('category')
+        
         print(f"✅ Engineered features for {len(df)} posts")
         return df
     
@@ -148,12 +591,13 @@ class TimePredictionEngine:
         best_hours = optimal_times.loc[optimal_times.groupby('subreddit')['engagement_score'].idxmax()]
         
         # Create target: optimal hour (0-23)
+        # (mapping a categorical column can return a categorical, so set the dtype explicitly)
         df['optimal_hour'] = df['subreddit'].map(
             dict(zip(best_hours['subreddit'], best_hours['hour']))
-        )
+        ).astype('int8')
         
         # Create binary target: is this the optimal hour?
-        df['is_optimal_hour'] = (df['hour'] == df['optimal_hour']).astype(int)
+        df['is_optimal_hour'] = (df['hour'] == df['optimal_hour']).astype('int8')
         
         # Create engagement prediction target
         df['hour_engagement_score'] = df.groupby(['subreddit', 'hour'])['engagement_score'].transform('mean')
@@ -161,52 +605,79 @@ class TimePredictionEngine:
         print(f"✅ Created optimal time targets")
         return df
     
-    def prepare_features(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
+    def compute_target_aggregates(self, df: pd.DataFrame) -> Dict:
+        """{subreddit: {hour: [post count, engagement score sum]}} for the rows in `df`"""
+        grouped = df.groupby(['subreddit', 'hour'])['engagement_score'].agg(['count', 'sum'])
+        aggregates = {}
+        for (subreddit, hour), row in grouped.iterrows():
+            aggregates.setdefault(str(subreddit), {})[str(int(hour))] = [int(row['count']), float(row['sum'])]
+        return aggregates
+    
+    def update_optimal_time_targets(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Fold new rows into the running aggregates and create their targets from the
+        combined totals; same targets as create_optimal_time_targets on the full history
+        """
+        for subreddit, hours in self.compute_target_aggregates(df).items():
+            totals = self.target_aggregates.setdefault(subreddit, {})
+            for hour, (count, total) in hours.items():
+                previous = totals.get(hour, [0, 0.0])
+                totals[hour] = [previous[0] + count, previous[1] + total]
+        
+        hour_means = {(subreddit, int(hour)): total / count
+                      for subreddit, hours in self.target_aggregates.items()
+                      for hour, (count, total) in hours.items() if count}
+        best_hours = {}
+        for (subreddit, hour), mean in sorted(hour_means.items()):
+            if subreddit not in best_hours or mean > hour_means[(subreddit, best_hours[subreddit])]:
+                best_hours[subreddit] = hour
+        
+        df['optimal_hour'] = df['subreddit'].map(best_hours).astype('int8')
+        df['is_optimal_hour'] = (df['hour'] == df['optimal_hour']).astype('int8')
+        df['hour_engagement_score'] = [hour_means.get((subreddit, hour), 0.0)
+                                       for subreddit, hour in zip(df['subreddit'], df['hour'])]
+        return df
+    
+    def prepare_features(self, df: pd.DataFrame,
+                         feature_columns: Optional[List[str]] = None) -> Tuple[sp.csr_matrix, List[str]]:
         """
         Prepare final feature set for model training
+        
+        Returns a float32 CSR matrix that goes to XGBoost as is: numeric features are
+        stored for every row (missing values as 0) and each categorical feature adds a
+        single 1 in its level's one-hot column, so the zeros of the one-hot columns are
+        never materialized (XGBoost treats them as missing, which splits the same way).
+        With `feature_columns` (an already trained model's), rows are encoded into those
+        columns and levels without a column are dropped.
         """
         print("🔧 Preparing final features...")
         
-        # Select features for model training
-        feature_columns = [
-            'hour', 'day_of_week', 'day_of_month', 'month', 'year',
-            'is_weekend', 'title_length', 'has_body', 'body_length',
-            'is_image', 'is_video', 'is_text', 'is_link',
-            'score', 'upvote_ratio', 'num_comments', 'num_awards', 'num_crossposts',
-            'subscribers'
-        ]
-        
-        # One-hot encode categorical features
-        categorical_features = ['season', 'time_slot', 'subreddit']
-        for feature in categorical_features:
-            if feature in df.columns:
-                dummies = pd.get_dummies(df[feature], prefix=feature)
-                df = pd.concat([df, dummies], axis=1)
-                feature_columns.extend(dummies.columns.tolist())
-        
-        # Ensure all feature columns exist
-        for col in feature_columns:
-            if col not in df.columns:
-                df[col] = 0
-        
-        # Select only the feature columns
-        X = df[feature_columns].copy()
-        
-        # Handle any remaining missing values
-        X = X.fillna(0)
-        
-        print(f"✅ Prepared {len(feature_columns)} features")
+        if feature_columns is None:
+            feature_columns = list(NUMERIC_FEATURES)
+            for feature in CATEGORICAL_FEATURES:
+                if feature in df.columns:
+                    feature_columns.extend(f'{feature}_{level}' for level in _one_hot_levels(df[feature]))
+        X = encode_features(df, feature_columns)
+        
+        print(f"✅ Prepared {len(feature_columns)} features ({X.nnz} stored values)")
         return X, feature_columns
     
-    def train_time_prediction_models(self, df: pd.DataFrame) -> Dict:
+    def train_time_prediction_models(self, df: pd.DataFrame, workers: int = TIME_TRAIN_WORKERS) -> Dict:
         """
         Train multiple specialized time prediction models
+
+        The global model uses every core; subreddit and content-type models are
+        fitted by `workers` processes with the cores split between them.
         """
         print("🤖 Training time prediction models...")
         
+        # glibc keeps the memory of the dropped raw columns otherwise, on top of the training matrices
+        _release_freed_memory()
+        
         # Prepare features
         X, feature_columns = self.prepare_features(df)
         self.feature_columns = feature_columns
+        self.one_hot_missing = True
         
         # Prepare targets
         y_hour = df['optimal_hour']
@@ -215,12 +686,7 @@ class TimePredictionEngine:
         
         # Train global model for hour prediction
         print("📊 Training global hour prediction model...")
-        global_model = XGBRegressor(
-            n_estimators=100,
-            max_depth=6,
-            learning_rate=0.1,
-            random_state=42
-        )
+        global_model = XGBRegressor(**GLOBAL_MODEL_PARAMS)
         
         # Use time series split for validation
         tscv = TimeSeriesSplit(n_splits=5)
@@ -233,35 +699,44 @@ class TimePredictionEngine:
         mse = mean_squared_error(y_hour, y_pred)
         print(f"✅ Global model trained - MSE: {mse:.2f}")
         
-        # Train subreddit-specific models
-        print("📊 Training subreddit-specific models...")
-        subreddit_models = {}
+        # Row positions of every group, computed once; each job gets only its own slice
+        subreddit_rows = {subreddit: rows for subreddit, rows in df.groupby('subreddit', sort=False).indices.items()
+                          if len(rows) > MIN_GROUP_ROWS}
+        content_rows = {}
+        for content_type in ['is_image', 'is_video', 'is_text', 'is_link']:
+            rows = np.flatnonzero(df[content_type].to_numpy() == 1)
+            if len(rows) > MIN_GROUP_ROWS:
+                content_rows[content_type] = rows
+        jobs = [(('subreddit', name), rows) for name, rows in subreddit_rows.items()]
+        jobs += [(('content_type', name), rows) for name, rows in content_rows.items()]
         
-        for subreddit in df['subreddit'].unique():
-            subreddit_data = df[df['subreddit'] == subreddit]
-            if len(subreddit_data) > 100:  # Only train if enough data
-                X_sub = X[df['subreddit'] == subreddit]
-                y_sub = y_hour[df['subreddit'] == subreddit]
-                
-                model = XGBRegressor(n_estimators=50, max_depth=4, random_state=42)
-                model.fit(X_sub, y_sub)
-                subreddit_models[subreddit] = model
-                print(f"✅ Trained model for r/{subreddit}")
-        
-        # Train content-type models
-        print("📊 Training content-type models...")
-        content_models = {}
+        # Train subreddit-specific and content-type models in parallel
+        workers = max(1, min(workers, len(jobs)))
+        n_jobs = max(1, (os.cpu_count() or 1) // workers)
+        print(f"📊 Training {len(subreddit_rows)} subreddit-specific and {len(content_rows)} content-type models "
+              f"({workers} workers x {n_jobs} threads)...")
+        fitted = {}
+        if workers == 1:
+            for key, rows in jobs:
+                fitted[key] = _fit_group_model(key[1], X[rows], y_hour.iloc[rows], n_jobs)[1]
+        else:
+            # spawn: forking after XGBoost has started its OpenMP threads can deadlock the children
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+                futures = {pool.submit(_fit_group_model, key[1], X[rows], y_hour.iloc[rows], n_jobs): key
+                           for key, rows in jobs}
+                for future in futures:
+                    fitted[futures[future]] = future.result()[1]
         
-        for content_type in ['is_image', 'is_video', 'is_text', 'is_link']:
-            content_data = df[df[content_type] == 1]
-            if len(content_data) > 100:
-                X_content = X[df[content_type] == 1]
-                y_content = y_hour[df[content_type] == 1]
-                
-                model = XGBRegressor(n_estimators=50, max_depth=4, random_state=42)
-                model.fit(X_content, y_content)
-                content_models[content_type] = model
-                print(f"✅ Trained model for {content_type}")
+        # Same order as the sequential loops used to produce
+        subreddit_models = {name: fitted[('subreddit', name)] for name in subreddit_rows}
+        content_models = {name: fitted[('content_type', name)] for name in content_rows}
+        for name in subreddit_models:
+            print(f"✅ Trained model for r/{name}")
+        for name in content_models:
+            print(f"✅ Trained model for {name}")
+        
+        # Running target aggregates let update() recompute targets without the full history
+        self.target_aggregates = self.compute_target_aggregates(df)
         
         # Store models
         self.global_model = global_model
@@ -270,6 +745,95 @@ class TimePredictionEngine:
         
         print(f"✅ Training complete - {len(subreddit_models)} subreddit models, {len(content_models)} content models")
         
+        self.build_optimal_time_table()
+        
+        return {
+            'global_model': global_model,
+            'subreddit_models': subreddit_models,
+            'content_type_models': content_models,
+            'feature_columns': feature_columns
+        }
+    
+    def train_time_prediction_models_external(self, cache: FeatureCache,
+                                              batch_rows: int = TIME_EXTERNAL_BATCH_ROWS,
+                                              page_dir: Optional[str] = TIME_EXTERNAL_PAGE_DIR) -> Dict:
+        """
+        Train the same models as train_time_prediction_models without ever holding the
+        consolidated timeline: each CSV is engineered on its own into the feature cache,
+        subreddit models are fitted one file at a time, and the global and content-type
+        models are trained from EngineeredBatchIter batches in external memory
+        """
+        print("🤖 Training time prediction models (external memory)...")
+        
+        if not os.path.exists(self.data_path):
+            print(f"❌ Timeline directory not found: {self.data_path}")
+            return {}
+        
+        # Cache every file's features and collect what depends on the whole timeline
+        csv_files = sorted(filename for filename in os.listdir(self.data_path)
+                           if filename.endswith('.csv') and filename not in TIMELINE_EXCLUDED_FILES)
+        sources, timestamp_report, aggregates = [], {}, {}
+        content_counts = dict.fromkeys(['is_image', 'is_video', 'is_text', 'is_link'], 0)
+        for filename in csv_files:
+            df, path = self._engineered_file(cache, filename, timestamp_report)
+            if df is None or df.empty:
+                continue
+            sources.append((str(df['subreddit'].iloc[0]), path, len(df)))
+            aggregates.update(self.compute_target_aggregates(df))
+            for content_type in content_counts:
+                content_counts[content_type] += int((df[content_type] == 1).sum())
+            del df
+        cache.prune(filename.replace('.csv', '') for filename in csv_files)
+        self.timestamp_report = timestamp_report
+        if not sources:
+            print("❌ No data files found!")
+            return {}
+        sources.sort()
+        print(f"📈 {sum(rows for _, _, rows in sources)} posts from {len(sources)} subreddits "
+              f"({cache.hits} from cache, {cache.misses} re-engineered)")
+        
+        # Same columns prepare_features derives from the consolidated frame
+        feature_columns = (list(NUMERIC_FEATURES) + [f'season_{level}' for level in SEASONS.categories]
+                           + [f'time_slot_{level}' for level in TIME_SLOTS]
+                           + [f'subreddit_{name}' for name, _, _ in sources])
+        self.feature_columns = feature_columns
+        self.one_hot_missing = True
+        paths = [path for _, path, _ in sources]
+        
+        with tempfile.TemporaryDirectory(prefix='time-pages-', dir=page_dir) as pages:
+            print(f"📊 Training global hour prediction model (batches of {batch_rows} rows)...")
+            global_model, mse = _fit_external(
+                GLOBAL_MODEL_PARAMS, EngineeredBatchIter(paths, feature_columns, os.path.join(pages, 'global'), batch_rows))
+            print(f"✅ Global model trained - MSE: {mse:.2f}")
+            
+            content_models = {}
+            for content_type, count in content_counts.items():
+                if count > MIN_GROUP_ROWS:
+                    batches = EngineeredBatchIter(paths, feature_columns, os.path.join(pages, content_type),
+                                                  batch_rows, row_filter=content_type)
+                    content_models[content_type], _ = _fit_external(GROUP_MODEL_PARAMS, batches)
+        
+        # A subreddit's rows are one file, which fits in memory like it did for engineering
+        subreddit_models = {}
+        for name, path, rows in sources:
+            if rows > MIN_GROUP_ROWS:
+                df = pd.read_parquet(path)
+                subreddit_models[name] = _fit_group_model(
+                    name, encode_features(df, feature_columns), df['optimal_hour'], None)[1]
+        for name in subreddit_models:
+            print(f"✅ Trained model for r/{name}")
+        for name in content_models:
+            print(f"✅ Trained model for {name}")
+        
+        self.target_aggregates = aggregates
+        self.global_model = global_model
+        self.subreddit_models = subreddit_models
+        self.content_type_models = content_models
+        
+        print(f"✅ Training complete - {len(subreddit_models)} subreddit models, {len(content_models)} content models")
+        
+        self.build_optimal_time_table()
+        
         return {
             'global_model': global_model,
             'subreddit_models': subreddit_models,
@@ -287,6 +851,22 @@ class TimePredictionEngine:
         if not self.global_model:
             return {"error": "Models not trained yet"}
         
+        # Without caller-supplied features the answer only depends on (subreddit, content_type)
+        if not user_data:
+            cached = self.optimal_time_table.get(self._table_key(subreddit, content_type))
+            if cached is not None:
+                return {**cached, 'predictions': dict(cached['predictions']),
+                        'subreddit': subreddit, 'content_type': content_type}
+        
+        return self._predict_optimal_time_live(subreddit, content_type, user_data)
+    
+    def _predict_optimal_time_live(self,
+                                   subreddit: str,
+                                   content_type: str = 'text',
+                                   user_data: Dict = None) -> Dict:
+        """
+        Run the global, subreddit and content-type models for one input
+        """
         # Prepare input features
         input_features = self._prepare_prediction_input(subreddit, content_type, user_data)
         
@@ -311,7 +891,7 @@ class TimePredictionEngine:
         
         # Ensemble prediction (weighted average)
         if len(predictions) > 1:
-            weights = {'global': 0.3, 'subreddit': 0.5, 'content_type': 0.2}
+            weights = ENSEMBLE_WEIGHTS
             ensemble_pred = sum(predictions[key] * weights.get(key, 0.3) 
                               for key in predictions.keys())
             predictions['ensemble'] = round(ensemble_pred) % 24
@@ -328,15 +908,109 @@ class TimePredictionEngine:
             'status': 'success'
         }
     
+    def score_time_slots(self,
+                         subreddit: str,
+                         content_type: str,
+                         slots: List[Dict],
+                         user_data: Dict = None) -> List[Dict]:
+        """
+        Score many candidate posting slots ({'hour': h}, optionally with 'day_of_week': d)
+        with one predict call per model. A slot scores 1.0 when the ensemble's recommended
+        hour for that slot's inputs is the slot's own hour, falling to 0.0 twelve
+        hours away. Day features are only overridden for slots that give a day.
+        """
+        if not self.global_model:
+            return []
+        
+        base = np.asarray(self._prepare_prediction_input(subreddit, content_type, user_data), dtype=np.float32)
+        X = np.tile(base, (len(slots), 1))
+        column_index = {col: i for i, col in enumerate(self.feature_columns)}
+        
+        hours = np.array([slot['hour'] for slot in slots], dtype=np.int64)
+        has_day = np.array(['day_of_week' in slot for slot in slots], dtype=bool)
+        days = np.array([slot.get('day_of_week', 0) for slot in slots], dtype=np.int64)
+        if 'hour' in column_index:
+            X[:, column_index['hour']] = hours
+        for name, values in [('day_of_week', days), ('is_weekend', np.isin(days, [5, 6]))]:
+            if name in column_index:
+                X[has_day, column_index[name]] = values[has_day]
+        slot_columns = [f'time_slot_{level}' for level in TIME_SLOTS]
+        for col in slot_columns:
+            if col in column_index:
+                X[:, column_index[col]] = np.nan if self.one_hot_missing else 0
+        for row, hour in enumerate(hours):
+            col = column_index.get(f'time_slot_{hour_time_slot(int(hour))}')
+            if col is not None:
+                X[row, col] = 1
+        
+        # One batched prediction per model
+        predictions = {'global': np.rint(self.global_model.predict(X)) % 24}
+        if subreddit in self.subreddit_models:
+            predictions['subreddit'] = np.rint(self.subreddit_models[subreddit].predict(X)) % 24
+        content_key = f'is_{content_type}'
+        if content_key in self.content_type_models:
+            predictions['content_type'] = np.rint(self.content_type_models[content_key].predict(X)) % 24
+        
+        if len(predictions) > 1:
+            ensemble = np.rint(sum(values * ENSEMBLE_WEIGHTS.get(key, 0.3)
+                                   for key, values in predictions.items())) % 24
+            stacked = np.vstack(list(predictions.values()) + [ensemble])
+            confidence = np.maximum(0.3, 1.0 - stacked.var(axis=0) / 100)
+        else:
+            ensemble = predictions['global']
+            confidence = np.full(len(slots), 0.7)
+        
+        distance = np.abs(ensemble - hours) % 24
+        distance = np.minimum(distance, 24 - distance)
+        scores = np.round(1.0 - distance / 12.0, 3)
+        
+        scored = []
+        for row in range(len(slots)):
+            slot = {'hour': int(hours[row])}
+            if has_day[row]:
+                slot.update({'day_of_week': int(days[row]), 'day_name': DAY_NAMES[days[row] % 7]})
+            slot.update({
+                'predicted_hour': int(ensemble[row]),
+                'score': float(scores[row]),
+                'confidence': round(float(confidence[row]), 2)
+            })
+            scored.append(slot)
+        return scored
+    
+    def predict_time_heatmap(self,
+                             subreddit: str,
+                             content_type: str = 'text',
+                             user_data: Dict = None) -> Dict:
+        """
+        Score all 24 posting hours in one batch
+        Returns the per-hour scores plus the hours ranked best first (ties go to the earlier hour)
+        
+        Weekday is not modelled: the trained models' predictions do not change with the
+        day_of_week/is_weekend inputs, so a 7x24 grid would repeat the same row seven times.
+        """
+        if not self.global_model:
+            return {"error": "Models not trained yet"}
+        
+        scored = self.score_time_slots(subreddit, content_type, [{'hour': hour} for hour in range(24)], user_data)
+        ranked = sorted(scored, key=lambda slot: (-slot['score'], -slot['confidence'], slot['hour']))
+        
+        return {
+            'subreddit': subreddit,
+            'content_type': content_type,
+            'hourly_scores': [slot['score'] for slot in scored],
+            'ranked_slots': ranked,
+            'best_slot': ranked[0],
+            'status': 'success'
+        }
+    
     def _prepare_prediction_input(self, subreddit: str, content_type: str, user_data: Dict) -> List:
         """
         Prepare input features for prediction
         """
-        # Create base features (all zeros)
-        input_features = [0] * len(self.feature_columns)
-        
-        # Set basic features
-        feature_dict = dict(zip(self.feature_columns, input_features))
+        # Create base features (all zeros; unset one-hot columns are missing for models
+        # trained on the sparse matrix, see prepare_features)
+        unset = np.nan if self.one_hot_missing else 0
+        feature_dict = {col: unset if col.startswith(ONE_HOT_PREFIXES) else 0 for col in self.feature_columns}
         
         # Set content type
         content_key = f'is_{content_type}'
@@ -352,7 +1026,7 @@ class TimePredictionEngine:
         if user_data:
             for key, value in user_data.items():
                 if key in feature_dict:
-                    feature_dict[key] = value
+                    feature_dict[key] = unset if key.startswith(ONE_HOT_PREFIXES) and not value else value
         
         return list(feature_dict.values())
     
@@ -371,7 +1045,57 @@ class TimePredictionEngine:
         confidence = max(0.3, 1.0 - (variance / 100))
         return round(confidence, 2)
     
-    def save_models(self, save_path: str = "models"):
+    def _known_subreddits(self) -> List[str]:
+        """Subreddits that change the model input (own model or one-hot column)"""
+        from_columns = [col[len('subreddit_'):] for col in self.feature_columns if col.startswith('subreddit_')]
+        return sorted(set(self.subreddit_models) | set(from_columns))
+    
+    def _table_key(self, subreddit: str, content_type: str) -> str:
+        if subreddit not in self.subreddit_models and f'subreddit_{subreddit}' not in self.feature_columns:
+            subreddit = UNKNOWN_SUBREDDIT_KEY
+        return f'{subreddit}|{content_type}'
+    
+    def build_optimal_time_table(self) -> Dict:
+        """
+        Precompute predict_optimal_time for every known subreddit x content type
+        (plus a catch-all row for unknown subreddits)
+        """
+        if not self.global_model:
+            return {}
+        
+        table = {}
+        for subreddit in self._known_subreddits() + [UNKNOWN_SUBREDDIT_KEY]:
+            for content_type in CONTENT_TYPES:
+                result = self._predict_optimal_time_live(subreddit, content_type)
+                table[f'{subreddit}|{content_type}'] = _json_safe(result)
+        
+        self.optimal_time_table = table
+        print(f"✅ Precomputed {len(table)} optimal time answers")
+        return table
+    
+    def save_optimal_time_table(self, save_path: str = MODELS_DIR):
+        """Persist the lookup table, tagged with the time models it was computed from"""
+        with open(os.path.join(save_path, LOOKUP_TABLE_FILENAME), 'w') as f:
+            json.dump({
+                'models_sha256': _time_models_sha256(save_path),
+                'table': self.optimal_time_table
+            }, f)
+    
+    def load_optimal_time_table(self, load_path: str = MODELS_DIR) -> bool:
+        """Load a persisted lookup table if it matches the saved time models"""
+        table_path = os.path.join(load_path, LOOKUP_TABLE_FILENAME)
+        if not os.path.exists(table_path):
+            return False
+        with open(table_path) as f:
+            data = json.load(f)
+        if data.get('models_sha256') != _time_models_sha256(load_path):
+            print("⚠️ Optimal time lookup table is stale, recomputing")
+            return False
+        self.optimal_time_table = data['table']
+        print(f"✅ Loaded {len(self.optimal_time_table)} precomputed optimal time answers")
+        return True
+    
+    def save_models(self, save_path: str = MODELS_DIR):
         """
         Save trained models
         """
@@ -381,77 +1105,380 @@ class TimePredictionEngine:
         # Save global model
         if self.global_model:
             joblib.dump({
-                'model': self.global_model,
-                'feature_columns': self.feature_columns
+                'model': unwrap_model(self.global_model),
+                'feature_columns': self.feature_columns,
+                'one_hot_missing': self.one_hot_missing
             }, os.path.join(save_path, 'time_prediction_global.pkl'))
         
-        # Save subreddit models
+        # Subreddit and content-type models share the global model's feature columns
         for subreddit, model in self.subreddit_models.items():
-            joblib.dump({
-                'model': model,
-                'feature_columns': self.feature_columns
-            }, os.path.join(save_path, f'time_prediction_{subreddit}.pkl'))
+            joblib.dump({'model': unwrap_model(model)},
+                        os.path.join(save_path, f'time_prediction_{subreddit}.pkl'))
+        for content_type, model in self.content_type_models.items():
+            joblib.dump({'model': unwrap_model(model)},
+                        os.path.join(save_path, f'time_content_{content_type}.pkl'))
+        
+        if self.optimal_time_table:
+            self.save_optimal_time_table(save_path)
+        if self.target_aggregates:
+            with open(os.path.join(save_path, TARGET_AGGREGATES_FILENAME), 'w') as f:
+                json.dump(self.target_aggregates, f)
         
         print(f"✅ Models saved to {save_path}")
     
-    def load_models(self, load_path: str = "models"):
+    def publish_models(self, models_path: str = MODELS_DIR, version: str = None, bundle: bool = True) -> str:
+        """
+        Save the models as a new time-<version> directory under `models_path` and make it
+        current by replacing the TIME_CURRENT pointer, so readers see either the old or the
+        new set and never a mix. With `bundle`, a model bundle is built from it under
+        <models_path>/bundles first and made current with it. Nothing is made current
+        unless every step succeeded. Returns the version
+        """
+        # Microseconds keep back-to-back publishes (a train then an update) from colliding
+        version = version or datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S-%f')
+        final_path = os.path.join(models_path, f'time-{version}')
+        if os.path.exists(final_path):
+            raise ValueError(f"Time models {version} already exist")
+        
+        # Write into a temporary directory and rename, so a version is never seen half-written
+        tmp_path = os.path.join(models_path, f'.time-{version}.tmp')
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        self.save_models(tmp_path)
+        os.rename(tmp_path, final_path)
+        
+        bundle_path = None
+        if bundle:
+            from model_bundle import build_bundle
+            try:
+                bundle_path = build_bundle(models_path, version=version, time_models_dir=final_path,
+                                           make_current=False)
+            except Exception:
+                shutil.rmtree(final_path, ignore_errors=True)
+                raise
+        
+        _set_time_models_version(models_path, f'time-{version}')
+        _prune_time_versions(models_path, TIME_MODEL_VERSIONS_KEPT, f'time-{version}')
+        if bundle_path is not None:
+            from model_bundle import publish_bundle
+            publish_bundle(bundle_path)
+        print(f"✅ Time models {version} are current")
+        return version
+    
+    def load_models(self, load_path: str = MODELS_DIR, lazy: bool = True):
         """
         Load trained models
+        The global model is loaded eagerly; with `lazy` (the default) subreddit
+        models are only unpickled when first requested and kept in an LRU cache
         """
+        resolved_path = time_models_path(load_path)
+        if resolved_path != load_path:
+            # Subreddit models are read on first use, so keep this version from being pruned
+            version_lease.hold(resolved_path)
+        load_path = resolved_path
+        
         # Load global model
         global_model_path = os.path.join(load_path, 'time_prediction_global.pkl')
         if os.path.exists(global_model_path):
             global_data = joblib.load(global_model_path)
-            self.global_model = global_data['model']
+            self.global_model = make_backend(global_data['model'], backend_for('time_global'))
             self.feature_columns = global_data['feature_columns']
+            self.one_hot_missing = global_data.get('one_hot_missing', False)
             print("✅ Loaded global time prediction model")
         
-        # Load subreddit models
+        # Discover subreddit models without reading them
+        subreddits = []
         for filename in os.listdir(load_path):
             if filename.startswith('time_prediction_') and filename.endswith('.pkl'):
                 subreddit = filename.replace('time_prediction_', '').replace('.pkl', '')
                 if subreddit != 'global':
-                    model_path = os.path.join(load_path, filename)
-                    model_data = joblib.load(model_path)
-                    self.subreddit_models[subreddit] = model_data['model']
+                    subreddits.append(subreddit)
+        
+        def load_subreddit_model(subreddit: str):
+            model_path = os.path.join(load_path, f'time_prediction_{subreddit}.pkl')
+            model = joblib.load(model_path)['model']
+            return make_backend(model, backend_for(f'time_{subreddit}'))
+        
+        if lazy:
+            self.subreddit_models = LazyModelCache(
+                load_subreddit_model, subreddits, self.subreddit_cache_size)
+            print(f"✅ Found {len(self.subreddit_models)} subreddit models (loaded on demand)")
+        else:
+            self.subreddit_models = {s: load_subreddit_model(s) for s in subreddits}
+            print(f"✅ Loaded {len(self.subreddit_models)} subreddit models")
+        
+        # Content-type models are few and small, so they are always loaded eagerly
+        self.content_type_models = {}
+        for filename in sorted(os.listdir(load_path)):
+            if filename.startswith('time_content_') and filename.endswith('.pkl'):
+                content_type = filename[len('time_content_'):-len('.pkl')]
+                model = joblib.load(os.path.join(load_path, filename))['model']
+                self.content_type_models[content_type] = make_backend(model, backend_for(f'time_content_{content_type}'))
+        if self.content_type_models:
+            print(f"✅ Loaded {len(self.content_type_models)} content type models")
+        
+        # Serve answers for requests without user data from the precomputed table
+        if self.global_model and not self.load_optimal_time_table(load_path):
+            self.build_optimal_time_table()
+            try:
+                self.save_optimal_time_table(load_path)
+            except OSError as e:
+                print(f"⚠️ Could not persist optimal time lookup table: {e}")
+    
+    def update(self, new_df: pd.DataFrame, models_path: str = MODELS_DIR,
+               rounds: int = TIME_UPDATE_ROUNDS) -> Optional[Dict]:
+        """
+        Continue boosting the saved models on newly collected posts only
+        
+        `new_df` holds raw timeline rows (with a subreddit column). Targets come from the
+        stored running aggregates, every model that has new rows gets `rounds` more
+        trees, and subreddits/content types that are new get their own model once they
+        have enough rows. The result is published as a new versioned directory together
+        with a model bundle built from it (see publish_models).
         
-        print(f"✅ Loaded {len(self.subreddit_models)} subreddit models")
+        Subreddits missing from the saved feature columns get no one-hot column: a
+        model's features cannot grow, so those need a full retrain to be learned globally.
+        """
+        print(f"🔄 Updating time prediction models with {len(new_df)} new posts...")
+        
+        source_path = time_models_path(models_path)
+        aggregates_path = os.path.join(source_path, TARGET_AGGREGATES_FILENAME)
+        global_path = os.path.join(source_path, 'time_prediction_global.pkl')
+        if not os.path.exists(global_path) or not os.path.exists(aggregates_path):
+            print(f"❌ No saved models with target aggregates in {source_path}; run a full training first")
+            return None
+        with open(aggregates_path) as f:
+            self.target_aggregates = json.load(f)
+        # Raw estimators (not serving backends), since boosting continues from them
+        global_data = joblib.load(global_path)
+        self.global_model, self.feature_columns = global_data['model'], global_data['feature_columns']
+        self.one_hot_missing = global_data.get('one_hot_missing', False)
+        self.subreddit_models, self.content_type_models = {}, {}
+        for filename in sorted(os.listdir(source_path)):
+            if filename.startswith('time_prediction_') and filename.endswith('.pkl') and filename != 'time_prediction_global.pkl':
+                self.subreddit_models[filename[len('time_prediction_'):-len('.pkl')]] = \
+                    joblib.load(os.path.join(source_path, filename))['model']
+            elif filename.startswith('time_content_') and filename.endswith('.pkl'):
+                self.content_type_models[filename[len('time_content_'):-len('.pkl')]] = \
+                    joblib.load(os.path.join(source_path, filename))['model']
+        
+        df = self.engineer_time_features(new_df)
+        if df.empty:
+            print("❌ No valid new posts to update with")
+            return None
+        df = self.update_optimal_time_targets(df)
+        X, _ = self.prepare_features(df, self.feature_columns)
+        if not self.one_hot_missing:
+            # Models trained before the sparse matrix saw every one-hot zero (and expect named
+            # columns); new posts are few enough to densify
+            X = pd.DataFrame(X.toarray(), columns=self.feature_columns)
+        y_hour = df['optimal_hour']
+        
+        self.global_model = _continue_boosting(self.global_model, X, y_hour, rounds)
+        updated, added = [], []
+        groups = [(self.subreddit_models, name, rows) for name, rows in
+                  df.groupby('subreddit', sort=False).indices.items()]
+        groups += [(self.content_type_models, name, np.flatnonzero(df[name].to_numpy() == 1))
+                   for name in ['is_image', 'is_video', 'is_text', 'is_link']]
+        for models, name, rows in groups:
+            if name in models and len(rows) >= MIN_UPDATE_ROWS:
+                models[name] = _continue_boosting(models[name], _take_rows(X, rows), y_hour.iloc[rows], rounds)
+                updated.append(name)
+            elif name not in models and len(rows) > MIN_GROUP_ROWS:
+                models[name] = _fit_group_model(name, _take_rows(X, rows), y_hour.iloc[rows], None)[1]
+                added.append(name)
+        print(f"✅ Continued boosting global + {len(updated)} group models by {rounds} rounds, "
+              f"trained {len(added)} new group models")
+        
+        self.build_optimal_time_table()
+        
+        version = self.publish_models(models_path)
+        
+        print(f"🎉 Time models updated ({version})")
+        return {'version': version, 'new_posts': len(df), 'updated': updated, 'added': added}
+    
+    def load_bundle(self, bundle):
+        """
+        Load the time models from a ModelBundle (see model_bundle.py)
+        Subreddit models stay lazy; their node arrays are memory-mapped when first used
+        """
+        self.feature_columns = bundle.spec('time_global').feature_columns
+        self.one_hot_missing = bundle.metadata('time_global').get('one_hot_missing', False)
+        self.global_model = bundle.predictor('time_global')
+        print(f"✅ Loaded global time prediction model from bundle {bundle.version}")
+        
+        subreddit_names = bundle.keys('time_subreddit')
+        self.subreddit_models = LazyModelCache(
+            lambda subreddit: bundle.predictor(subreddit_names[subreddit]),
+            subreddit_names, self.subreddit_cache_size)
+        self.content_type_models = {content_type: bundle.predictor(name)
+                                    for content_type, name in bundle.keys('time_content').items()}
+        print(f"✅ Found {len(self.subreddit_models)} subreddit models (loaded on demand)")
+        
+        # The bundle's checksums already tie the lookup table to these models
+        lookup = bundle.read_json('time_prediction_lookup')
+        if lookup is not None:
+            self.optimal_time_table = lookup['table']
+            print(f"✅ Loaded {len(self.optimal_time_table)} precomputed optimal time answers")
+        else:
+            self.build_optimal_time_table()
+    
+    def cache_stats(self) -> Dict:
+        """Hit/miss/eviction counters for lazily loaded subreddit models"""
+        if isinstance(self.subreddit_models, LazyModelCache):
+            return self.subreddit_models.stats()
+        return {"capacity": None, "available": len(self.subreddit_models),
+                "loaded": len(self.subreddit_models)}
 
 
-def train_time_prediction_system():
+def _file_sha256(path: str) -> Optional[str]:
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def time_models_path(models_path: str = MODELS_DIR) -> str:
+    """Directory holding the current time models: the TIME_CURRENT target, else `models_path` itself"""
+    pointer = os.path.join(models_path, TIME_MODELS_POINTER)
+    if not os.path.exists(pointer):
+        return models_path
+    with open(pointer) as f:
+        return os.path.join(models_path, f.read().strip())
+
+
+def _set_time_models_version(models_path: str, dirname: str):
+    tmp_path = os.path.join(models_path, f'.{TIME_MODELS_POINTER}.tmp')
+    with open(tmp_path, 'w') as f:
+        f.write(dirname + '\n')
+    os.replace(tmp_path, os.path.join(models_path, TIME_MODELS_POINTER))
+
+
+def _prune_time_versions(models_path: str, keep: int, current: str):
+    versions = sorted(name for name in os.listdir(models_path)
+                      if name.startswith('time-') and os.path.isdir(os.path.join(models_path, name)))
+    for name in versions[:-keep] if keep > 0 else []:
+        # A running server may still lazily load subreddit models from a version it opened
+        if name != current and not version_lease.in_use(os.path.join(models_path, name)):
+            shutil.rmtree(os.path.join(models_path, name), ignore_errors=True)
+
+
+def _time_models_sha256(models_path: str) -> str:
+    """
+    sha256 over the sorted (filename, sha256) of every time model pickle, so the key changes
+    when any global, subreddit or content-type model is retrained, added or removed
+    """
+    names = sorted(filename for filename in os.listdir(models_path)
+                   if filename.endswith('.pkl') and filename.startswith(('time_prediction_', 'time_content_')))
+    listing = [[filename, _file_sha256(os.path.join(models_path, filename))] for filename in names]
+    return hashlib.sha256(json.dumps(listing).encode()).hexdigest()
+
+
+def _release_freed_memory():
+    """Hand heap memory freed by earlier steps back to the OS (glibc only, a no-op elsewhere)"""
+    try:
+        ctypes.CDLL('libc.so.6').malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident memory of this process so far, in MB (Linux reports ru_maxrss in KB)"""
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _json_safe(value):
+    """Convert numpy scalars inside a prediction result to plain Python types"""
+    if isinstance(value, dict):
+        return {k: _json_safe(v) for k, v in value.items()}
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def train_time_prediction_system(mode: str = TIME_TRAINING_MODE, data_path: str = TIME_DATA_PATH,
+                                 save_path: str = MODELS_DIR, bundle: bool = True):
     """
     Main function to train the complete time prediction system
+    `mode` is "memory" (consolidated frame) or "external" (batches from the feature cache);
+    with `bundle` the model bundle is rebuilt with the new models, like update() does
     """
     print("🚀 Starting Time Prediction System Training...")
     
     # Initialize engine
-    engine = TimePredictionEngine()
-    
-    # Load and consolidate data
-    df = engine.load_and_consolidate_data()
-    if df.empty:
-        print("❌ No data available for training")
-        return None
+    engine = TimePredictionEngine(data_path)
     
-    # Engineer features
-    df = engine.engineer_time_features(df)
+    if mode == "external":
+        with tempfile.TemporaryDirectory(prefix='time-features-') as scratch:
+            # The per-file feature cache is the batch source, so a scratch one is used when it is off
+            cache_dir = TIME_FEATURE_CACHE_DIR if TIME_FEATURE_CACHE_DIR != "off" else scratch
+            models = engine.train_time_prediction_models_external(
+                FeatureCache(cache_dir, FEATURE_PIPELINE_VERSION))
+        if not models:
+            print("❌ No data available for training")
+            return None
+        print(f"📏 Peak RSS after training: {_peak_rss_mb():.0f} MB")
+        engine.publish_models(save_path, bundle=bundle)
+        print("🎉 Time Prediction System Training Complete!")
+        return engine
     
-    # Create targets
-    df = engine.create_optimal_time_targets(df)
+    if TIME_FEATURE_CACHE_DIR != "off":
+        # Only files that changed since the last run are re-engineered
+        df = engine.load_engineered_data(FeatureCache(TIME_FEATURE_CACHE_DIR, FEATURE_PIPELINE_VERSION))
+        if df.empty:
+            print("❌ No data available for training")
+            return None
+    else:
+        # Load and consolidate data
+        df = engine.load_and_consolidate_data()
+        if df.empty:
+            print("❌ No data available for training")
+            return None
+        
+        # Engineer features
+        df = engine.engineer_time_features(df)
+        
+        # Create targets
+        df = engine.create_optimal_time_targets(df)
+    print(f"📏 Training frame: {df.memory_usage(deep=True).sum() / 2**20:.0f} MB, "
+          f"peak RSS so far {_peak_rss_mb():.0f} MB")
     
     # Train models
     models = engine.train_time_prediction_models(df)
+    print(f"📏 Peak RSS after training: {_peak_rss_mb():.0f} MB")
     
-    # Save models
-    engine.save_models()
+    # Save models as a new version and make it current
+    engine.publish_models(save_path, bundle=bundle)
     
     print("🎉 Time Prediction System Training Complete!")
     return engine
 
 
+def update_time_prediction_system(csv_paths: List[str], models_path: str = MODELS_DIR):
+    """Update the saved models with new timeline CSVs (named <subreddit>.csv, like the training data)"""
+    frames = []
+    for path in csv_paths:
+        df = read_timeline_csv(path).to_pandas()
+        df['subreddit'] = os.path.basename(path).replace('.csv', '')
+        frames.append(df)
+    return TimePredictionEngine().update(pd.concat(frames, ignore_index=True), models_path)
+
+
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Train or update the time prediction models")
+    parser.add_argument("command", nargs="?", default="train", choices=["train", "update"])
+    parser.add_argument("csv", nargs="*", help="update: CSVs of new posts, named <subreddit>.csv")
+    parser.add_argument("--mode", choices=["memory", "external"], default=TIME_TRAINING_MODE,
+                        help="train: consolidated frame in memory, or external-memory batches")
+    args = parser.parse_args()
+    
+    if args.command == "update":
+        # Non-zero exit when nothing was updated, so scheduled jobs notice
+        raise SystemExit(0 if update_time_prediction_system(args.csv) is not None else 1)
+    
     # Train the system
-    engine = train_time_prediction_system()
+    engine = train_time_prediction_system(args.mode)
     
     if engine:
         # Test prediction
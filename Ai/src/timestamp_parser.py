@@ -0,0 +1,143 @@
+"""
+Vectorized timestamp parsing for the timeline data.
+
+Each source file stores `created_utc` in one format (epoch seconds, epoch
+milliseconds, ISO 8601 strings, ...). Instead of letting pandas infer the format
+row by row, the format is detected once per file from a sample and the whole
+file is converted in one vectorized call. Only rows that do not match fall back
+to per-row ("mixed") parsing. Everything is returned as naive UTC.
+"""
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+# Rows sampled per file to detect its timestamp format
+FORMAT_SAMPLE_SIZE = 200
+# Epoch values above this are taken to be milliseconds (1e11 s is the year 5138)
+EPOCH_MS_THRESHOLD = 1e11
+
+
+def detect_timestamp_format(values: pd.Series) -> str:
+    """'epoch_s', 'epoch_ms', a strptime format (or 'ISO8601'), or 'mixed' when undetectable"""
+    sample = values.dropna().head(FORMAT_SAMPLE_SIZE)
+    if sample.empty:
+        return "mixed"
+
+    # A few malformed rows must not hide the file's format
+    numeric = pd.to_numeric(sample, errors="coerce")
+    if numeric.notna().mean() >= 0.95:
+        return "epoch_ms" if numeric.median() > EPOCH_MS_THRESHOLD else "epoch_s"
+
+    fmt = next((guessed for guessed in map(guess_datetime_format, sample.astype(str).head(5))
+                if guessed is not None), None)
+    if fmt is None:
+        return "mixed"
+    if fmt.startswith("%Y-%m-%d"):
+        fmt = "ISO8601"  # also accepts missing fractions/offsets on some rows
+    # Only trust the guess if it parses (nearly) the whole sample
+    parsed = pd.to_datetime(sample, format=fmt, errors="coerce", utc=True)
+    return fmt if parsed.notna().mean() >= 0.95 else "mixed"
+
+
+def _to_naive_utc(parsed: pd.Series) -> pd.Series:
+    return parsed.dt.tz_convert(None) if parsed.dt.tz is not None else parsed
+
+
+def parse_timestamp_group(values: pd.Series, fmt: Optional[str] = None) -> Tuple[pd.Series, Dict]:
+    """Parse one file's timestamps with its detected format; returns (naive UTC datetimes, report)"""
+    fmt = fmt or detect_timestamp_format(values)
+
+    if fmt in ("epoch_s", "epoch_ms"):
+        numeric = pd.to_numeric(values, errors="coerce")
+        parsed = pd.to_datetime(numeric, unit="s" if fmt == "epoch_s" else "ms", errors="coerce", utc=True)
+    elif fmt != "mixed":
+        parsed = pd.to_datetime(values, format=fmt, errors="coerce", utc=True)
+    else:
+        parsed = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns, UTC]")
+
+    # Rows the fast path could not handle get the slow per-row parser
+    present = values.notna()
+    leftover = present & parsed.isna()
+    fallback_rows = int(leftover.sum())
+    if fallback_rows:
+        fallback = pd.to_datetime(values[leftover].astype(str), errors="coerce", format="mixed", utc=True)
+        parsed = parsed.astype(fallback.dtype)
+        parsed[leftover] = fallback
+
+    parsed = _to_naive_utc(parsed)
+    report = {
+        "format": fmt,
+        "rows": int(len(values)),
+        "fast_path": int(len(values)) - fallback_rows - int((~present).sum()),
+        "fallback": fallback_rows,
+        "missing": int((~present).sum()),
+        "unparsed": int((present & parsed.isna()).sum()),
+    }
+    return parsed, report
+
+
+def parse_timestamps(df: pd.DataFrame, column: str = "created_utc",
+                     source_column: Optional[str] = "subreddit") -> Tuple[pd.Series, Dict[str, Dict]]:
+    """
+    Parse `column` with one detected format per source file (rows sharing `source_column`).
+
+    Returns naive UTC datetimes aligned with `df` (NaT where unparseable) and a
+    report per source with its format and counts of fallback, missing and unparsed rows.
+    """
+    values = df[column]
+    if source_column is None or source_column not in df.columns:
+        groups = {"all": np.arange(len(df))}
+    else:
+        groups = df.groupby(source_column, sort=False, dropna=False).indices
+
+    result = np.full(len(df), np.datetime64("NaT"), dtype="datetime64[ns]")
+    reports = {}
+    for source, positions in groups.items():
+        parsed, report = parse_timestamp_group(values.iloc[positions])
+        result[positions] = parsed.to_numpy(dtype="datetime64[ns]")
+        reports[str(source)] = report
+    return pd.Series(result, index=df.index, name=column), reports
+
+
+def _synthetic_timeline(files: int = 50, rows: int = 20000, seed: int = 42) -> pd.DataFrame:
+    """Files in different formats, each with a few malformed rows"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(files):
+        epoch = rng.integers(1_600_000_000, 1_700_000_000, rows)
+        stamps = pd.to_datetime(epoch, unit="s")
+        kind = i % 3
+        if kind == 0:
+            column = pd.Series(epoch.astype(float))
+        elif kind == 1:
+            column = pd.Series(stamps.strftime("%Y-%m-%d %H:%M:%S"))
+        else:
+            column = pd.Series(stamps.strftime("%Y-%m-%dT%H:%M:%S+00:00"))
+        column = column.astype(object)
+        column.iloc[rng.choice(rows, 5, replace=False)] = "not a date"
+        frames.append(pd.DataFrame({"created_utc": column, "subreddit": f"sub{i}"}))
+    return pd.concat(frames, ignore_index=True)
+
+
+if __name__ == "__main__":
+    df = _synthetic_timeline()
+    print(f"🧪 {len(df)} rows in {df['subreddit'].nunique()} files (epoch, 'Y-m-d H:M:S' and ISO with offset)")
+
+    start = time.perf_counter()
+    fast, reports = parse_timestamps(df)
+    fast_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    mixed = pd.to_datetime(df["created_utc"].astype(str), errors="coerce", format="mixed", utc=True)
+    mixed_seconds = time.perf_counter() - start
+
+    unparsed = sum(report["unparsed"] for report in reports.values())
+    print(f"⚡ per-file parsing {fast_seconds:.2f}s vs format='mixed' {mixed_seconds:.2f}s "
+          f"({mixed_seconds / fast_seconds:.0f}x), {unparsed} unparsed rows")
+    # format='mixed' misreads epoch strings, so compare the string-formatted files only
+    strings = ~df["subreddit"].isin([name for name, report in reports.items() if report["format"].startswith("epoch")])
+    agree = (fast == mixed.dt.tz_convert(None).astype("datetime64[ns]")) | (fast.isna() & mixed.isna())
+    print(f"✅ Same result as format='mixed' on {agree[strings].mean():.2%} of string-formatted rows")
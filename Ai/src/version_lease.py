@@ -0,0 +1,63 @@
+"""
+Reader leases on versioned model directories (bundles and time-<version> directories).
+
+A process that serves models out of a version directory drops a lease file named after
+its pid into `<version>/.readers/`. Pruning skips directories leased by a live process,
+because lazily loaded pickles and memory-mapped node arrays are read long after startup.
+With gunicorn's preload the master's lease covers its forked workers.
+"""
+import atexit
+import os
+
+LEASES_DIRNAME = ".readers"
+
+
+def hold(version_path: str):
+    """Lease `version_path` for this process until it exits"""
+    pid = os.getpid()
+    lease_path = os.path.join(version_path, LEASES_DIRNAME, str(pid))
+    try:
+        os.makedirs(os.path.dirname(lease_path), exist_ok=True)
+        open(lease_path, "w").close()
+    except OSError as e:
+        print(f"⚠️ Could not lease {version_path}, pruning may remove it while in use: {e}")
+        return
+    atexit.register(_release, lease_path, pid)
+
+
+def _release(lease_path: str, pid: int):
+    # Forked workers inherit atexit handlers; only the process that took the lease drops it
+    if os.getpid() == pid:
+        try:
+            os.remove(lease_path)
+        except OSError:
+            pass
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def in_use(version_path: str) -> bool:
+    """True if a live process holds a lease on `version_path`; leases of dead processes are removed"""
+    leases_dir = os.path.join(version_path, LEASES_DIRNAME)
+    if not os.path.isdir(leases_dir):
+        return False
+    used = False
+    for name in os.listdir(leases_dir):
+        if not name.isdigit():
+            continue
+        if _alive(int(name)):
+            used = True
+        else:
+            try:
+                os.remove(os.path.join(leases_dir, name))
+            except OSError:
+                pass
+    return used